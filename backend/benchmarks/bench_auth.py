@@ -0,0 +1,81 @@
+"""
+Benchmark — authenticated-request overhead before and after auth caching.
+
+Compares the original per-request path (jwt.decode + SELECT user) with
+the memoized-token + principal-cache path and the stateless-claims path.
+
+Run from backend/ against a database containing the user:
+    python -m benchmarks.bench_auth --user-id 1 --iterations 5000
+"""
+
+import argparse
+import asyncio
+import time
+
+from jose import jwt
+from sqlalchemy import select
+
+from config import get_settings
+from database.connection import async_session, close_db
+from models.user_model import User, Principal
+from routes import deps
+from routes.auth import _create_token
+
+settings = get_settings()
+
+
+async def _uncached(token: str) -> None:
+    payload = jwt.decode(
+        token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
+    )
+    async with async_session() as db:
+        result = await db.execute(
+            select(User).where(User.id == int(payload["sub"]))
+        )
+        result.scalar_one()
+
+
+async def _cached(token: str) -> None:
+    claims = deps._decode_token(token)
+    async with async_session() as db:
+        await deps._load_user(int(claims["sub"]), db)
+
+
+async def _stateless(token: str) -> None:
+    claims = deps._decode_token(token)
+    Principal(id=int(claims["sub"]), role=claims["role"])
+
+
+async def _measure(name: str, fn, token: str, iterations: int) -> None:
+    await fn(token)  # warm caches and the pool
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    for _ in range(iterations):
+        await fn(token)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    print(
+        f"{name:<12}{wall / iterations * 1e6:>14.1f}"
+        f"{cpu / iterations * 1e6:>14.1f}"
+    )
+
+
+async def main(user_id: int, iterations: int) -> None:
+    async with async_session() as db:
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one()
+    token = _create_token(user.id, user.role)
+
+    print(f"{'path':<12}{'wall us/req':>14}{'cpu us/req':>14}")
+    await _measure("uncached", _uncached, token, iterations)
+    await _measure("cached", _cached, token, iterations)
+    await _measure("stateless", _stateless, token, iterations)
+    await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.user_id, args.iterations))
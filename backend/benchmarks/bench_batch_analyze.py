@@ -0,0 +1,74 @@
+"""
+Benchmark — offline batch analysis throughput vs. CPU-stage worker count.
+
+Writes a synthetic JSONL archive, then runs jobs.batch_analyze over it
+once per --workers value (0 = CPU stage inline on the event loop) and
+reports records/s and the speedup over the first run. Output goes to a
+temporary file; nothing is inserted. With --books a synthetic catalog is
+compiled and configured, so the CPU stage includes BM25 ranking.
+
+The AI stage uses the configured AI_PROVIDER (mock by default, i.e. the
+CPU stage dominates). From backend/:
+    python -m benchmarks.bench_batch_analyze --records 20000 --workers 0 1 2 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+
+from benchmarks.bench_catalog import WORDS, _books
+from config import get_settings
+from services.book_catalog import build
+
+
+def _archive(path: str, n: int, rng: random.Random) -> None:
+    with open(path, "w") as f:
+        for i in range(n):
+            text = " ".join(rng.choices(WORDS, k=rng.randint(40, 200)))
+            f.write(json.dumps({"student": str(i % 500 + 1), "subject": "CS", "text": text}) + "\n")
+
+
+async def _run(args, source: str, out: str) -> None:
+    from jobs.batch_analyze import run
+    from services import ai_service
+
+    baseline = None
+    print(f"{'workers':>8}{'records/s':>12}{'speedup':>10}")
+    for workers in args.workers:
+        stats = await run(
+            source, out, insert=False, workers=workers, concurrency=args.concurrency,
+            rps=0, batch_size=args.batch_size, quiet=True,
+        )
+        rate = stats["records"] / stats["seconds"]
+        baseline = baseline or rate
+        print(f"{workers:>8}{rate:>12,.0f}{rate / baseline:>9.2f}×")
+    await ai_service.close_provider()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--records", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--books", type=int, default=0, help="catalog size; 0 = provider books")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "archive.jsonl")
+        _archive(source, args.records, rng)
+        if args.books:
+            catalog = os.path.join(tmp, "books.catalog")
+            build(_books(args.books, rng), catalog)
+            get_settings().BOOK_CATALOG_PATH = catalog
+        print(f"records: {args.records}, books: {args.books or 'provider'}, "
+              f"provider: {get_settings().AI_PROVIDER}, cpus: {os.cpu_count()}")
+        asyncio.run(_run(args, source, os.path.join(tmp, "results.jsonl")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark — book catalog build, open and recommendation latency.
+
+Generates a synthetic catalog (titles and topics drawn from a CS
+vocabulary), compiles it, maps it and measures:
+    build        — compiling the catalog file
+    open         — mapping it and decoding the term dictionary
+    rank cold    — one topic, uncached BM25 over the inverted index
+    recommend    — a batched call for several weak topics (cache warm)
+
+No database is needed:
+    python -m benchmarks.bench_catalog --books 50000 --queries 2000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from services.book_catalog import BookCatalog, build
+
+WORDS = (
+    "recursion dynamic programming graph theory data structures sorting "
+    "algorithms trees binary search hashing time complexity memory management "
+    "object oriented design database normalization networks operating systems "
+    "concurrency compilers linear algebra probability statistics machine "
+    "learning cryptography distributed systems caching functional logic "
+    "discrete mathematics automata calculus geometry security testing"
+).split()
+
+
+def _books(n: int, rng: random.Random):
+    for i in range(n):
+        topics = [" ".join(rng.sample(WORDS, rng.randint(1, 3))).title() for _ in range(rng.randint(1, 4))]
+        yield {
+            "title": f"{' '.join(rng.sample(WORDS, rng.randint(2, 5))).title()} {i}",
+            "author": f"Author {i % 997}",
+            "topics": topics,
+        }
+
+
+def _percentile(samples: list, p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--books", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--topics", type=int, default=4, help="weak topics per recommend call")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "books.catalog")
+        start = time.perf_counter()
+        build(_books(args.books, rng), path)
+        print(f"books: {args.books}, file: {os.path.getsize(path) / 1e6:.1f} MB")
+        print(f"{'build':<14}{(time.perf_counter() - start) * 1e3:>10.1f} ms")
+
+        start = time.perf_counter()
+        catalog = BookCatalog(path)
+        print(f"{'open':<14}{(time.perf_counter() - start) * 1e3:>10.1f} ms  ({catalog.n_terms} terms)")
+
+        queries = [" ".join(rng.sample(WORDS, rng.randint(1, 3))).title() for _ in range(args.queries)]
+        cold = []
+        for q in queries:
+            start = time.perf_counter()
+            catalog._rank(q)
+            cold.append((time.perf_counter() - start) * 1e6)
+        print(f"{'rank cold':<14}{_percentile(cold, 50):>10.1f} µs p50{_percentile(cold, 99):>10.1f} µs p99")
+
+        batches = [rng.sample(queries[:200], args.topics) for _ in range(args.queries)]
+        for batch in batches:
+            catalog.recommend(batch)  # warm the rank cache
+        warm = []
+        for batch in batches:
+            start = time.perf_counter()
+            catalog.recommend(batch)
+            warm.append((time.perf_counter() - start) * 1e6)
+        print(f"{'recommend':<14}{_percentile(warm, 50):>10.1f} µs p50{_percentile(warm, 99):>10.1f} µs p99"
+              f"  ({args.topics} topics/call)")
+        del catalog
+
+
+if __name__ == "__main__":
+    main()
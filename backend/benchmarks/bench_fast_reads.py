@@ -0,0 +1,123 @@
+"""
+Benchmark — ORM vs raw asyncpg read paths for the student endpoints.
+
+Runs the dashboard and results queries for one student through both
+paths and reports rows/sec and CPU milliseconds per request.
+
+Run from backend/ against a seeded database:
+    python -m benchmarks.bench_fast_reads --student-id 1 --iterations 500
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select
+
+from database.connection import async_session, close_db
+from database import fast_reads
+from models.assignment_model import Assignment, AssignmentResultResponse
+from routes.student import (
+    _assignment_to_scores,
+    _assignment_to_radar,
+    _build_dashboard,
+)
+
+
+async def _orm_dashboard(student_id: int) -> int:
+    async with async_session() as db:
+        result = await db.execute(
+            select(Assignment)
+            .where(Assignment.student_id == student_id)
+            .order_by(Assignment.created_at.asc())
+        )
+        assignments = result.scalars().all()
+    _build_dashboard(
+        (a.final_score, a.ai_dependency_score, a.weak_topics, a.created_at)
+        for a in assignments
+    )
+    return len(assignments)
+
+
+async def _fast_dashboard(student_id: int) -> int:
+    rows = await fast_reads.fetch_dashboard_rows(student_id)
+    _build_dashboard(rows)
+    return len(rows)
+
+
+async def _orm_result(assignment_id: int, student_id: int) -> int:
+    async with async_session() as db:
+        result = await db.execute(
+            select(Assignment).where(
+                Assignment.id == assignment_id,
+                Assignment.student_id == student_id,
+            )
+        )
+        a = result.scalar_one()
+    AssignmentResultResponse(
+        assignment_id=a.id,
+        status=a.status,
+        scores=_assignment_to_scores(a),
+        radar_scores=_assignment_to_radar(a),
+        weak_topics=a.weak_topics or [],
+        recommendations=a.recommendations or [],
+        followup_questions=a.followup_questions or [],
+        ai_dependency_score=a.ai_dependency_score,
+        created_at=a.created_at.isoformat() if a.created_at else "",
+    )
+    return 1
+
+
+async def _fast_result(assignment_id: int, student_id: int) -> int:
+    await fast_reads.fetch_result(assignment_id, student_id)
+    return 1
+
+
+async def _measure(name: str, fn, iterations: int) -> dict:
+    await fn()  # warm the pool and statement caches
+    rows = 0
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    for _ in range(iterations):
+        rows += await fn()
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    return {
+        "path": name,
+        "rows_per_sec": round(rows / wall, 1) if wall else 0.0,
+        "cpu_ms_per_request": round(cpu / iterations * 1000, 3),
+        "wall_ms_per_request": round(wall / iterations * 1000, 3),
+    }
+
+
+async def main(student_id: int, iterations: int) -> None:
+    async with async_session() as db:
+        result = await db.execute(
+            select(Assignment.id)
+            .where(Assignment.student_id == student_id)
+            .limit(1)
+        )
+        assignment_id = result.scalar_one()
+
+    cases = [
+        ("dashboard/orm", lambda: _orm_dashboard(student_id)),
+        ("dashboard/fast", lambda: _fast_dashboard(student_id)),
+        ("results/orm", lambda: _orm_result(assignment_id, student_id)),
+        ("results/fast", lambda: _fast_result(assignment_id, student_id)),
+    ]
+    print(f"{'path':<18}{'rows/s':>12}{'cpu ms/req':>14}{'wall ms/req':>14}")
+    for name, fn in cases:
+        r = await _measure(name, fn, iterations)
+        print(
+            f"{r['path']:<18}{r['rows_per_sec']:>12}"
+            f"{r['cpu_ms_per_request']:>14}{r['wall_ms_per_request']:>14}"
+        )
+    await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--student-id", type=int, required=True)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.student_id, args.iterations))
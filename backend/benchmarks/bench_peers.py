@@ -0,0 +1,76 @@
+"""
+Benchmark — peer index build, query latency and incremental refresh.
+
+Fills a PeerIndex with random radar vectors (one per synthetic student),
+then measures:
+    load         — bulk_load of every student
+    similar      — top-k Euclidean query, p50/p99 over random students
+    complement   — top-k centred-cosine query, p50/p99
+    upsert       — incremental refreshes per second (mix of new and
+                   existing students, as score events arrive)
+
+No database is needed:
+    python -m benchmarks.bench_peers --students 100000 --queries 500 --k 5
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from services.peer_index import DIMENSIONS, PeerIndex
+
+
+def _percentile(samples: list, p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def _bench_queries(index: PeerIndex, ids: np.ndarray, mode: str, queries: int, k: int) -> None:
+    rng = np.random.default_rng(1)
+    timings = []
+    for student_id in rng.choice(ids, size=queries):
+        start = time.perf_counter()
+        index.query(int(student_id), k, mode)
+        timings.append((time.perf_counter() - start) * 1e3)
+    print(
+        f"{mode:<12}{_percentile(timings, 50):>10.2f} ms p50"
+        f"{_percentile(timings, 99):>10.2f} ms p99"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--updates", type=int, default=50_000)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    ids = np.arange(1, args.students + 1, dtype=np.int64)
+    vectors = rng.uniform(0, 100, size=(args.students, len(DIMENSIONS))).astype(np.float32)
+
+    index = PeerIndex()
+    start = time.perf_counter()
+    index.bulk_load(ids, ids, vectors)
+    print(f"students: {args.students}, k: {args.k}")
+    print(f"{'load':<12}{(time.perf_counter() - start) * 1e3:>10.2f} ms")
+
+    _bench_queries(index, ids, "similar", args.queries, args.k)
+    _bench_queries(index, ids, "complementary", args.queries, args.k)
+
+    # Events for existing students and ~10% new ones
+    targets = rng.integers(1, int(args.students * 1.1) + 1, size=args.updates)
+    updates = rng.uniform(0, 100, size=(args.updates, len(DIMENSIONS))).tolist()
+    next_assignment = args.students + 1
+    start = time.perf_counter()
+    for student_id, vector in zip(targets.tolist(), updates):
+        index.upsert(student_id, next_assignment, vector)
+        next_assignment += 1
+    elapsed = time.perf_counter() - start
+    print(f"{'upsert':<12}{args.updates / elapsed:>10.0f} /s   ({len(index)} students after)")
+
+
+if __name__ == "__main__":
+    main()
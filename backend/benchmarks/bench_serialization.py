@@ -0,0 +1,103 @@
+"""
+Benchmark — response serialization CPU for large dashboard payloads.
+
+Serves one synthetic DashboardResponse through three in-process routes:
+    baseline  — validated model returned through response_model with the
+                stock JSONResponse (validate, re-validate, jsonable_encoder,
+                json.dumps)
+    fast      — model_construct + FastJSONResponse (one Rust serializer pass)
+    snapshot  — pre-serialized bytes, as served from the analytics cache
+
+No database is needed:
+    python -m benchmarks.bench_serialization --points 5000 --iterations 200
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from models.assignment_model import DashboardResponse
+from routes.responses import FastJSONResponse, to_json_bytes, json_bytes_response
+
+
+def _payload(points: int) -> dict:
+    start = datetime(2024, 1, 1)
+    return {
+        "overall_score": 78.4,
+        "total_assignments": points,
+        "score_history": [
+            {
+                "date": (start + timedelta(hours=i)).isoformat(),
+                "score": round(50 + (i * 37 % 500) / 10, 1),
+            }
+            for i in range(points)
+        ],
+        "weak_topic_summary": [
+            {"topic": f"Topic {i}", "count": points // (i + 1)} for i in range(50)
+        ],
+        "ai_dependency_score": 22.5,
+        "growth_trend": 4.2,
+    }
+
+
+def _build_app(data: dict) -> FastAPI:
+    app = FastAPI()
+    snapshot = to_json_bytes(DashboardResponse.model_construct(**data))
+
+    @app.get(
+        "/baseline",
+        response_model=DashboardResponse,
+        response_class=JSONResponse,
+    )
+    async def baseline():
+        return DashboardResponse(**data)
+
+    @app.get("/fast", response_model=DashboardResponse)
+    async def fast():
+        return FastJSONResponse(DashboardResponse.model_construct(**data))
+
+    @app.get("/snapshot", response_model=DashboardResponse)
+    async def cached():
+        return json_bytes_response(snapshot)
+
+    return app
+
+
+async def _measure(client: httpx.AsyncClient, path: str, iterations: int) -> int:
+    resp = await client.get(path)  # warm up
+    size = len(resp.content)
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    for _ in range(iterations):
+        await client.get(path)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    print(
+        f"{path.lstrip('/'):<12}{wall / iterations * 1e3:>12.2f}"
+        f"{cpu / iterations * 1e3:>12.2f}{size:>12}"
+    )
+    return size
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--points", type=int, default=5000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    app = _build_app(_payload(args.points))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"score_history points: {args.points}, iterations: {args.iterations}")
+        print(f"{'path':<12}{'wall ms':>12}{'cpu ms':>12}{'bytes':>12}")
+        for path in ("/baseline", "/fast", "/snapshot"):
+            await _measure(client, path, args.iterations)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+"""
+Benchmark — cold-start cost: app import time and boot-to-ready time.
+
+    import   — `import main` in a fresh interpreter (median of --runs),
+               plus the slowest top-level imports from -X importtime;
+               fails if `import main` pulls in a module from LAZY_MODULES
+    boot     — spawn uvicorn and poll until /health answers (live) and
+               until /ready returns 200 (warm)
+
+DATABASE_URL and SECRET_KEY come from the environment; boot needs a
+reachable database. Run from backend/:
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --skip-boot
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+# Imported on first use only; none of them may load with the app
+LAZY_MODULES = ("numpy",)
+
+
+def _import_seconds() -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import main"], check=True)
+    return time.perf_counter() - start
+
+
+def _slowest_imports(limit: int) -> list[tuple[int, str]]:
+    """(cumulative microseconds, module) for modules imported directly by main."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        check=True, capture_output=True, text=True,
+    )
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.startswith("   ") and not name.startswith("    "):
+            entries.append((int(cumulative), name.strip()))
+    return sorted(entries, reverse=True)[:limit]
+
+
+def _eager_lazy_modules() -> list[str]:
+    """LAZY_MODULES present in sys.modules right after `import main`."""
+    proc = subprocess.run(
+        [sys.executable, "-c",
+         f"import sys, main; print(*[m for m in {LAZY_MODULES!r} if m in sys.modules])"],
+        check=True, capture_output=True, text=True,
+    )
+    return proc.stdout.split()
+
+
+def _wait_for(client: httpx.Client, url: str, status: int, deadline: float) -> float:
+    while time.perf_counter() < deadline:
+        try:
+            if client.get(url).status_code == status:
+                return time.perf_counter()
+        except httpx.TransportError:
+            pass
+        time.sleep(0.01)
+    raise TimeoutError(f"{url} did not return {status} in time")
+
+
+def _boot_seconds(port: int, timeout: float) -> tuple[float, float]:
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app",
+         "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0) as client:
+            deadline = start + timeout
+            live = _wait_for(client, "/health", 200, deadline)
+            ready = _wait_for(client, "/ready", 200, deadline)
+    finally:
+        proc.terminate()
+        proc.wait()
+    return live - start, ready - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--skip-boot", action="store_true")
+    args = parser.parse_args()
+    os.environ.setdefault("METRICS_ENABLED", "true")
+
+    imports = [_import_seconds() for _ in range(args.runs)]
+    print(f"import main   median {statistics.median(imports) * 1e3:8.1f} ms"
+          f"   min {min(imports) * 1e3:8.1f} ms")
+    print(f"\nslowest direct imports of main (cumulative):")
+    for micros, name in _slowest_imports(args.top):
+        print(f"  {micros / 1e3:8.1f} ms  {name}")
+    eager = _eager_lazy_modules()
+    if eager:
+        raise SystemExit(f"\n✗ `import main` loads {', '.join(eager)}; import it on first use instead")
+    print(f"\n✓ not loaded by `import main`: {', '.join(LAZY_MODULES)}")
+
+    if args.skip_boot:
+        return
+
+    live, ready = [], []
+    for _ in range(args.runs):
+        l, r = _boot_seconds(args.port, args.timeout)
+        live.append(l)
+        ready.append(r)
+    print(f"\nboot → /health  median {statistics.median(live) * 1e3:8.1f} ms")
+    print(f"boot → /ready   median {statistics.median(ready) * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Load test — do login bursts inflate latency on unrelated endpoints?
+
+Polls /health at a steady rate, first alone and then while a burst of
+concurrent logins runs, and prints p50/p95/p99 /health latency for both
+phases along with the login status counts (503s mean the password pool
+shed load).
+
+Run against a live server with an existing account:
+    python -m benchmarks.load_login_burst --base-url http://localhost:10000 \\
+        --email student@example.com --password secret --logins 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+
+def _percentiles(samples: list[float]) -> str:
+    if len(samples) < 2:
+        return "n/a"
+    q = statistics.quantiles(samples, n=100)
+    return f"p50={q[49]:.1f}ms p95={q[94]:.1f}ms p99={q[98]:.1f}ms"
+
+
+async def _poll_health(
+    client: httpx.AsyncClient, stop: asyncio.Event, interval: float
+) -> list[float]:
+    samples: list[float] = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return samples
+
+
+async def _login(client: httpx.AsyncClient, email: str, password: str) -> int:
+    resp = await client.post(
+        "/auth/login", json={"email": email, "password": password}
+    )
+    return resp.status_code
+
+
+async def main(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=args.logins + 10)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=60
+    ) as client:
+        stop = asyncio.Event()
+        poller = asyncio.create_task(_poll_health(client, stop, args.interval))
+        await asyncio.sleep(args.baseline_seconds)
+        stop.set()
+        baseline = await poller
+
+        stop = asyncio.Event()
+        poller = asyncio.create_task(_poll_health(client, stop, args.interval))
+        statuses = await asyncio.gather(
+            *(_login(client, args.email, args.password) for _ in range(args.logins))
+        )
+        stop.set()
+        during = await poller
+
+    print(f"/health baseline     {_percentiles(baseline)}")
+    print(f"/health during burst {_percentiles(during)}")
+    print(f"login statuses       {dict(Counter(statuses))}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--base-url", default="http://localhost:10000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.01)
+    parser.add_argument("--baseline-seconds", type=float, default=3.0)
+    asyncio.run(main(parser.parse_args()))
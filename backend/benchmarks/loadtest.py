@@ -0,0 +1,332 @@
+"""
+End-to-end load test — realistic traffic mixes against a running API.
+
+Drives three scenarios concurrently for --duration seconds:
+  * login bursts         — --burst-size concurrent logins every --burst-every s
+  * submission spikes    — --spike-size students submit + follow up every --spike-every s
+  * teacher polling      — every teacher polls class analytics and the student table
+and writes throughput and p50/p95/p99 per endpoint to a JSON report.
+With --baseline the report is compared against a stored run and the
+process exits 1 if any endpoint's p95 regressed past --tolerance.
+
+The report records the dataset the run was made against: the manifest
+benchmarks.seed wrote (--dataset), with its seed and row counts. Runs are
+only compared when both were made against the same seed and scale;
+otherwise the process exits 2 without comparing, since analytics
+latencies depend on table size more than on anything else.
+
+Typical run against local Postgres, compared with the stored baseline.
+Reseed with --truncate before every run, because the run's own
+submissions grow the tables:
+
+    python -m benchmarks.seed --students 10000 --submissions-per-student 100 \\
+        --workers 4 --truncate
+    python -m benchmarks.loadtest --boot --duration 90 --students 50 \\
+        --burst-size 20 --spike-size 10 --out bench_output.json \\
+        --baseline benchmarks/baseline.json
+
+--boot starts benchmarks.serve, which raises the per-student AI token
+bucket so submissions aren't mostly 429s. Against a server started some
+other way, set the same override there:
+    AI_STUDENT_RATE_PER_MINUTE=600 AI_STUDENT_BURST=100
+
+Each virtual user draws its essays and answers from its own RNG seeded
+from --seed and its index, so a run sends the same requests however the
+concurrent users interleave.
+
+benchmarks/baseline.json is that run with --out benchmarks/baseline.json
+on a single-core machine against local Postgres seeded as above (10,000
+students, about 1M assignments). Its "config" records every option and
+its "dataset" the seed manifest. p95 comparisons are only meaningful on
+similar hardware with the same options; regenerate it the same way when
+either changes.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+BENCH_PASSWORD = "benchmark-pass"
+
+# Dataset manifest fields two runs must share to be compared
+DATASET_SCALE = ("seed", "students", "teachers", "submissions_per_student", "users", "assignments")
+
+
+def bench_email(role: str, i: int) -> str:
+    return f"bench-{role}-{i}@bench.example.com"
+
+
+class Recorder:
+    """Latency samples and status counts per endpoint."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    async def call(
+        self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs
+    ) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            resp = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as exc:
+            self.statuses[name][type(exc).__name__] += 1
+            return None
+        self.samples[name].append((time.perf_counter() - start) * 1000)
+        self.statuses[name][str(resp.status_code)] += 1
+        return resp
+
+    def report(self, duration: float) -> Dict:
+        endpoints = {}
+        for name, samples in sorted(self.samples.items()):
+            q = statistics.quantiles(samples, n=100) if len(samples) > 1 else samples * 99
+            endpoints[name] = {
+                "requests": len(samples),
+                "throughput_rps": round(len(samples) / duration, 2),
+                "p50_ms": round(q[49], 2),
+                "p95_ms": round(q[94], 2),
+                "p99_ms": round(q[98], 2),
+                "statuses": dict(self.statuses[name]),
+            }
+        return endpoints
+
+
+# ---------- Setup ----------
+
+async def _account_token(
+    client: httpx.AsyncClient, role: str, i: int, sem: asyncio.Semaphore
+) -> str:
+    email = bench_email(role, i)
+    async with sem:
+        resp = await client.post("/auth/login", json={"email": email, "password": BENCH_PASSWORD})
+        if resp.status_code != 200:
+            resp = await client.post("/auth/register", json={
+                "name": f"Bench {role.title()} {i}",
+                "email": email,
+                "password": BENCH_PASSWORD,
+                "role": role,
+            })
+        resp.raise_for_status()
+        return resp.json()["access_token"]
+
+
+async def _tokens(client: httpx.AsyncClient, role: str, count: int) -> List[str]:
+    sem = asyncio.Semaphore(16)
+    return list(await asyncio.gather(
+        *(_account_token(client, role, i, sem) for i in range(count))
+    ))
+
+
+# ---------- Scenarios ----------
+
+def _auth(token: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def login_bursts(client, rec, args, deadline):
+    while time.monotonic() < deadline:
+        await asyncio.gather(*(
+            rec.call(client, "POST /auth/login", "POST", "/auth/login", json={
+                "email": bench_email("student", i % args.students),
+                "password": BENCH_PASSWORD,
+            })
+            for i in range(args.burst_size)
+        ))
+        await asyncio.sleep(args.burst_every)
+
+
+async def _submit_and_follow_up(client, rec, token: str, rng: random.Random):
+    text = " ".join(rng.choice(["recursion", "memoization", "graphs", "heaps", "proof"])
+                    for _ in range(60))
+    resp = await rec.call(
+        client, "POST /student/submit-assignment", "POST", "/student/submit-assignment",
+        json={"text": text, "subject": rng.choice(["Algorithms", "Databases", "Systems"])},
+        headers=_auth(token),
+    )
+    if resp is None or resp.status_code != 201:
+        return
+    body = resp.json()
+    answers = {q["id"]: f"answer {rng.random():.6f}" for q in body["followup_questions"]}
+    await rec.call(
+        client, "POST /student/submit-followup", "POST", "/student/submit-followup",
+        json={"assignment_id": body["assignment_id"], "responses": answers},
+        headers=_auth(token),
+    )
+    await rec.call(client, "GET /student/dashboard", "GET", "/student/dashboard",
+                   headers=_auth(token))
+
+
+async def submission_spikes(client, rec, args, deadline, tokens):
+    rng = random.Random(args.seed)  # picks each spike's students
+    user_rngs = [random.Random(f"{args.seed}:student:{i}") for i in range(len(tokens))]
+    while time.monotonic() < deadline:
+        batch = rng.sample(range(len(tokens)), min(args.spike_size, len(tokens)))
+        await asyncio.gather(*(
+            _submit_and_follow_up(client, rec, tokens[i], user_rngs[i]) for i in batch
+        ))
+        await asyncio.sleep(args.spike_every)
+
+
+async def teacher_polling(client, rec, args, deadline, token):
+    while time.monotonic() < deadline:
+        await rec.call(client, "GET /teacher/class-analytics", "GET",
+                       "/teacher/class-analytics", headers=_auth(token))
+        await rec.call(client, "GET /teacher/students", "GET",
+                       "/teacher/students", headers=_auth(token))
+        await asyncio.sleep(args.poll_every)
+
+
+# ---------- Baseline comparison ----------
+
+def dataset_mismatch(report: Dict, baseline: Dict) -> Optional[str]:
+    """Why two reports' datasets can't be compared, or None if they can."""
+    now, base = report.get("dataset"), baseline.get("dataset")
+    if not now or not base:
+        return "both runs need a seed manifest (benchmarks.seed, then --dataset)"
+    differ = [f"{k} {base.get(k)} → {now.get(k)}" for k in DATASET_SCALE if now.get(k) != base.get(k)]
+    return "dataset differs: " + ", ".join(differ) if differ else None
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> bool:
+    """Print p95/throughput deltas; return True if any p95 regressed."""
+    regressed = False
+    print(f"{'endpoint':<34}{'p95 base':>10}{'p95 now':>10}{'rps base':>10}{'rps now':>10}")
+    for name, now in report["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(name)
+        if not base:
+            continue
+        flag = ""
+        if now["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressed = True
+            flag = "  REGRESSED"
+        print(
+            f"{name:<34}{base['p95_ms']:>10}{now['p95_ms']:>10}"
+            f"{base['throughput_rps']:>10}{now['throughput_rps']:>10}{flag}"
+        )
+    return regressed
+
+
+# ---------- Entry point ----------
+
+def _boot_server(args) -> subprocess.Popen:
+    cmd = [
+        sys.executable, "-m", "benchmarks.serve", "--port", str(args.port),
+        "--ai-latency-ms", str(args.ai_latency_ms),
+        "--ai-sigma", str(args.ai_sigma), "--seed", str(args.seed),
+        "--student-rate-per-minute", str(args.student_rate_per_minute),
+        "--student-burst", str(args.student_burst),
+    ]
+    return subprocess.Popen(cmd, env=os.environ.copy())
+
+
+async def _wait_ready(client: httpx.AsyncClient, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError("API did not become healthy in time")
+
+
+def _dataset(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        print(f"No seed manifest at {path}; the report won't be comparable", file=sys.stderr)
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+async def run(args) -> Dict:
+    base_url = f"http://127.0.0.1:{args.port}" if args.boot else args.base_url
+    limits = httpx.Limits(max_connections=args.max_connections)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        await _wait_ready(client)
+        student_tokens = await _tokens(client, "student", args.students)
+        teacher_tokens = await _tokens(client, "teacher", args.teachers)
+
+        rec = Recorder()
+        start = time.monotonic()
+        deadline = start + args.duration
+        await asyncio.gather(
+            login_bursts(client, rec, args, deadline),
+            submission_spikes(client, rec, args, deadline, student_tokens),
+            *(teacher_polling(client, rec, args, deadline, t) for t in teacher_tokens),
+        )
+        elapsed = time.monotonic() - start
+
+    return {
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "baseline", "dataset")},
+        "dataset": _dataset(args.dataset),
+        "duration_s": round(elapsed, 2),
+        "endpoints": rec.report(elapsed),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8001")
+    parser.add_argument("--boot", action="store_true", help="start benchmarks.serve")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--ai-latency-ms", type=float, default=200.0)
+    parser.add_argument("--ai-sigma", type=float, default=0.3,
+                        help="lognormal latency spread of the simulated provider")
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--teachers", type=int, default=5)
+    parser.add_argument("--burst-size", type=int, default=100)
+    parser.add_argument("--burst-every", type=float, default=15.0)
+    parser.add_argument("--spike-size", type=int, default=50)
+    parser.add_argument("--spike-every", type=float, default=10.0)
+    parser.add_argument("--poll-every", type=float, default=5.0)
+    parser.add_argument("--max-connections", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--student-rate-per-minute", type=float, default=600.0,
+                        help="per-student AI token bucket for --boot")
+    parser.add_argument("--student-burst", type=int, default=100,
+                        help="per-student AI burst for --boot")
+    parser.add_argument("--out", default="bench_output.json")
+    parser.add_argument("--baseline", help="stored report to compare against")
+    parser.add_argument("--dataset", default="seed_manifest.json",
+                        help="manifest written by benchmarks.seed for the database under test")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed fractional p95 regression")
+    args = parser.parse_args()
+
+    server = _boot_server(args) if args.boot else None
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        mismatch = dataset_mismatch(report, baseline)
+        if mismatch:
+            print(f"✗ Not comparing with {args.baseline}: {mismatch}")
+            sys.exit(2)
+        if compare(report, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Synthetic data seeder — bulk-loads users and assignments with COPY.
+
+Generates students, teachers and assignments with controllable
+distributions and loads them with asyncpg copy_records_to_table in
+parallel chunks. Output is deterministic for a given --seed: every
+student's data comes from its own RNG, and ids are assigned up front, so
+chunking and worker count do not change the result. Timestamps come from
+--start-date and the RNG, never the clock: accounts are created during
+the four weeks before --start-date, submissions over the --weeks after.
+
+Accounts use the benchmarks.loadtest email pattern and password, so a
+seeded database can be load-tested directly. COPY bypasses the write
+paths, so the score sketches are rebuilt at the end.
+
+The run's seed, options and resulting row counts are written to
+--manifest; benchmarks.loadtest stores it in its report and refuses to
+compare runs made against datasets of different scale.
+
+    python -m benchmarks.seed --students 10000 --submissions-per-student 100 \\
+        --score-drift 0.4 --ai-dependency-share 0.15 --workers 8 --truncate
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Tuple
+
+import asyncpg
+
+from benchmarks.loadtest import BENCH_PASSWORD, bench_email
+from config import get_settings
+from services.scoring_service import calculate_final_score
+
+TOPICS = [
+    "Recursion", "Dynamic Programming", "Graph Theory", "Data Structures",
+    "Sorting Algorithms", "Trees & BST", "Time Complexity", "Memory Management",
+    "Object-Oriented Design", "Database Normalization",
+]
+SUBJECTS = ["Algorithms", "Data Structures", "Databases", "Systems", "General"]
+
+USER_COLUMNS = ["id", "name", "email", "password_hash", "role", "created_at"]
+ASSIGNMENT_COLUMNS = [
+    "id", "student_id", "text", "subject", "followup_questions", "student_responses",
+    "concept_clarity", "application", "logical_consistency", "depth", "final_score",
+    "radar_clarity", "radar_application", "radar_logic", "radar_critical_thinking",
+    "radar_retention", "weak_topics", "recommendations", "ai_dependency_score",
+    "status", "created_at", "updated_at",
+]
+
+_EMPTY_LIST = json.dumps([])
+_EMPTY_DICT = json.dumps({})
+
+
+def _student_rng(seed: int, index: int) -> random.Random:
+    return random.Random(seed * 1_000_003 + index)
+
+
+def _submission_count(seed: int, index: int, mean: float) -> int:
+    rng = _student_rng(seed, index)
+    return max(1, round(rng.gauss(mean, mean * 0.3)))
+
+
+def _clip(x: float) -> float:
+    return min(100.0, max(0.0, x))
+
+
+def generate_chunk(spec: dict) -> List[tuple]:
+    """
+    Build assignment rows for students [first, last). Runs in a worker
+    process; everything it needs is in `spec`, so it is deterministic.
+    """
+    rows: List[tuple] = []
+    start = datetime.fromisoformat(spec["start_date"]).replace(tzinfo=timezone.utc)
+    span = timedelta(weeks=spec["weeks"]).total_seconds()
+    next_id = spec["first_assignment_id"]
+
+    for index in range(spec["first"], spec["last"]):
+        rng = _student_rng(spec["seed"], index)
+        count = max(1, round(rng.gauss(spec["mean"], spec["mean"] * 0.3)))
+        ability = rng.gauss(70, 10)
+        weak_profile = rng.sample(TOPICS, 3)
+        ai_heavy = rng.random() < spec["ai_share"]
+        student_id = spec["first_user_id"] + index
+
+        offsets = sorted(rng.uniform(0, span) for _ in range(count))
+        for offset in offsets:
+            week = offset / 604800
+            level = ability + spec["drift"] * week
+            cc, app, logic, depth = (_clip(rng.gauss(level, 8)) for _ in range(4))
+            scores = calculate_final_score(cc, app, logic, depth)
+            topics = rng.sample(weak_profile, rng.randint(1, 3))
+            created = start + timedelta(seconds=offset)
+            rows.append((
+                next_id, student_id,
+                f"Synthetic submission {next_id} covering {', '.join(topics)}.",
+                rng.choice(SUBJECTS), _EMPTY_LIST, _EMPTY_DICT,
+                scores.concept_clarity, scores.application,
+                scores.logical_consistency, scores.depth, scores.final_score,
+                round(_clip(rng.gauss(level, 8)), 1), scores.application,
+                scores.logical_consistency, round(_clip(rng.gauss(level, 8)), 1),
+                round(_clip(rng.gauss(level, 8)), 1),
+                json.dumps(topics), _EMPTY_LIST,
+                round(rng.uniform(50, 90) if ai_heavy else rng.uniform(5, 45), 1),
+                "completed", created, created,
+            ))
+            next_id += 1
+    return rows
+
+
+def _asyncpg_dsn(url: str) -> str:
+    for prefix in ("postgresql+asyncpg://", "postgres://"):
+        url = url.replace(prefix, "postgresql://", 1)
+    return url
+
+
+async def _prepare(pool: asyncpg.Pool, truncate: bool) -> Tuple[int, int]:
+    """Optionally truncate, then return the next free (user id, assignment id)."""
+    from database.connection import init_db, close_db
+    from models import assignment_model, user_model  # noqa: F401  (registers the tables)
+
+    await init_db()
+    await close_db()
+    async with pool.acquire() as conn:
+        if truncate:
+            await conn.execute(
+                "TRUNCATE analytics, followup_evaluations, score_sketch_buckets, "
+                "assignments, users RESTART IDENTITY CASCADE"
+            )
+        user_id = await conn.fetchval("SELECT COALESCE(MAX(id), 0) + 1 FROM users")
+        assignment_id = await conn.fetchval(
+            "SELECT COALESCE(MAX(id), 0) + 1 FROM assignments"
+        )
+    return user_id, assignment_id
+
+
+def _user_rows(args, first_user_id: int, password_hash: str) -> List[tuple]:
+    rng = random.Random(args.seed)
+    start = datetime.fromisoformat(args.start_date).replace(tzinfo=timezone.utc)
+    enrolment = timedelta(weeks=4).total_seconds()
+
+    def created_at() -> datetime:
+        return start - timedelta(seconds=rng.uniform(0, enrolment))
+
+    rows = [
+        (first_user_id + i, f"Bench Student {i}", bench_email("student", i),
+         password_hash, "student", created_at())
+        for i in range(args.students)
+    ]
+    base = first_user_id + args.students
+    rows += [
+        (base + i, f"Bench Teacher {i}", bench_email("teacher", i),
+         password_hash, "teacher", created_at())
+        for i in range(args.teachers)
+    ]
+    return rows
+
+
+async def main(args) -> None:
+    from passlib.context import CryptContext
+
+    dsn = _asyncpg_dsn(get_settings().DATABASE_URL)
+    pool = await asyncpg.create_pool(dsn, min_size=args.workers, max_size=args.workers)
+    first_user_id, first_assignment_id = await _prepare(pool, args.truncate)
+
+    started = time.perf_counter()
+    password_hash = CryptContext(schemes=["bcrypt"]).hash(BENCH_PASSWORD)
+    async with pool.acquire() as conn:
+        await conn.copy_records_to_table(
+            "users", records=_user_rows(args, first_user_id, password_hash),
+            columns=USER_COLUMNS,
+        )
+
+    # Per-student counts fix every chunk's first assignment id up front
+    specs = []
+    next_id = first_assignment_id
+    for first in range(0, args.students, args.students_per_chunk):
+        last = min(first + args.students_per_chunk, args.students)
+        specs.append({
+            "seed": args.seed, "first": first, "last": last,
+            "first_user_id": first_user_id, "first_assignment_id": next_id,
+            "mean": args.submissions_per_student, "drift": args.score_drift,
+            "ai_share": args.ai_dependency_share, "weeks": args.weeks,
+            "start_date": args.start_date,
+        })
+        next_id += sum(
+            _submission_count(args.seed, i, args.submissions_per_student)
+            for i in range(first, last)
+        )
+
+    loop = asyncio.get_running_loop()
+    sem = asyncio.Semaphore(args.workers)
+    loaded = 0
+
+    async def load(spec: dict, executor: ProcessPoolExecutor) -> None:
+        nonlocal loaded
+        async with sem:
+            rows = await loop.run_in_executor(executor, generate_chunk, spec)
+            async with pool.acquire() as conn:
+                await conn.copy_records_to_table(
+                    "assignments", records=rows, columns=ASSIGNMENT_COLUMNS
+                )
+            loaded += len(rows)
+            elapsed = time.perf_counter() - started
+            print(f"  {loaded:,} assignments ({loaded / elapsed:,.0f} rows/s)")
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        await asyncio.gather(*(load(spec, executor) for spec in specs))
+
+    async with pool.acquire() as conn:
+        for table in ("users", "assignments"):
+            await conn.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"(SELECT MAX(id) FROM {table}))"
+            )
+        await conn.execute("ANALYZE users; ANALYZE assignments")
+        users = await conn.fetchval("SELECT COUNT(*) FROM users")
+        assignments = await conn.fetchval("SELECT COUNT(*) FROM assignments")
+    await pool.close()
+
+    # COPY bypasses the write paths that keep score sketches current
+    from database.connection import async_session, close_db
+    from services import score_sketch
+
+    async with async_session() as db:
+        counted = await score_sketch.rebuild(db)
+        await db.commit()
+    await close_db()
+
+    manifest = {
+        "seed": args.seed,
+        "students": args.students,
+        "teachers": args.teachers,
+        "submissions_per_student": args.submissions_per_student,
+        "score_drift": args.score_drift,
+        "ai_dependency_share": args.ai_dependency_share,
+        "weeks": args.weeks,
+        "start_date": args.start_date,
+        "truncated": args.truncate,
+        "users": users,  # every row in the table, seeded or not
+        "assignments": assignments,
+    }
+    with open(args.manifest, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"✓ Seeded {args.students + args.teachers:,} users and {loaded:,} "
+        f"assignments in {elapsed:.1f}s; score sketches rebuilt from {counted:,}; "
+        f"manifest written to {args.manifest}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--teachers", type=int, default=20)
+    parser.add_argument("--submissions-per-student", type=float, default=100.0)
+    parser.add_argument("--score-drift", type=float, default=0.3,
+                        help="mean score change per week")
+    parser.add_argument("--ai-dependency-share", type=float, default=0.15,
+                        help="fraction of students with high AI dependency")
+    parser.add_argument("--weeks", type=int, default=16)
+    parser.add_argument("--start-date", default="2026-01-05")
+    parser.add_argument("--students-per-chunk", type=int, default=250)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--truncate", action="store_true",
+                        help="empty users/assignments/analytics first")
+    parser.add_argument("--manifest", default="seed_manifest.json",
+                        help="where to record the seed, options and row counts")
+    asyncio.run(main(parser.parse_args()))
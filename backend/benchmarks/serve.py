@@ -0,0 +1,48 @@
+"""
+Boot the API with the simulated AI provider for load testing.
+
+    python -m benchmarks.serve --port 8001 --ai-latency-ms 300 --ai-sigma 0.6
+
+DATABASE_URL and SECRET_KEY come from the environment as usual. Other
+AI_SIM_* settings (error, timeout and 429-storm rates) are read from the
+environment too.
+
+The per-student AI token bucket is raised (--student-rate-per-minute,
+--student-burst): the production default of 3 analyses in a burst would
+answer most of a load test's submissions with 429s, which measures the
+rate limiter instead of the analysis path. Pass the production values
+(6 and 3) to measure the limiter.
+"""
+
+import argparse
+import os
+
+import uvicorn
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--ai-latency-ms", type=float, default=200.0)
+    parser.add_argument("--ai-sigma", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--student-rate-per-minute", type=float, default=600.0)
+    parser.add_argument("--student-burst", type=int, default=100)
+    args = parser.parse_args()
+
+    # Settings are read once, so configure the provider before importing the app
+    os.environ["AI_PROVIDER"] = "simulated"
+    os.environ["AI_SIM_LATENCY_MEDIAN_MS"] = str(args.ai_latency_ms)
+    os.environ["AI_SIM_LATENCY_SIGMA"] = str(args.ai_sigma)
+    os.environ["AI_SIM_SEED"] = str(args.seed)
+    os.environ["AI_STUDENT_RATE_PER_MINUTE"] = str(args.student_rate_per_minute)
+    os.environ["AI_STUDENT_BURST"] = str(args.student_burst)
+
+    from main import app
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
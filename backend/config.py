@@ -8,17 +8,115 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     SECRET_KEY: str
     GEMINI_API_KEY: str = ""
+    GEMINI_MODEL: str = "gemini-1.5-flash"
     PORT: int = 10000
 
     # JWT settings
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_MINUTES: int = 1440  # 24 hours
+    AUTH_TOKEN_CACHE_SIZE: int = 10000  # memoized decoded tokens
+    AUTH_PRINCIPAL_CACHE_SIZE: int = 10000
+    AUTH_PRINCIPAL_CACHE_TTL: int = 60  # seconds; 0 queries users every request
+    AUTH_STATELESS_ROLES: bool = False  # role checks from verified claims only
+
+    # Password hashing pool
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_DEPTH: int = 64  # waiting calls before 503
+    PASSWORD_HASH_RETRY_AFTER: int = 2  # seconds, sent with 503
+
+    # AI admission control
+    AI_MAX_CONCURRENT_ANALYSES: int = 16
+    AI_MAX_QUEUED_ANALYSES: int = 64
+    AI_QUEUE_TIMEOUT_SECONDS: float = 10.0
+    AI_STUDENT_RATE_PER_MINUTE: float = 6
+    AI_STUDENT_BURST: int = 3
+    AI_TEACHER_RATE_PER_MINUTE: float = 60
+    AI_TEACHER_BURST: int = 30
+    AI_RATE_LIMIT_BACKEND: str = "memory"  # memory | redis (REDIS_URL, shared by all workers)
+
+    # AI provider: mock | gemini | simulated
+    AI_PROVIDER: str = "mock"
+    AI_TIMEOUT_SECONDS: float = 30.0
+    AI_PROMPT_VERSION: str = "1"  # bump when prompts change; part of cached evaluation keys
+    AI_SIM_SEED: int = 0
+    AI_SIM_LATENCY_MEDIAN_MS: float = 800.0
+    AI_SIM_LATENCY_SIGMA: float = 0.5  # lognormal shape; higher = fatter tail
+    AI_SIM_ERROR_RATE: float = 0.0
+    AI_SIM_TIMEOUT_RATE: float = 0.0
+    AI_SIM_RATE_LIMIT_RATE: float = 0.0  # base chance of a 429
+    AI_SIM_STORM_SECONDS: float = 0.0  # window of elevated 429s after one
+    AI_SIM_STORM_RATE: float = 0.9  # chance of a 429 inside a storm
+
+    # Scoring weights (see services/scoring_service.py)
+    SCORING_PROFILE: str = "standard@1"
+    SCORING_SUBJECT_PROFILES: str = ""  # per-subject overrides: "Math=rigorous@1;Lab=applied@1"
+
+    # Regrade job defaults (see jobs/regrade.py)
+    REGRADE_CONCURRENCY: int = 8  # assignments analysed at once
+    REGRADE_RPS: float = 5.0  # AI calls per second across the job
+
+    # Bulk submission imports (see services/bulk_import.py)
+    BULK_IMPORT_CONCURRENCY: int = 4  # analyses in flight across all imports
+    BULK_IMPORT_BATCH_SIZE: int = 25  # rows per insert transaction
+    BULK_IMPORT_MAX_ITEMS: int = 2000  # records per upload
+    BULK_IMPORT_MAX_LINE_BYTES: int = 1_000_000
+    BULK_IMPORT_SPOOL_MEMORY_BYTES: int = 1_000_000  # parsed records beyond this spill to disk
+    BULK_IMPORT_KEEP_FINISHED: int = 50  # finished imports kept for status polling
+
+    # Per-question follow-up evaluations (see services/followup_eval.py)
+    FOLLOWUP_EVAL_CONCURRENCY: int = 4  # answers evaluated at once per submission (2 AI calls each)
+    FOLLOWUP_EVAL_VERSIONS: int = 3  # cached answers kept per question, newest first
+
+    # Book catalog (see services/book_catalog.py); empty asks the AI provider
+    BOOK_CATALOG_PATH: str = ""  # compiled by `python -m jobs.build_book_catalog`
 
     # App metadata
     APP_NAME: str = "VeriLearn API"
     APP_VERSION: str = "1.0.0"
     DEBUG: bool = False
 
+    # Performance toggles
+    FAST_READ_PATH: bool = False  # raw asyncpg reads for hot student endpoints
+    METRICS_ENABLED: bool = True  # request/DB/AI metrics at /metrics
+    SQL_PROFILER_ENABLED: bool = False  # per-request SQL log + X-SQL-Profile header
+    SQL_PROFILER_N_PLUS_ONE_THRESHOLD: int = 3  # repeats of one query shape
+    ANALYTICS_CACHE_TTL: int = 300  # seconds snapshots are served; 0 disables
+
+    # Shared cache (see services/shared_cache.py): memory | redis
+    CACHE_BACKEND: str = "memory"
+    REDIS_URL: str = ""
+    CACHE_KEY_PREFIX: str = "verilearn"
+    CACHE_MEMORY_SIZE: int = 10000
+    CACHE_LOCK_TTL: float = 10.0  # seconds a loading worker holds a key's lock
+    CACHE_LOCK_WAIT: float = 2.0  # seconds other workers wait before loading themselves
+    CACHE_INVALIDATION_LISTEN: bool = True  # LISTEN/NOTIFY score events across workers
+
+    # Live class dashboard (see services/live_class.py)
+    LIVE_DASHBOARD_ENABLED: bool = True
+    LIVE_MAX_CONNECTIONS: int = 200  # per worker
+    LIVE_QUEUE_SIZE: int = 256  # queued deltas per connection before a resync
+    LIVE_HEARTBEAT_SECONDS: float = 15.0
+    LIVE_SEND_TIMEOUT: float = 5.0  # a WebSocket send slower than this disconnects
+
+    # Startup
+    DB_CREATE_TABLES: bool = True  # False when the schema is managed by migrations
+    DB_POOL_PREWARM: int = 4  # connections opened concurrently after boot
+    WARMUP_RETRY_SECONDS: float = 5.0  # between retries of a failed pool warmup; /ready stays 503
+
+    # Tenant sharding (see database/shards.py)
+    DATABASE_SHARDS: str = ""  # "name=url;name=url"; DATABASE_URL is shard "default"
+    DEFAULT_TENANT: str = "default"  # tenant of the default shard's public schema
+    TENANT_DIRECTORY_REFRESH: float = 5.0  # seconds a worker trusts its directory
+    DB_SHARD_POOL_SIZE: int = 5  # per additional shard
+    DB_SHARD_MAX_OVERFLOW: int = 10
+
+    # Sampling profiler (see middleware/profiling.py)
+    PROFILING_ENABLED: bool = False
+    PROFILING_TOKEN: str = ""  # value of X-Profile that forces a profile
+    PROFILING_SAMPLE_RATE: float = 0.0  # fraction of requests profiled
+    PROFILING_INTERVAL_MS: float = 5.0
+    PROFILING_OUTPUT_DIR: str = "profiles"
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
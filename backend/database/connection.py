@@ -1,38 +1,105 @@
 """
-PostgreSQL async connection using SQLAlchemy 2.0 + asyncpg.
+PostgreSQL async connection using SQLAlchemy 2.0 + asyncpg, one engine per shard
+(database/shards.py).
 """
 
+import asyncio
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import Column, event, inspect
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from config import get_settings
+from database import shards
+from services import metrics, sql_profiler
 
 settings = get_settings()
 
-# Convert DATABASE_URL to async driver format
-# Railway/Supabase give postgresql:// but asyncpg needs postgresql+asyncpg://
-db_url = settings.DATABASE_URL
-if db_url.startswith("postgres://"):
-    db_url = db_url.replace("postgres://", "postgresql+asyncpg://", 1)
-elif db_url.startswith("postgresql://"):
-    db_url = db_url.replace("postgresql://", "postgresql+asyncpg://", 1)
-
-# Async engine
-engine = create_async_engine(
-    db_url,
-    echo=settings.DEBUG,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,
-)
 
-# Session factory
+def _async_url(url: str) -> str:
+    # Railway/Supabase give postgresql:// but asyncpg needs postgresql+asyncpg://
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+
+class _TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waits."""
+
+    shard = shards.DEFAULT_SHARD
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.DB_POOL_WAIT_SECONDS.labels(self.shard).observe(time.perf_counter() - start)
+
+
+def _query_start(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _query_end(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    metrics.record_query(elapsed)
+    sql_profiler.record(statement, elapsed)
+
+
+def create_engine_for(shard: str, url: str, pool_size: int, max_overflow: int) -> AsyncEngine:
+    """An engine with its own pool, timed and profiled like the default one."""
+    # A subclass per shard, since pool.recreate() (dispose) builds from the class
+    pool = type(f"_TimedQueuePool_{shard}", (_TimedQueuePool,), {"shard": shard})
+    shard_engine = create_async_engine(
+        _async_url(url),
+        echo=settings.DEBUG,
+        poolclass=pool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_pre_ping=True,
+    )
+    event.listen(shard_engine.sync_engine, "before_cursor_execute", _query_start)
+    event.listen(shard_engine.sync_engine, "after_cursor_execute", _query_end)
+    return shard_engine
+
+
+# Async engine: the default shard
+engine = create_engine_for(shards.DEFAULT_SHARD, settings.DATABASE_URL, 10, 20)
+
+shard_engines: Dict[str, AsyncEngine] = {shards.DEFAULT_SHARD: engine}
+for _name, _url in shards.parse_shards(settings.DATABASE_SHARDS).items():
+    shard_engines[_name] = create_engine_for(
+        _name, _url, settings.DB_SHARD_POOL_SIZE, settings.DB_SHARD_MAX_OVERFLOW
+    )
+
+router = shards.ShardRouter(shard_engines)
+
+
+def _collect_pool_metrics() -> None:
+    for name, shard_engine in shard_engines.items():
+        pool = shard_engine.pool
+        metrics.DB_POOL.set((name, "checked_out"), pool.checkedout())
+        metrics.DB_POOL.set((name, "checked_in"), pool.checkedin())
+        metrics.DB_POOL.set((name, "overflow"), max(pool.overflow(), 0))
+        metrics.DB_POOL.set((name, "size"), pool.size())
+
+
+metrics.register_collector(_collect_pool_metrics)
+
+# Session factory: sessions bind to the current tenant's shard when entered
 async_session = async_sessionmaker(
     engine,
-    class_=AsyncSession,
+    class_=shards.TenantSession,
+    router=router,
     expire_on_commit=False,
 )
 
@@ -55,14 +122,95 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
-async def init_db():
-    """Create all tables on startup."""
+def _missing_tables(sync_conn, schema: Optional[str] = None, extra=()) -> list[str]:
+    existing = set(inspect(sync_conn).get_table_names(schema=schema))
+    return [name for name in [*Base.metadata.tables, *extra] if name not in existing]
+
+
+def _missing_columns(sync_conn, schema: Optional[str] = None) -> list[Column]:
+    """Nullable model columns added since their (existing) table was created."""
+    inspector = inspect(sync_conn)
+    existing = set(inspector.get_table_names(schema=schema))
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name in existing:
+            have = {c["name"] for c in inspector.get_columns(table.name, schema=schema)}
+            missing += [c for c in table.columns if c.name not in have and c.nullable]
+    return missing
+
+
+def _add_columns(sync_conn, columns: list[Column], schema: Optional[str] = None) -> list[str]:
+    prefix = f'"{schema}".' if schema else ""
+    for column in columns:
+        sync_conn.exec_driver_sql(
+            f'ALTER TABLE {prefix}"{column.table.name}" '
+            f'ADD COLUMN "{column.name}" {column.type.compile(sync_conn.dialect)}'
+        )
+    return [f"{column.table.name}.{column.name}" for column in columns]
+
+
+async def init_db() -> list[str]:
+    """
+    Create missing tables, and nullable columns added to existing ones, on
+    startup; returns their names ("table" / "table.column"). A current
+    schema costs catalog queries and no DDL; DB_CREATE_TABLES=false skips
+    even those. Covers the default tenant and the tenant directory; other
+    tenants' schemas are provisioned by jobs/tenants.py.
+    """
+    if not settings.DB_CREATE_TABLES:
+        print("✓ PostgreSQL schema management disabled, DDL skipped")
+        return []
+
     async with engine.begin() as conn:
+        missing = await conn.run_sync(_missing_tables, None, shards.directory_metadata.tables)
+        columns = await conn.run_sync(_missing_columns)
+        if not missing and not columns:
+            print("✓ PostgreSQL schema current, DDL skipped")
+            return []
         await conn.run_sync(Base.metadata.create_all)
-    print("✓ PostgreSQL tables created")
+        await conn.run_sync(shards.directory_metadata.create_all)
+        missing += await conn.run_sync(_add_columns, columns)
+    print(f"✓ PostgreSQL tables/columns created: {', '.join(missing)}")
+    return missing
+
+
+async def init_tenant_schema(tenant: str, shard: str) -> list[str]:
+    """
+    Create `tenant`'s schema on `shard` and any tables or nullable columns
+    it's missing; returns their names. On SQLite (local development) there
+    are no schemas, so every tenant of a shard shares its tables.
+    """
+    schema = shards.schema_for(tenant)
+    async with shard_engines[shard].begin() as conn:
+        if conn.dialect.name != "postgresql":
+            schema = None
+        elif schema:
+            await conn.exec_driver_sql(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
+            # Unqualified models land in the tenant's schema, checkfirst included
+            conn = await conn.execution_options(schema_translate_map={None: schema})
+        missing = await conn.run_sync(_missing_tables, schema)
+        columns = await conn.run_sync(_missing_columns, schema)
+        if missing:
+            await conn.run_sync(Base.metadata.create_all)
+        missing += await conn.run_sync(_add_columns, columns, schema)
+    return missing
+
+
+async def prewarm_pool(count: int) -> int:
+    """
+    Open `count` pooled connections concurrently so the first requests
+    after boot don't pay for TCP/TLS/auth. Returns the number opened.
+    """
+    count = min(count, engine.pool.size())
+    if count <= 0:
+        return 0
+    conns = await asyncio.gather(*(engine.connect() for _ in range(count)))
+    for conn in conns:
+        await conn.close()
+    return len(conns)
 
 
 async def close_db():
-    """Dispose engine on shutdown."""
-    await engine.dispose()
+    """Dispose every shard's engine on shutdown."""
+    await asyncio.gather(*(shard_engine.dispose() for shard_engine in shard_engines.values()))
     print("✗ PostgreSQL connection closed")
@@ -0,0 +1,111 @@
+"""
+Fast read path — raw asyncpg queries over the shared SQLAlchemy pools.
+
+The hottest student reads skip ORM identity-map and attribute
+instrumentation entirely: connections are borrowed from the existing
+engine pool, statements go through asyncpg's per-connection prepared
+statement cache, and records are mapped straight onto response models.
+
+Enabled with the FAST_READ_PATH setting.
+"""
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+from asyncpg import Connection, Record
+
+from database import shards
+from database.connection import router
+from models.assignment_model import (
+    AssignmentResultResponse,
+    ScoreBreakdown,
+    RadarScores,
+)
+
+
+RESULT_SQL = """
+SELECT id, status,
+       concept_clarity, application, logical_consistency, depth, final_score,
+       radar_clarity, radar_application, radar_logic,
+       radar_critical_thinking, radar_retention,
+       weak_topics, recommendations, followup_questions,
+       ai_dependency_score, created_at
+FROM assignments
+WHERE id = $1 AND student_id = $2
+"""
+
+# Column order matches the tuple unpacking in routes.student._build_dashboard
+DASHBOARD_SQL = """
+SELECT final_score, ai_dependency_score, weak_topics, created_at
+FROM assignments
+WHERE student_id = $1
+ORDER BY created_at ASC
+"""
+
+
+@asynccontextmanager
+async def raw_connection() -> AsyncIterator[Connection]:
+    """
+    Borrow a pooled connection from the current tenant's shard and expose
+    the underlying asyncpg driver connection. For a tenant schema the reads
+    run in a read-only transaction with SET LOCAL search_path, which ends
+    with it, so no schema outlives the borrow; a connection that fails
+    meanwhile is invalidated rather than returned to the pool. JSON codecs
+    installed by the SQLAlchemy dialect stay in place, so JSON columns
+    arrive decoded.
+    """
+    route = await router.resolve(shards.current())
+    async with router.engines[route.shard].connect() as conn:
+        raw = (await conn.get_raw_connection()).driver_connection
+        if route.schema is None:
+            yield raw
+            return
+        try:
+            async with raw.transaction(readonly=True):
+                await raw.execute(f'SET LOCAL search_path TO "{route.schema}"')
+                yield raw
+        except BaseException:
+            await conn.invalidate()
+            raise
+
+
+def record_to_result(r: Record) -> AssignmentResultResponse:
+    """Map a RESULT_SQL record onto the response model."""
+    return AssignmentResultResponse(
+        assignment_id=r["id"],
+        status=r["status"],
+        scores=ScoreBreakdown(
+            concept_clarity=r["concept_clarity"],
+            application=r["application"],
+            logical_consistency=r["logical_consistency"],
+            depth=r["depth"],
+            final_score=r["final_score"],
+        ),
+        radar_scores=RadarScores(
+            clarity=r["radar_clarity"],
+            application=r["radar_application"],
+            logic=r["radar_logic"],
+            critical_thinking=r["radar_critical_thinking"],
+            retention=r["radar_retention"],
+        ),
+        weak_topics=r["weak_topics"] or [],
+        recommendations=r["recommendations"] or [],
+        followup_questions=r["followup_questions"] or [],
+        ai_dependency_score=r["ai_dependency_score"],
+        created_at=r["created_at"].isoformat() if r["created_at"] else "",
+    )
+
+
+async def fetch_result(
+    assignment_id: int, student_id: int
+) -> Optional[AssignmentResultResponse]:
+    """Return one assignment result owned by the student, or None."""
+    async with raw_connection() as conn:
+        row = await conn.fetchrow(RESULT_SQL, assignment_id, student_id)
+    return record_to_result(row) if row else None
+
+
+async def fetch_dashboard_rows(student_id: int) -> List[Record]:
+    """Return (final_score, ai_dependency_score, weak_topics, created_at) rows."""
+    async with raw_connection() as conn:
+        return await conn.fetch(DASHBOARD_SQL, student_id)
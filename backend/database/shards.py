@@ -0,0 +1,244 @@
+"""
+Tenant sharding — route each school's sessions to the database holding it.
+
+Every school is a tenant. Tenants live on shards: "default" is
+DATABASE_URL, more are listed in DATABASE_SHARDS ("name=url;name=url"),
+each with its own engine and connection pool. On a shard, every tenant has
+its own Postgres schema (tenant_<name>), so models and queries are the
+same for everyone and tenants sharing a shard never see each other's
+rows. DEFAULT_TENANT keeps the public schema of the default shard, which
+is where a single-school deployment already keeps its data.
+
+tenant_directory, on the default shard, maps tenant -> (shard, read_only).
+Each worker caches it and reloads it at most every
+TENANT_DIRECTORY_REFRESH seconds; read_only is set while the tenant is
+being moved (jobs/tenants.py), and writes then fail with TenantReadOnly.
+
+The current tenant is a context variable. middleware/tenant.py sets it per
+request from the JWT "tenant" claim (X-Tenant before login); CLI jobs run
+as DEFAULT_TENANT unless given --tenant or --all-tenants
+(add_tenant_arguments). Sessions from database.connection.async_session are
+TenantSessions: entering one binds it to the tenant's shard, and every
+transaction sets search_path to the tenant's schema.
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import Boolean, Column, DateTime, MetaData, String, Table, event, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from config import get_settings
+
+settings = get_settings()
+
+DEFAULT_SHARD = "default"
+TENANT_NAME = re.compile(r"^[a-z0-9_]{1,40}$")
+
+# Kept out of Base.metadata, which is created once per tenant schema
+directory_metadata = MetaData()
+tenant_directory = Table(
+    "tenant_directory",
+    directory_metadata,
+    Column("tenant", String(40), primary_key=True),
+    Column("shard", String(40), nullable=False),
+    Column("read_only", Boolean, nullable=False, default=False),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now(), onupdate=func.now()),
+)
+
+
+class UnknownTenant(Exception):
+    """The tenant isn't in the directory (or names an unconfigured shard)."""
+
+
+class TenantReadOnly(Exception):
+    """The tenant is being moved; writes are refused until it lands."""
+
+    def __init__(self, tenant: str):
+        super().__init__(f"Tenant {tenant!r} is read-only while it moves between shards.")
+        self.retry_after = max(1, int(settings.TENANT_DIRECTORY_REFRESH))
+
+
+class Route(NamedTuple):
+    shard: str
+    schema: Optional[str]  # None: the public schema
+    read_only: bool
+
+
+# ---------- Current tenant ----------
+
+_tenant: ContextVar[str] = ContextVar("tenant", default=settings.DEFAULT_TENANT)
+
+
+def current() -> str:
+    return _tenant.get()
+
+
+@contextmanager
+def use(tenant: str) -> Iterator[None]:
+    """Run a block as `tenant`; tasks created inside inherit it."""
+    token = _tenant.set(tenant)
+    try:
+        yield
+    finally:
+        _tenant.reset(token)
+
+
+def schema_for(tenant: str) -> Optional[str]:
+    return None if tenant == settings.DEFAULT_TENANT else f"tenant_{tenant}"
+
+
+def parse_shards(spec: str) -> Dict[str, str]:
+    """DATABASE_SHARDS "name=url;name=url" -> {name: url}."""
+    shards = {}
+    for entry in filter(None, (e.strip() for e in spec.split(";"))):
+        name, sep, url = entry.partition("=")
+        if not sep or not TENANT_NAME.match(name.strip()) or name.strip() == DEFAULT_SHARD:
+            raise ValueError(f"Bad DATABASE_SHARDS entry: {entry!r}")
+        shards[name.strip()] = url.strip()
+    return shards
+
+
+# ---------- Directory ----------
+
+
+class ShardRouter:
+    """Shard engines plus the cached tenant directory."""
+
+    def __init__(self, engines: Dict[str, AsyncEngine]):
+        self.engines = engines
+        self._directory: Dict[str, Tuple[str, bool]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def refresh(self) -> None:
+        async with self._lock:
+            await self._load()
+
+    async def _load(self) -> None:
+        async with self.engines[DEFAULT_SHARD].connect() as conn:
+            result = await conn.execute(select(
+                tenant_directory.c.tenant,
+                tenant_directory.c.shard,
+                tenant_directory.c.read_only,
+            ))
+            self._directory = {t: (s, bool(ro)) for t, s, ro in result.all()}
+        self._loaded_at = time.monotonic()
+
+    def _stale(self, tenant: str) -> bool:
+        if self._loaded_at is None:
+            return True
+        age = time.monotonic() - self._loaded_at
+        # Reload when stale; for a tenant we haven't seen, at most once a second
+        return age > settings.TENANT_DIRECTORY_REFRESH or (
+            tenant not in self._directory and age > 1.0
+        )
+
+    async def resolve(self, tenant: str) -> Route:
+        """Where `tenant` lives now. Raises UnknownTenant."""
+        if tenant == settings.DEFAULT_TENANT:
+            return Route(DEFAULT_SHARD, None, False)  # never moves, no lookup
+        if self._stale(tenant):
+            async with self._lock:
+                # Requests queued behind a reload find the directory fresh
+                if self._stale(tenant):
+                    await self._load()
+        entry = self._directory.get(tenant)
+        if entry is None or entry[0] not in self.engines:
+            raise UnknownTenant(tenant)
+        return Route(entry[0], schema_for(tenant), entry[1])
+
+    def tenants(self) -> Dict[str, Tuple[str, bool]]:
+        return dict(self._directory)
+
+
+# ---------- Sessions ----------
+
+
+class _TenantSyncSession(Session):
+    pass
+
+
+class TenantSession(AsyncSession):
+    """An AsyncSession that binds to the current tenant's shard when entered."""
+
+    sync_session_class = _TenantSyncSession
+
+    def __init__(self, bind=None, *, router: ShardRouter, **kw):
+        super().__init__(bind=bind, **kw)
+        self.router = router
+
+    async def __aenter__(self) -> "TenantSession":
+        tenant = current()
+        route = await self.router.resolve(tenant)
+        engine = self.router.engines[route.shard]
+        self.bind = engine
+        self.sync_session.bind = engine.sync_engine
+        self.info["tenant"] = tenant
+        self.info["route"] = route
+        return self
+
+
+@event.listens_for(_TenantSyncSession, "after_begin")
+def _scope_transaction(session, transaction, connection) -> None:
+    route: Optional[Route] = session.info.get("route")
+    if route is None or connection.dialect.name != "postgresql":
+        return
+    if route.read_only:
+        connection.exec_driver_sql("SET TRANSACTION READ ONLY")
+    if route.schema:
+        # Postgres re-plans prepared statements when search_path changes, so
+        # asyncpg's per-connection statement cache is safe across tenants
+        connection.exec_driver_sql(f'SET LOCAL search_path TO "{route.schema}"')
+
+
+def _check_writable(session) -> None:
+    route: Optional[Route] = session.info.get("route")
+    if route is not None and route.read_only:
+        raise TenantReadOnly(session.info["tenant"])
+
+
+@event.listens_for(_TenantSyncSession, "before_flush")
+def _refuse_flush(session, flush_context, instances) -> None:
+    if session.new or session.dirty or session.deleted:
+        _check_writable(session)
+
+
+@event.listens_for(_TenantSyncSession, "do_orm_execute")
+def _refuse_dml(state) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        _check_writable(state.session)
+
+
+# ---------- Jobs ----------
+
+
+def add_tenant_arguments(parser: argparse.ArgumentParser) -> None:
+    """--tenant / --all-tenants for a CLI job."""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--tenant", default=settings.DEFAULT_TENANT, help="tenant to run as")
+    group.add_argument("--all-tenants", action="store_true", help="run for every tenant in turn")
+
+
+async def job_tenants(router: ShardRouter, args: argparse.Namespace) -> List[str]:
+    """The tenants a job run covers. Raises UnknownTenant."""
+    if not args.all_tenants:
+        await router.resolve(args.tenant)
+        return [args.tenant]
+    await router.refresh()
+    return [settings.DEFAULT_TENANT, *sorted(router.tenants())]
+
+
+def tenant_path(path: str, tenant: str) -> str:
+    """`path` for DEFAULT_TENANT, else with the tenant before its extension."""
+    if tenant == settings.DEFAULT_TENANT:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{tenant}{ext}"
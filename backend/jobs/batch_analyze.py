@@ -0,0 +1,307 @@
+"""
+Job — analyze an archive of submissions offline, without HTTP or JWTs.
+
+Input is JSONL or CSV with `student`, `subject` and `text` fields. Each
+record goes through the same pipeline as POST /student/submit-assignment:
+follow-up questions, weak topics, evaluation and AI dependency from
+ai_service, then scoring_service, then book recommendations. Run from
+backend/:
+    python -m jobs.batch_analyze archive.jsonl --output results.jsonl --workers 4
+    python -m jobs.batch_analyze archive.csv --insert [--tenant <name>]  # store as assignments
+
+Stages:
+    read     the input is streamed record by record; each record's
+             analysis starts as it is read, and a bounded queue of
+             analyses (2 × --concurrency) holds the reader back
+    network  at most --concurrency records in AI analysis at once,
+             paced by --rps; one slow record doesn't hold up the next
+    cpu      finished analyses are taken off the queue in input order
+             and handed to a --workers process pool (0 runs them inline)
+             --batch-size records per task, while the AI calls go on
+    write    results are streamed to --output in input order as JSONL,
+             or with --insert bulk-inserted as assignments of --tenant
+             for the `student` (user id or email); score sketches are
+             rebuilt after, and a rescored event (services/invalidation.py)
+             makes every worker drop its analytics snapshots, live
+             aggregates and peer index
+
+Records that fail validation or analysis produce {"line", "error"} output.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import orjson
+from pydantic import TypeAdapter, ValidationError
+
+from database import shards
+from database.connection import async_session, close_db, router
+from models.assignment_model import Assignment, AssignmentSubmit, BookRecommendation
+from services import ai_service, book_catalog, invalidation, score_sketch
+from services.ai_providers.base import AIProviderError
+from services.bulk_import import resolve_students
+from services.scoring_service import score_evaluation
+from jobs.regrade import RequestBudget, call_with_budget
+
+_book_list = TypeAdapter(List[BookRecommendation])
+
+
+def read_records(path: str) -> Iterator[Tuple[int, dict]]:
+    """(line number, record) pairs, streamed; unparsable lines become errors."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            for n, row in enumerate(csv.DictReader(f), start=2):
+                yield n, row
+            return
+        for n, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield n, json.loads(line)
+            except ValueError as exc:
+                yield n, {"_error": f"invalid JSON: {exc}"}
+
+
+# ---------- Network stage (event loop) ----------
+
+
+async def analyze_ai(budget: RequestBudget, record: dict) -> dict:
+    """The AI calls for one record; books only when no catalog is configured."""
+    text, subject = record["text"], record["subject"]
+    followups, weak_topics, eval_scores, ai_dep = await asyncio.gather(
+        call_with_budget(budget, ai_service.generate_followup_questions, text),
+        call_with_budget(budget, ai_service.extract_weak_topics, text),
+        call_with_budget(budget, ai_service.evaluate_understanding, text, {}),
+        call_with_budget(budget, ai_service.calculate_ai_dependency, text, {}),
+    )
+    books = None
+    if book_catalog.get_catalog() is None:
+        books = await call_with_budget(budget, ai_service.recommend_books, weak_topics)
+    return {
+        "subject": subject,
+        "followup_questions": followups,
+        "weak_topics": weak_topics,
+        "eval": eval_scores,
+        "ai_dependency_score": ai_dep,
+        "books": books,
+    }
+
+
+# ---------- CPU stage (process pool) ----------
+
+
+def _init_worker() -> None:
+    book_catalog.get_catalog()  # map the catalog once per process
+
+
+def finish_batch(items: List[Tuple[int, dict, dict]]) -> Tuple[bytes, List[dict], int]:
+    """
+    Score and encode a batch. Returns the JSONL block for the output file,
+    the assignment rows for --insert (student still unresolved) and the
+    number of failed records.
+    """
+    lines: List[bytes] = []
+    rows: List[dict] = []
+    catalog = book_catalog.get_catalog()
+    for line_no, record, ai in items:
+        if "error" in ai:
+            lines.append(orjson.dumps({"line": line_no, "error": ai["error"]}))
+            continue
+        try:
+            e = ai["eval"]
+            scored = score_evaluation(e, ai["subject"])
+            books = ai["books"] if ai["books"] is not None else catalog.recommend(ai["weak_topics"])
+            recommendations = _book_list.dump_python(_book_list.validate_python(books))
+            result = {
+                "line": line_no,
+                "student": record.get("student"),
+                "subject": ai["subject"],
+                "followup_questions": ai["followup_questions"],
+                "scores": scored.scores.model_dump(),
+                "radar_scores": scored.radar.model_dump(),
+                "weak_topics": ai["weak_topics"],
+                "recommendations": recommendations,
+                "ai_dependency_score": ai["ai_dependency_score"],
+            }
+            encoded = orjson.dumps(result)
+            row = {
+                "line": line_no,
+                "student": record.get("student"),
+                "text": record["text"],
+                "subject": ai["subject"],
+                "followup_questions": ai["followup_questions"],
+                "student_responses": {},
+                **scored.columns(),
+                "weak_topics": ai["weak_topics"],
+                "recommendations": recommendations,
+                "ai_dependency_score": ai["ai_dependency_score"],
+                "status": "analyzed",
+            }
+        except Exception as exc:  # one malformed record must not abort the run
+            lines.append(orjson.dumps({"line": line_no, "error": f"scoring failed: {exc!r}"}))
+            continue
+        lines.append(encoded)
+        rows.append(row)
+    return b"".join(line + b"\n" for line in lines), rows, len(items) - len(rows)
+
+
+# ---------- Pipeline ----------
+
+
+async def run(
+    source: str,
+    output: Optional[str],
+    insert: bool,
+    workers: int,
+    concurrency: int,
+    rps: float,
+    batch_size: int,
+    quiet: bool = False,
+) -> Dict[str, float]:
+    """Analyze `source`; returns counters (records, errors, inserted, seconds)."""
+    budget = RequestBudget(rps)
+    gate = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) if workers else None
+    out = open(output, "wb") if output else (None if insert else sys.stdout.buffer)
+    students: Dict[str, Optional[int]] = {}
+    stats = {"records": 0, "errors": 0, "inserted": 0}
+    pending: deque = deque()  # CPU-stage futures, in input order
+    started = time.perf_counter()
+
+    async def one(line_no: int, record: dict) -> Tuple[int, dict, dict]:
+        if "_error" in record:
+            return line_no, record, {"error": record["_error"]}
+        try:
+            payload = AssignmentSubmit(
+                text=record.get("text") or "", subject=record.get("subject") or "General"
+            )
+        except ValidationError as exc:
+            return line_no, record, {"error": exc.errors()[0]["msg"]}
+        record = {**record, "text": payload.text, "subject": payload.subject}
+        async with gate:
+            try:
+                return line_no, record, await analyze_ai(budget, record)
+            except AIProviderError as exc:
+                return line_no, record, {"error": f"AI analysis failed: {exc}"}
+
+    async def drain(block: bytes, rows: List[dict], errors: int) -> None:
+        stats["errors"] += errors
+        if out is not None:
+            out.write(block)
+        if insert and rows:
+            await resolve_students([str(r["student"]) for r in rows], students)
+            values = []
+            for r in rows:
+                student_id = students.get(str(r["student"]))
+                if student_id is None:
+                    stats["errors"] += 1
+                    print(f"  ✗ line {r['line']}: unknown student {r['student']!r}", file=sys.stderr)
+                    continue
+                values.append({
+                    k: v for k, v in r.items() if k not in ("line", "student")
+                } | {"student_id": student_id})
+            if values:
+                async with async_session() as db:
+                    await db.execute(Assignment.__table__.insert(), values)
+                    await db.commit()
+                stats["inserted"] += len(values)
+
+    analyses: asyncio.Queue = asyncio.Queue(maxsize=max(concurrency, 1) * 2)  # in input order
+
+    async def reader() -> None:
+        for line_no, record in read_records(source):
+            await analyses.put(asyncio.create_task(one(line_no, record)))
+        await analyses.put(None)
+
+    async def cpu_stage(items: List[Tuple[int, dict, dict]]) -> None:
+        stats["records"] += len(items)
+        if executor is None:
+            done = loop.create_future()
+            done.set_result(finish_batch(items))
+            pending.append(done)
+        else:
+            pending.append(loop.run_in_executor(executor, finish_batch, items))
+        # Keep at most one batch per worker queued behind the pool
+        while pending and (pending[0].done() or len(pending) > max(workers, 1)):
+            await drain(*await pending.popleft())
+        if not quiet:
+            elapsed = time.perf_counter() - started
+            print(f"  {stats['records']} records, {stats['records'] / elapsed:.1f}/s", file=sys.stderr)
+
+    reader_task = asyncio.create_task(reader())
+    try:
+        items: List[Tuple[int, dict, dict]] = []
+        while (analysis := await analyses.get()) is not None:
+            items.append(await analysis)
+            if len(items) == batch_size:
+                await cpu_stage(items)
+                items = []
+        if items:
+            await cpu_stage(items)
+        await reader_task
+    finally:
+        reader_task.cancel()
+        while not analyses.empty():
+            if (analysis := analyses.get_nowait()) is not None:
+                analysis.cancel()
+
+    while pending:
+        await drain(*await pending.popleft())
+    if executor is not None:
+        executor.shutdown()
+    if output and out is not None:
+        out.close()
+    if insert and stats["inserted"]:
+        event = invalidation.rescored_event()
+        async with async_session() as db:
+            await score_sketch.rebuild(db)
+            await invalidation.publish(db, event)
+            await db.commit()
+        await invalidation.after_commit(event)
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("source", help=".jsonl or .csv with student, subject, text")
+    parser.add_argument("--output", help="results JSONL (default: stdout unless --insert)")
+    parser.add_argument("--insert", action="store_true", help="store results as assignments")
+    parser.add_argument("--workers", type=int, default=4, help="CPU-stage processes; 0 = inline")
+    parser.add_argument("--concurrency", type=int, default=32, help="records in AI analysis at once")
+    parser.add_argument("--rps", type=float, default=0, help="AI calls per second; 0 = unpaced")
+    parser.add_argument("--batch-size", type=int, default=64, help="records per CPU-stage task")
+    shards.add_tenant_arguments(parser)
+    args = parser.parse_args()
+    if args.all_tenants:
+        parser.error("an archive is analyzed for one tenant; use --tenant")
+    try:
+        tenant = (await shards.job_tenants(router, args))[0]
+        with shards.use(tenant):
+            stats = await run(
+                args.source, args.output, args.insert, args.workers,
+                args.concurrency, args.rps, args.batch_size,
+            )
+    except shards.UnknownTenant as exc:
+        raise SystemExit(f"Unknown tenant: {exc}")
+    finally:
+        await ai_service.close_provider()
+        await close_db()
+    print(
+        f"Analyzed {stats['records']} records in {stats['seconds']:.2f}s "
+        f"({stats['records'] / max(stats['seconds'], 1e-9):.1f}/s), {stats['errors']} errors"
+        + (f", {stats['inserted']} inserted" if args.insert else ""),
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,46 @@
+"""
+Job — compile a book catalog for services/book_catalog.py.
+
+Reads JSONL ({"title", "author", "topics": [...]}) or CSV (title, author,
+topics with topics separated by ';') and writes the memory-mappable
+catalog file. Run from backend/:
+    python -m jobs.build_book_catalog data/books.jsonl data/books.catalog
+then set BOOK_CATALOG_PATH=data/books.catalog.
+"""
+
+import argparse
+import csv
+import json
+import time
+from typing import Iterator
+
+from services import book_catalog
+
+
+def _read(path: str) -> Iterator[dict]:
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            for row in csv.DictReader(f):
+                row["topics"] = [t for t in (row.get("topics") or "").split(";")]
+                yield row
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("source", help=".jsonl or .csv book list")
+    parser.add_argument("output", help="compiled catalog path")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    written = book_catalog.build(_read(args.source), args.output)
+    catalog = book_catalog.BookCatalog(args.output)
+    print(f"Compiled {written} books ({catalog.n_terms} terms) into "
+          f"{args.output} in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
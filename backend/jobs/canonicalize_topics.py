@@ -0,0 +1,105 @@
+"""
+Job — rewrite stored weak_topics to their canonical names.
+
+Walks the assignments table in id order, CHUNK_SIZE rows at a time
+(keyset pagination, so each chunk is one index range scan), runs every
+topic list through services/topic_taxonomy.py and updates only the rows
+that change. Each chunk commits on its own, so the job can be stopped and
+rerun at any time; --start-after resumes from a printed id. Run from
+backend/:
+    python -m jobs.canonicalize_topics [--chunk-size 1000] [--dry-run]
+                                       [--tenant <name> | --all-tenants]
+
+When a tenant's last chunk is written, a rescored event
+(services/invalidation.py) makes every worker drop its analytics
+snapshots and live aggregates, so they pick the new names up at once.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Tuple
+
+from sqlalchemy import bindparam, select, update
+
+from database import shards
+from database.connection import async_session, close_db, router
+from models.assignment_model import Assignment
+from services import invalidation
+from services.topic_taxonomy import canonicalize, canonicalize_all
+
+
+_UPDATE = (
+    update(Assignment.__table__)
+    .where(Assignment.__table__.c.id == bindparam("row_id"))
+    .values(weak_topics=bindparam("topics"))
+)
+
+
+async def canonicalize_tenant(start_after: int, chunk_size: int, dry_run: bool) -> Tuple[int, int]:
+    """Canonicalize the current tenant's assignments; returns (scanned, changed)."""
+    last_id, scanned, changed = start_after, 0, 0
+    while True:
+        async with async_session() as db:
+            result = await db.execute(
+                select(Assignment.id, Assignment.weak_topics)
+                .where(Assignment.id > last_id)
+                .order_by(Assignment.id)
+                .limit(chunk_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            updates = []
+            for row_id, topics in rows:
+                canonical = canonicalize_all(topics or [])
+                if canonical != (topics or []):
+                    updates.append({"row_id": row_id, "topics": canonical})
+            if updates and not dry_run:
+                await db.execute(_UPDATE, updates)
+                await db.commit()
+        last_id = rows[-1][0]
+        scanned += len(rows)
+        changed += len(updates)
+        print(f"  through id {last_id}: {scanned} scanned, {changed} changed")
+
+    if changed and not dry_run:
+        event = invalidation.rescored_event()
+        async with async_session() as db:
+            await invalidation.publish(db, event)
+            await db.commit()
+        await invalidation.after_commit(event)
+    return scanned, changed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--start-after", type=int, default=0, help="resume after this assignment id")
+    parser.add_argument("--dry-run", action="store_true", help="count changes without writing")
+    shards.add_tenant_arguments(parser)
+    args = parser.parse_args()
+    if args.all_tenants and args.start_after:
+        parser.error("--start-after resumes a single tenant")
+
+    started = time.perf_counter()
+    scanned = changed = 0
+    try:
+        for tenant in await shards.job_tenants(router, args):
+            print(f"Tenant {tenant}")
+            with shards.use(tenant):
+                n, c = await canonicalize_tenant(args.start_after, args.chunk_size, args.dry_run)
+            scanned += n
+            changed += c
+    except shards.UnknownTenant as exc:
+        raise SystemExit(f"Unknown tenant: {exc}")
+    finally:
+        await close_db()
+    hits = canonicalize.cache_info()
+    print(f"{'Would change' if args.dry_run else 'Changed'} {changed} of {scanned} "
+          f"assignments in {time.perf_counter() - started:.2f}s "
+          f"(topic cache {hits.hits} hits / {hits.misses} misses)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,38 @@
+"""
+Job — rebuild every score sketch from the assignments table.
+
+Needed after bulk changes that bypass the request write paths (backfills,
+re-scores, restores). Run from backend/:
+    python -m jobs.rebuild_sketches [--tenant <name> | --all-tenants]
+"""
+
+import argparse
+import asyncio
+import time
+
+from database import shards
+from database.connection import async_session, close_db, router
+from services import score_sketch
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    shards.add_tenant_arguments(parser)
+    args = parser.parse_args()
+    try:
+        for tenant in await shards.job_tenants(router, args):
+            started = time.perf_counter()
+            with shards.use(tenant):
+                async with async_session() as db:
+                    counted = await score_sketch.rebuild(db)
+                    await db.commit()
+            print(f"Rebuilt {tenant}'s score sketches from {counted} assignments "
+                  f"in {time.perf_counter() - started:.2f}s")
+    except shards.UnknownTenant as exc:
+        raise SystemExit(f"Unknown tenant: {exc}")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
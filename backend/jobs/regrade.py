@@ -0,0 +1,343 @@
+"""
+Job — re-run the AI analysis over stored assignments.
+
+For every assignment it calls extract_weak_topics again (plus
+recommend_books when no book catalog is configured) and re-evaluates the
+follow-up answers through services/followup_eval.py — one evaluation per
+answer, recombined as /submit-followup does — then rescores with the
+active weight profile. Use it after switching AI_PROVIDER or bumping
+AI_PROMPT_VERSION; both are part of the per-answer cache key, so cached
+evaluations from the old provider or prompts are not reused. Run from
+backend/:
+    python -m jobs.regrade [--concurrency 8] [--rps 5] [--batch-size 50]
+                           [--tenant <name> | --all-tenants]
+
+Pipeline:
+    reader    streams rows in id order through a server-side cursor into
+              a bounded queue, so memory stays flat and the cursor only
+              advances as fast as the workers drain it
+    workers   --concurrency analyses in flight; every AI call first takes
+              a token from a --rps budget. A 429 pauses every worker for
+              its Retry-After; errors retry with backoff, then the row is
+              recorded as failed.
+    writer    results are written --batch-size rows per transaction
+
+Resumable: after each committed batch the checkpoint records the highest
+id below which every row is finished, plus the finished ids above it. A
+restarted run skips both; each tenant has its own checkpoint file
+(shards.tenant_path). Ids that failed are kept in the checkpoint and
+listed at the end; the next run retries them first. Progress lines
+report throughput and ETA. When the run completes, score sketches are
+rebuilt and a rescored event (services/invalidation.py) makes every
+worker drop its analytics snapshots, live aggregates and peer index; an
+interrupted run publishes it when rerun to completion.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import os
+import time
+from typing import List, Set
+
+from sqlalchemy import bindparam, func, select, update
+
+from config import get_settings
+from database import shards
+from database.connection import async_session, close_db, router
+from models.assignment_model import Assignment
+from services import ai_service, book_catalog, followup_eval, invalidation, score_sketch
+from services.ai_providers.base import AIProviderError, AIRateLimited
+from services.rate_limit import InMemoryRateLimitBackend
+from services.scoring_service import score_evaluation
+
+settings = get_settings()
+
+MAX_ATTEMPTS = 4
+_DONE = object()
+
+_table = Assignment.__table__
+_UPDATE = (
+    update(_table)
+    .where(_table.c.id == bindparam("row_id"))
+    .values({
+        column: bindparam(column)
+        for column in (
+            "concept_clarity", "application", "logical_consistency", "depth",
+            "final_score", "scoring_profile", "radar_clarity", "radar_application", "radar_logic",
+            "radar_critical_thinking", "radar_retention", "weak_topics",
+            "recommendations", "ai_dependency_score",
+        )
+    })
+)
+
+
+class RequestBudget:
+    """Paces AI calls to `rps` (<= 0: unpaced), and pauses everyone after a 429."""
+
+    def __init__(self, rps: float):
+        self.rps = rps
+        self._bucket = InMemoryRateLimitBackend()
+        self._paused_until = 0.0
+        self.calls = 0
+        self.rate_limited = 0
+
+    async def acquire(self) -> None:
+        while True:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            if self.rps <= 0:
+                self.calls += 1
+                return
+            wait = await self._bucket.take("regrade", self.rps, max(1.0, self.rps))
+            if wait <= 0:
+                self.calls += 1
+                return
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        self.rate_limited += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class Progress:
+    """Done-set bookkeeping and the resumable checkpoint file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.low_water = 0  # every id <= low_water is finished
+        self.done_above: Set[int] = set()
+        self.failed: Set[int] = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            self.low_water = saved["last_id"]
+            self.done_above = set(saved["done_above"])
+            self.failed = set(saved["failed"])
+            print(f"Resuming after assignment id {self.low_water} "
+                  f"({len(self.done_above)} more done, {len(self.failed)} failed)")
+        self._dispatched: List[int] = []  # ids not yet below the low-water mark
+
+    def skip(self, row_id: int) -> bool:
+        return row_id in self.done_above
+
+    def dispatch(self, row_id: int) -> None:
+        self._dispatched.append(row_id)
+
+    def finish(self, ids: List[int]) -> None:
+        self.done_above.update(ids)
+        # Streamed ids are dispatched in ascending order (retried failures,
+        # all below the mark, go first), so the mark can move up to just
+        # below the first dispatched id that hasn't finished
+        pending = [i for i in self._dispatched if i not in self.done_above]
+        bound = pending[0] if pending else None
+        below = [i for i in self.done_above if bound is None or i < bound]
+        if below:
+            self.low_water = max(self.low_water, max(below))
+            self.done_above.difference_update(below)
+        self._dispatched = pending
+
+    def save(self) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({
+                "last_id": self.low_water,
+                "done_above": sorted(self.done_above),
+                "failed": sorted(self.failed),
+            }, f)
+        os.replace(tmp, self.path)
+
+
+async def call_with_budget(budget: RequestBudget, fn, *args):
+    """One AI call under the budget, retried on 429s and provider errors."""
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        await budget.acquire()
+        try:
+            return await fn(*args)
+        except AIRateLimited as exc:
+            budget.pause(exc.retry_after)
+        except AIProviderError:
+            if attempt == MAX_ATTEMPTS:
+                raise
+            await asyncio.sleep(min(2 ** attempt, 30))
+    raise AIProviderError(f"{fn.__name__} still rate limited after {MAX_ATTEMPTS} attempts")
+
+
+async def regrade_row(budget: RequestBudget, row) -> dict:
+    """Re-run the submit-time analysis for one assignment; returns UPDATE params."""
+    known = followup_eval.question_ids(row)
+    responses = {qid: answer for qid, answer in (row.student_responses or {}).items() if qid in known}
+    async with async_session() as db:
+        (eval_scores, ai_dep), weak_topics = await asyncio.gather(
+            followup_eval.evaluate(
+                db, row, responses, call=functools.partial(call_with_budget, budget)
+            ),
+            call_with_budget(budget, ai_service.extract_weak_topics, row.text),
+        )
+        await db.commit()
+    if book_catalog.get_catalog() is not None:
+        books = await ai_service.recommend_books(weak_topics)
+    else:
+        books = await call_with_budget(budget, ai_service.recommend_books, weak_topics)
+
+    scored = score_evaluation(eval_scores, row.subject)
+    return {
+        "row_id": row.id,
+        **scored.columns(),
+        "weak_topics": weak_topics,
+        "recommendations": books,
+        "ai_dependency_score": ai_dep,
+    }
+
+
+async def run(concurrency: int, rps: float, batch_size: int, checkpoint: str) -> None:
+    progress = Progress(checkpoint)
+    budget = RequestBudget(rps)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    results: asyncio.Queue = asyncio.Queue()
+
+    async with async_session() as db:
+        total = (await db.execute(
+            select(func.count(Assignment.id)).where(Assignment.id > progress.low_water)
+        )).scalar() or 0
+    total += len(progress.failed) - len(progress.done_above)
+    print(f"Regrading {total} assignments: concurrency {concurrency}, "
+          f"{rps:g} AI calls/s, batches of {batch_size}")
+
+    async def reader() -> None:
+        columns = (
+            Assignment.id, Assignment.subject, Assignment.text,
+            Assignment.followup_questions, Assignment.student_responses,
+        )
+        async with async_session() as db:
+            # Failures from an earlier run first; they sit below the low-water mark
+            if progress.failed:
+                retry = await db.execute(
+                    select(*columns)
+                    .where(Assignment.id.in_(sorted(progress.failed)))
+                    .order_by(Assignment.id)
+                )
+                for row in retry.all():
+                    progress.dispatch(row.id)
+                    await queue.put(row)
+            rows = await db.stream(
+                select(*columns)
+                .where(Assignment.id > progress.low_water)
+                .order_by(Assignment.id)
+                .execution_options(yield_per=max(100, batch_size))
+            )
+            async for row in rows:
+                if progress.skip(row.id):
+                    continue
+                progress.dispatch(row.id)
+                await queue.put(row)
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def worker() -> None:
+        while (row := await queue.get()) is not None:
+            try:
+                results.put_nowait(await regrade_row(budget, row))
+            except Exception as exc:  # provider errors and malformed results alike
+                print(f"  ✗ assignment {row.id}: {exc!r}")
+                results.put_nowait({"row_id": row.id, "failed": True})
+
+    started = time.perf_counter()
+    written = failed = 0
+
+    async def writer() -> None:
+        nonlocal written, failed
+        batch: List[dict] = []
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = await asyncio.wait_for(results.get(), 2.0)
+            except asyncio.TimeoutError:
+                item = None
+            if item is _DONE:
+                break
+            if item is not None:
+                batch.append(item)
+            if batch and (len(batch) >= batch_size or time.monotonic() - last_flush >= 2.0):
+                await flush(batch)
+                batch = []
+                last_flush = time.monotonic()
+        if batch:
+            await flush(batch)
+
+    async def flush(batch: List[dict]) -> None:
+        nonlocal written, failed
+        ok = [r for r in batch if not r.get("failed")]
+        if ok:
+            async with async_session() as db:
+                await db.execute(_UPDATE, ok)
+                await db.commit()
+        bad = [r["row_id"] for r in batch if r.get("failed")]
+        progress.failed.update(bad)
+        progress.failed.difference_update(r["row_id"] for r in ok)
+        progress.finish([r["row_id"] for r in batch])
+        progress.save()
+        written += len(ok)
+        failed += len(bad)
+
+        elapsed = time.perf_counter() - started
+        rate = (written + failed) / elapsed
+        remaining = total - written - failed
+        eta = remaining / rate if rate else float("inf")
+        print(f"  {written + failed}/{total} done ({failed} failed), "
+              f"{rate:.1f} rows/s, {budget.calls / elapsed:.1f} AI calls/s, "
+              f"ETA {eta / 60:.1f} min, {budget.rate_limited} × 429")
+
+    writer_task = asyncio.create_task(writer())
+    await asyncio.gather(reader(), *(worker() for _ in range(concurrency)))
+    results.put_nowait(_DONE)
+    await writer_task
+
+    event = invalidation.rescored_event()
+    async with async_session() as db:
+        await score_sketch.rebuild(db)
+        await invalidation.publish(db, event)
+        await db.commit()
+    await invalidation.after_commit(event)
+    elapsed = time.perf_counter() - started
+    print(f"Regraded {written} assignments in {elapsed:.1f}s "
+          f"({written / max(elapsed, 1e-9):.1f} rows/s); score sketches rebuilt")
+    if progress.failed:
+        print(f"{len(progress.failed)} failed; rerun to retry: {sorted(progress.failed)[:50]}")
+    else:
+        with contextlib.suppress(FileNotFoundError):  # nothing was flushed
+            os.remove(checkpoint)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--concurrency", type=int, default=settings.REGRADE_CONCURRENCY)
+    parser.add_argument("--rps", type=float, default=settings.REGRADE_RPS, help="AI calls per second")
+    parser.add_argument("--batch-size", type=int, default=50, help="rows per write transaction")
+    parser.add_argument("--checkpoint", default="regrade.checkpoint.json")
+    shards.add_tenant_arguments(parser)
+    args = parser.parse_args()
+    try:
+        for tenant in await shards.job_tenants(router, args):
+            print(f"Tenant {tenant}")
+            with shards.use(tenant):
+                await run(
+                    args.concurrency, args.rps, args.batch_size,
+                    shards.tenant_path(args.checkpoint, tenant),
+                )
+    except shards.UnknownTenant as exc:
+        raise SystemExit(f"Unknown tenant: {exc}")
+    finally:
+        await ai_service.close_provider()
+        await close_db()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("Interrupted; rerun to resume from the checkpoint")
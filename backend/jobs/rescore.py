@@ -0,0 +1,253 @@
+"""
+Job — recompute final_score for every assignment from its stored
+component scores, using the currently selected weight profiles.
+
+Run after changing SCORING_PROFILE / SCORING_SUBJECT_PROFILES. From backend/:
+    python -m jobs.rescore [--chunk-size 5000] [--dry-run] [--tenant <name> | --all-tenants]
+
+Rows are read in id order with keyset pagination. Each chunk is scored in
+one NumPy pass: subjects map to profiles through np.unique, the component
+matrix is weighted by a per-row weight matrix and rounded with np.round,
+the rule scoring_service.round_score applies to single submissions. Rows
+whose score or scoring_profile changes are written, with a single
+UPDATE … FROM (VALUES …) statement per chunk, and each chunk commits on
+its own.
+
+Auditable: every written row records the profile it was scored with in
+scoring_profile, and the run prints the row count per profile before and
+after (--dry-run prints the audit without writing). Resumable: the last
+committed id is saved to --checkpoint together with the profile
+selection (one file per tenant, shards.tenant_path). Rerunning with the
+same selection continues from there, and the file is removed when the
+job finishes. The score sketches are rebuilt
+at the end, since the distributions moved, and a rescored event
+(services/invalidation.py) makes every worker drop its analytics
+snapshots, live aggregates and peer index.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from sqlalchemy import func, select, text
+
+from config import get_settings
+from database import shards
+from database.connection import async_session, close_db, router
+from models.assignment_model import Assignment
+from services import invalidation, score_sketch
+from services.scoring_service import get_profile, subject_profiles
+
+if TYPE_CHECKING:
+    import numpy as np
+
+COMPONENTS = (
+    Assignment.concept_clarity,
+    Assignment.application,
+    Assignment.logical_consistency,
+    Assignment.depth,
+)
+
+
+def _selection() -> Dict[str, str]:
+    """The profile selection this run applies, for the checkpoint."""
+    settings = get_settings()
+    selection = {"*": get_profile(settings.SCORING_PROFILE).key}
+    selection.update({s: p.key for s, p in subject_profiles().items()})
+    return selection
+
+
+def score_chunk(
+    subjects: List[str], components: "np.ndarray", selection: Dict[str, str]
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Final scores for a chunk of rows of (clarity, application, logic, depth),
+    and the profile key each row was scored with.
+    """
+    import numpy as np
+
+    keys = np.array(sorted(set(selection.values())), dtype=object)
+    weights = np.array([get_profile(k).weights for k in keys])
+    index = {k: i for i, k in enumerate(keys)}
+    # One lookup per distinct subject, then a gather per row
+    names, inverse = np.unique(np.asarray(subjects, dtype=object), return_inverse=True)
+    per_subject = np.array(
+        [index[selection.get(name, selection["*"])] for name in names], dtype=np.intp
+    )
+    rows = per_subject[inverse]
+    w = weights[rows]
+    # Same term order as calculate_final_score
+    raw = (
+        w[:, 0] * components[:, 0]
+        + w[:, 1] * components[:, 1]
+        + w[:, 2] * components[:, 2]
+        + w[:, 3] * components[:, 3]
+    )
+    return np.round(raw, 1), keys[rows]
+
+
+def _update_statement(dialect: str, count: int) -> str:
+    """
+    UPDATE … FROM (VALUES …) for `count` rows with :i<n>/:s<n>/:p<n> params.
+    It bumps updated_at as the ORM would, so a tenant move's sync step
+    (jobs/tenants.py) copies rescored rows.
+    """
+    if dialect == "postgresql":
+        values = ", ".join(
+            f"(CAST(:i{n} AS INTEGER), CAST(:s{n} AS DOUBLE PRECISION), CAST(:p{n} AS VARCHAR))"
+            for n in range(count)
+        )
+        return (
+            "UPDATE assignments AS a SET final_score = v.score, scoring_profile = v.profile, "
+            "updated_at = now() "
+            f"FROM (VALUES {values}) AS v(id, score, profile) WHERE a.id = v.id"
+        )
+    # SQLite names VALUES columns column1, column2, ...
+    values = ", ".join(f"(:i{n}, :s{n}, :p{n})" for n in range(count))
+    return (
+        "UPDATE assignments SET final_score = v.column2, scoring_profile = v.column3, "
+        "updated_at = CURRENT_TIMESTAMP "
+        f"FROM (VALUES {values}) AS v WHERE assignments.id = v.column1"
+    )
+
+
+def _load_checkpoint(path: str, selection: Dict[str, str]) -> int:
+    if not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        saved = json.load(f)
+    if saved.get("selection") != selection:
+        raise SystemExit(
+            f"{path} was written for profiles {saved.get('selection')}; "
+            "remove it to start over with the current selection."
+        )
+    print(f"Resuming after assignment id {saved['last_id']}")
+    return saved["last_id"]
+
+
+def _save_checkpoint(path: str, selection: Dict[str, str], last_id: int) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"selection": selection, "last_id": last_id}, f)
+    os.replace(tmp, path)
+
+
+async def _rescore_chunk(db, last_id: int, chunk_size: int, selection, dry_run: bool) -> Tuple[int, int, int]:
+    """Returns (last id, rows scanned, rows changed)."""
+    import numpy as np
+
+    result = await db.execute(
+        select(Assignment.id, Assignment.subject, Assignment.final_score,
+               Assignment.scoring_profile, *COMPONENTS)
+        .where(Assignment.id > last_id)
+        .order_by(Assignment.id)
+        .limit(chunk_size)
+    )
+    rows = result.all()
+    if not rows:
+        return last_id, 0, 0
+
+    ids, subjects, old, old_profiles, *columns = zip(*rows)
+    ids = np.array(ids, dtype=np.int64)
+    old = np.array(old, dtype=np.float64)  # None -> nan
+    components = np.nan_to_num(np.array(columns, dtype=np.float64).T)
+    new, profiles = score_chunk([s or "General" for s in subjects], components, selection)
+    changed = np.flatnonzero(
+        ~np.isclose(new, old, atol=1e-9) | (profiles != np.array(old_profiles, dtype=object))
+    )
+
+    if len(changed) and not dry_run:
+        params = {}
+        for n, (row_id, score, profile) in enumerate(
+            zip(ids[changed].tolist(), new[changed].tolist(), profiles[changed].tolist())
+        ):
+            params[f"i{n}"] = row_id
+            params[f"s{n}"] = score
+            params[f"p{n}"] = profile
+        await db.execute(text(_update_statement(db.bind.dialect.name, len(changed))), params)
+        await db.commit()
+    return int(ids[-1]), len(rows), len(changed)
+
+
+async def audit() -> Dict[str, int]:
+    """Assignments per scoring_profile ("-" for rows scored before tracking)."""
+    async with async_session() as db:
+        result = await db.execute(
+            select(Assignment.scoring_profile, func.count())
+            .group_by(Assignment.scoring_profile)
+            .order_by(Assignment.scoring_profile)
+        )
+        return {profile or "-": count for profile, count in result.all()}
+
+
+async def rescore_tenant(chunk_size: int, checkpoint: str, selection, dry_run: bool) -> None:
+    """Rescore the current tenant's assignments."""
+    print(f"Assignments per profile: {await audit()}")
+    last_id = 0 if dry_run else _load_checkpoint(checkpoint, selection)
+
+    started = time.perf_counter()
+    scanned = changed = 0
+    while True:
+        chunk_started = time.perf_counter()
+        async with async_session() as db:
+            last_id, n, c = await _rescore_chunk(db, last_id, chunk_size, selection, dry_run)
+        if n == 0:
+            break
+        scanned += n
+        changed += c
+        if not dry_run:
+            _save_checkpoint(checkpoint, selection, last_id)
+        elapsed = time.perf_counter() - started
+        print(
+            f"  through id {last_id}: {scanned} scanned, {changed} changed, "
+            f"{n / (time.perf_counter() - chunk_started):,.0f} rows/s chunk, "
+            f"{scanned / elapsed:,.0f} rows/s overall"
+        )
+
+    elapsed = time.perf_counter() - started
+    if not dry_run:
+        event = invalidation.rescored_event()
+        async with async_session() as db:
+            await score_sketch.rebuild(db)
+            await invalidation.publish(db, event)
+            await db.commit()
+        await invalidation.after_commit(event)
+        print("Rebuilt score sketches; published the rescore to every worker")
+        print(f"Assignments per profile: {await audit()}")
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+    print(
+        f"{'Would change' if dry_run else 'Changed'} {changed} of {scanned} assignments "
+        f"in {elapsed:.2f}s ({scanned / max(elapsed, 1e-9):,.0f} rows/s)"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--chunk-size", type=int, default=5000, help="max 10000 (3 params per row)")
+    parser.add_argument("--checkpoint", default="rescore.checkpoint.json")
+    parser.add_argument("--dry-run", action="store_true", help="count changes without writing")
+    shards.add_tenant_arguments(parser)
+    args = parser.parse_args()
+
+    chunk_size = min(args.chunk_size, 10000)  # asyncpg allows 32767 bind params
+    selection = _selection()
+    print(f"Re-scoring with {selection}")
+    try:
+        for tenant in await shards.job_tenants(router, args):
+            print(f"Tenant {tenant}")
+            with shards.use(tenant):
+                await rescore_tenant(
+                    chunk_size, shards.tenant_path(args.checkpoint, tenant), selection, args.dry_run
+                )
+    except shards.UnknownTenant as exc:
+        raise SystemExit(f"Unknown tenant: {exc}")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
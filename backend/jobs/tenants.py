@@ -0,0 +1,306 @@
+"""
+Job — manage tenants and move them between shards while they stay online.
+
+Run from backend/:
+    python -m jobs.tenants list
+    python -m jobs.tenants add <tenant> [--shard default]
+    python -m jobs.tenants move <tenant> <shard> [--chunk-size 1000] [--drop-source]
+
+add provisions the tenant's schema on a shard (database/shards.py) and
+registers it in tenant_directory; it is idempotent for an existing tenant
+on the same shard, so rerunning it creates tables added since.
+
+move copies the tenant without taking it offline for the bulk of the copy:
+    copy      every table is upserted into the target schema in primary
+              key chunks while the tenant keeps serving reads and writes
+    freeze    the directory marks the tenant read-only; after two refresh
+              intervals (TENANT_DIRECTORY_REFRESH) every worker refuses
+              its writes with a 503 and Retry-After
+    sync      rows deleted, inserted or updated since their table was
+              copied are applied to the target (assignments by updated_at
+              minus --delta-margin, other tables in full), then the
+              target's id sequences are moved past the copied ids
+    switch    the directory points the tenant at the target and clears
+              read-only; workers follow within one refresh interval
+A failure before the switch clears read-only again and leaves the source
+authoritative; the partial target copy is overwritten by the next run.
+The source schema is kept unless --drop-source. DEFAULT_TENANT lives in
+the default shard's public schema and can't be moved.
+"""
+
+import argparse
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Table, delete, select, text, tuple_, update
+
+from config import get_settings
+from database import shards
+from database.connection import Base, close_db, init_tenant_schema, router
+from models import assignment_model, user_model  # noqa: F401  (registers the tables)
+
+settings = get_settings()
+
+_directory = shards.tenant_directory
+
+
+class TenantError(Exception):
+    """A tenant operation that can't proceed; the message says why."""
+
+
+# ---------- Connections ----------
+
+
+@asynccontextmanager
+async def _connect(shard: str, tenant: str) -> AsyncIterator:
+    """A transaction on `shard` whose unqualified tables are `tenant`'s."""
+    async with router.engines[shard].begin() as conn:
+        schema = shards.schema_for(tenant) if conn.dialect.name == "postgresql" else None
+        if schema:
+            conn = await conn.execution_options(schema_translate_map={None: schema})
+        yield conn
+
+
+async def _directory_entry(tenant: str) -> Optional[Tuple[str, bool]]:
+    async with router.engines[shards.DEFAULT_SHARD].connect() as conn:
+        row = (await conn.execute(
+            select(_directory.c.shard, _directory.c.read_only).where(_directory.c.tenant == tenant)
+        )).first()
+    return (row[0], bool(row[1])) if row else None
+
+
+async def _set_directory(tenant: str, **values) -> None:
+    async with router.engines[shards.DEFAULT_SHARD].begin() as conn:
+        await conn.execute(update(_directory).where(_directory.c.tenant == tenant).values(**values))
+
+
+# ---------- Copying ----------
+
+
+def _upsert(conn, table: Table):
+    if conn.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    stmt = insert(table)
+    pk = [c.name for c in table.primary_key]
+    rest = {c.name: stmt.excluded[c.name] for c in table.columns if not c.primary_key}
+    return stmt.on_conflict_do_update(index_elements=pk, set_=rest)
+
+
+def _pk_in(table: Table, keys: List[tuple]):
+    pk = list(table.primary_key)
+    if len(pk) == 1:
+        return pk[0].in_([key[0] for key in keys])
+    return tuple_(*pk).in_(keys)
+
+
+def _chunked(keys: Iterable[tuple], size: int) -> Iterable[List[tuple]]:
+    keys = sorted(keys)
+    for start in range(0, len(keys), size):
+        yield keys[start:start + size]
+
+
+async def _copy_table(table: Table, tenant: str, source: str, target: str, size: int) -> int:
+    """Upsert every row of `table` into the target in primary key order."""
+    pk = list(table.primary_key)
+    copied = 0
+    last = None
+    async with _connect(source, tenant) as src:
+        while True:
+            query = select(table).order_by(*pk).limit(size)
+            if last is not None:
+                query = query.where(tuple_(*pk) > tuple_(*last) if len(pk) > 1 else pk[0] > last[0])
+            rows = (await src.execute(query)).mappings().all()
+            if not rows:
+                return copied
+            async with _connect(target, tenant) as dst:
+                await dst.execute(_upsert(dst, table), [dict(row) for row in rows])
+            copied += len(rows)
+            last = [rows[-1][c.name] for c in pk]
+
+
+async def _keys(shard: str, tenant: str, table: Table) -> Set[tuple]:
+    async with _connect(shard, tenant) as conn:
+        return set(map(tuple, (await conn.execute(select(*table.primary_key))).all()))
+
+
+async def _delete_gone(table: Table, tenant: str, source: str, target: str, size: int) -> int:
+    """Delete target rows the source no longer has."""
+    gone = await _keys(target, tenant, table) - await _keys(source, tenant, table)
+    for chunk in _chunked(gone, size):
+        async with _connect(target, tenant) as dst:
+            await dst.execute(delete(table).where(_pk_in(table, chunk)))
+    return len(gone)
+
+
+async def _upsert_changed(
+    table: Table, tenant: str, source: str, target: str, size: int, since: datetime
+) -> int:
+    """Upsert source rows the target lacks or that changed since `since`."""
+    source_keys = await _keys(source, tenant, table)
+    if "updated_at" not in table.c:
+        changed = source_keys  # no change tracking: resend the table
+    else:
+        changed = source_keys - await _keys(target, tenant, table)
+    upserted = 0
+    async with _connect(source, tenant) as src:
+        if "updated_at" in table.c:
+            result = await src.execute(
+                select(*table.primary_key).where(table.c.updated_at >= since)
+            )
+            changed.update(map(tuple, result.all()))
+        for chunk in _chunked(changed, size):
+            rows = (await src.execute(select(table).where(_pk_in(table, chunk)))).mappings().all()
+            if rows:
+                async with _connect(target, tenant) as dst:
+                    await dst.execute(_upsert(dst, table), [dict(row) for row in rows])
+                upserted += len(rows)
+    return upserted
+
+
+async def _advance_sequences(tenant: str, shard: str) -> None:
+    """Move serial id sequences past the copied ids (Postgres only)."""
+    async with _connect(shard, tenant) as conn:
+        if conn.dialect.name != "postgresql":
+            return
+        schema = shards.schema_for(tenant)
+        for table in Base.metadata.sorted_tables:
+            column = table.autoincrement_column
+            if column is None:
+                continue
+            qualified = f'"{schema}"."{table.name}"'
+            await conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{qualified}', '{column.name}'), "
+                f"COALESCE(MAX({column.name}), 0) + 1, false) FROM {qualified}"
+            ))
+
+
+# ---------- Commands ----------
+
+
+async def list_tenants() -> None:
+    await router.refresh()
+    print(f"{settings.DEFAULT_TENANT:<24} {shards.DEFAULT_SHARD:<16} (public schema)")
+    for tenant, (shard, read_only) in sorted(router.tenants().items()):
+        flag = " read-only" if read_only else ""
+        configured = "" if shard in router.engines else " (shard not configured here)"
+        print(f"{tenant:<24} {shard:<16}{flag}{configured}")
+
+
+async def add_tenant(tenant: str, shard: str) -> None:
+    if not shards.TENANT_NAME.match(tenant) or tenant == settings.DEFAULT_TENANT:
+        raise TenantError(f"Invalid tenant name: {tenant!r}")
+    if shard not in router.engines:
+        raise TenantError(f"Shard {shard!r} is not configured (DATABASE_SHARDS)")
+    entry = await _directory_entry(tenant)
+    if entry is not None and entry[0] != shard:
+        raise TenantError(f"{tenant!r} already lives on {entry[0]!r}; use move")
+
+    created = await init_tenant_schema(tenant, shard)
+    if entry is None:
+        async with router.engines[shards.DEFAULT_SHARD].begin() as conn:
+            await conn.execute(_directory.insert().values(tenant=tenant, shard=shard, read_only=False))
+    print(f"{tenant} on {shard}: " + (f"created {', '.join(created)}" if created else "schema current"))
+
+
+async def move_tenant(
+    tenant: str, target: str, chunk_size: int, delta_margin: float, drop_source: bool
+) -> None:
+    if tenant == settings.DEFAULT_TENANT:
+        raise TenantError("The default tenant lives in the public schema and can't be moved")
+    if target not in router.engines:
+        raise TenantError(f"Shard {target!r} is not configured (DATABASE_SHARDS)")
+    entry = await _directory_entry(tenant)
+    if entry is None:
+        raise TenantError(f"Unknown tenant: {tenant!r}")
+    source = entry[0]
+    if source == target:
+        raise TenantError(f"{tenant!r} already lives on {target!r}")
+    if source not in router.engines:
+        raise TenantError(f"Source shard {source!r} is not configured (DATABASE_SHARDS)")
+
+    started = time.perf_counter()
+    await init_tenant_schema(tenant, target)
+    tables = Base.metadata.sorted_tables
+
+    # copy: the tenant stays writable
+    since = datetime.now(timezone.utc) - timedelta(seconds=delta_margin)
+    for table in tables:
+        copied = await _copy_table(table, tenant, source, target, chunk_size)
+        print(f"  copied {table.name}: {copied} rows")
+
+    # freeze
+    await _set_directory(tenant, read_only=True)
+    frozen = time.perf_counter()
+    try:
+        wait = 2 * settings.TENANT_DIRECTORY_REFRESH
+        print(f"  {tenant} is read-only; waiting {wait:.0f}s for every worker to notice")
+        await asyncio.sleep(wait)
+
+        # sync: deletes from child tables first, upserts into parents first
+        for table in reversed(tables):
+            deleted = await _delete_gone(table, tenant, source, target, chunk_size)
+            if deleted:
+                print(f"  synced {table.name}: {deleted} deleted")
+        for table in tables:
+            upserted = await _upsert_changed(table, tenant, source, target, chunk_size, since)
+            print(f"  synced {table.name}: {upserted} upserted")
+        await _advance_sequences(tenant, target)
+
+        # switch
+        await _set_directory(tenant, shard=target, read_only=False)
+    except BaseException:
+        await _set_directory(tenant, read_only=False)
+        print(f"  move failed; {tenant} is writable again on {source}")
+        raise
+
+    print(f"Moved {tenant} from {source} to {target} in {time.perf_counter() - started:.1f}s "
+          f"(read-only for {time.perf_counter() - frozen:.1f}s)")
+
+    if drop_source:
+        async with router.engines[source].begin() as conn:
+            if conn.dialect.name == "postgresql":
+                await conn.exec_driver_sql(
+                    f'DROP SCHEMA IF EXISTS "{shards.schema_for(tenant)}" CASCADE'
+                )
+                print(f"Dropped {shards.schema_for(tenant)} on {source}")
+            else:
+                print(f"Kept the source copy: {source} has no per-tenant schema to drop")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="tenants and their shards")
+    add = commands.add_parser("add", help="provision a tenant on a shard")
+    add.add_argument("tenant")
+    add.add_argument("--shard", default=shards.DEFAULT_SHARD)
+    move = commands.add_parser("move", help="move a tenant to another shard")
+    move.add_argument("tenant")
+    move.add_argument("shard")
+    move.add_argument("--chunk-size", type=int, default=1000, help="rows per copy transaction")
+    move.add_argument("--delta-margin", type=float, default=300.0,
+                      help="seconds of updated_at slack for transactions open when the copy began")
+    move.add_argument("--drop-source", action="store_true")
+    args = parser.parse_args()
+    try:
+        if args.command == "list":
+            await list_tenants()
+        elif args.command == "add":
+            await add_tenant(args.tenant, args.shard)
+        else:
+            await move_tenant(
+                args.tenant, args.shard, args.chunk_size, args.delta_margin, args.drop_source
+            )
+    except TenantError as exc:
+        raise SystemExit(str(exc))
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
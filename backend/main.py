@@ -3,24 +3,54 @@ VeriLearn API — AI-Powered Learning Verification & Analytics Platform.
 Run: uvicorn main:app --host 0.0.0.0 --port 10000
 """
 
-from fastapi import FastAPI, Depends
+import asyncio
+
+from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, JSONResponse
 from contextlib import asynccontextmanager
 
 from config import get_settings
-from database.connection import init_db, close_db
-from routes import auth, student, teacher
+from database.connection import init_db, close_db, async_session
+from database.shards import TenantReadOnly
+from services import (
+    password_service, metrics, ai_service, warmup, shared_cache, invalidation,
+    score_sketch, bulk_import, rate_limit,
+)
+from models.assignment_model import ScoreSketchBucket
+from services.ai_providers.base import AIProviderError, AIRateLimited
+from middleware.metrics import MetricsMiddleware
+from middleware.sql_profiler import SQLProfilerMiddleware
+from middleware.profiling import ProfilingMiddleware
+from middleware.tenant import TenantMiddleware
+from routes import auth, student, teacher, live
+from routes.responses import FastJSONResponse
 from routes.deps import get_current_user
-from models.user_model import User, UserResponse
+from models.user_model import UserResponse
 
 settings = get_settings()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await init_db()
+    created = await init_db()
+    if ScoreSketchBucket.__tablename__ in created:
+        # New sketch table on an existing database: backfill it once
+        async with async_session() as db:
+            counted = await score_sketch.rebuild(db)
+            await db.commit()
+        print(f"✓ Score sketches built from {counted} assignments")
+    warmup_task = asyncio.create_task(warmup.run())
+    listener_task = asyncio.create_task(invalidation.listen())
     yield
+    warmup_task.cancel()
+    listener_task.cancel()
+    await bulk_import.shutdown()
     await close_db()
+    await ai_service.close_provider()
+    await shared_cache.close_backend()
+    await rate_limit.close_backend()
+    password_service.shutdown()
 
 
 app = FastAPI(
@@ -28,8 +58,12 @@ app = FastAPI(
     version=settings.APP_VERSION,
     description="AI-powered learning verification and analytics platform.",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
+# Innermost: everything below runs as the request's tenant
+app.add_middleware(TenantMiddleware)
+
 # CORS — open for development, restrict in production
 app.add_middleware(
     CORSMiddleware,
@@ -39,10 +73,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+if settings.SQL_PROFILER_ENABLED:
+    app.add_middleware(SQLProfilerMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(AIProviderError)
+async def ai_provider_error_handler(request, exc: AIProviderError):
+    """Surface AI provider failures as upstream errors instead of 500s."""
+    if isinstance(exc, AIRateLimited):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "AI provider is rate limited, please retry shortly."},
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+    return JSONResponse(
+        status_code=502,
+        content={"detail": "AI provider is unavailable, please retry."},
+    )
+
+
+@app.exception_handler(TenantReadOnly)
+async def tenant_read_only_handler(request, exc: TenantReadOnly):
+    """Writes during a tenant move: retry once it has landed on its new shard."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "This school is being moved, please retry shortly."},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 # Register routes
 app.include_router(auth.router)
 app.include_router(student.router)
 app.include_router(teacher.router)
+if settings.LIVE_DASHBOARD_ENABLED:
+    app.include_router(live.router)
 
 
 @app.get("/", tags=["Health"])
@@ -61,12 +129,25 @@ async def health_check():
     return {"status": "healthy", "database": "PostgreSQL (asyncpg)"}
 
 
+@app.get("/ready", tags=["Health"])
+async def readiness_check():
+    """200 once post-boot warmup has finished, 503 until then."""
+    return FastJSONResponse(
+        warmup.status(), status_code=200 if warmup.is_ready() else 503
+    )
+
+
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus text-format metrics."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4"
+    )
+
+
 @app.get("/auth/me", tags=["Authentication"], response_model=UserResponse)
-async def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: UserResponse = Depends(get_current_user)):
     """Return the currently authenticated user."""
-    return UserResponse(
-        id=current_user.id,
-        name=current_user.name,
-        email=current_user.email,
-        role=current_user.role,
-    )
+    return FastJSONResponse(current_user)
@@ -0,0 +1,54 @@
+"""
+Metrics middleware — per-route latency, status counts and SQL usage.
+
+A pure ASGI middleware (no BaseHTTPMiddleware task/stream overhead).
+Requests are labelled by route template, e.g. /student/results/{assignment_id},
+so label cardinality stays bounded.
+"""
+
+import time
+
+from services.metrics import (
+    HTTP_REQUEST_SECONDS,
+    HTTP_RESPONSES,
+    DB_QUERIES_PER_REQUEST,
+    DB_QUERY_SECONDS_PER_REQUEST,
+    request_queries,
+)
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        queries = [0, 0.0]
+        token = request_queries.set(queries)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            request_queries.reset(token)
+
+            # The router stores the matched APIRoute in the shared scope
+            route = scope.get("route")
+            template = route.path if route is not None else "<unmatched>"
+            method = scope["method"]
+
+            HTTP_REQUEST_SECONDS.labels(method, template).observe(elapsed)
+            HTTP_RESPONSES.inc((method, template, status_code))
+            DB_QUERIES_PER_REQUEST.labels(template).observe(queries[0])
+            DB_QUERY_SECONDS_PER_REQUEST.labels(template).observe(queries[1])
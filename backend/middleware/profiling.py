@@ -0,0 +1,96 @@
+"""
+Profiling middleware — opt-in sampling profiles around single requests.
+
+Installed only when PROFILING_ENABLED, so the disabled cost is zero.
+A request is profiled when it carries `X-Profile: <PROFILING_TOKEN>` or is
+picked by PROFILING_SAMPLE_RATE. Token-authorized requests may also send
+`X-Profile-Inline: 1` to receive the profile instead of the response body,
+and `X-Profile-Format: speedscope|collapsed` to pick the output format.
+Other profiles are written to PROFILING_OUTPUT_DIR.
+
+The sampler records the event-loop thread, so a profile covers whatever
+the loop ran while the request was in flight, other requests included;
+profile on a quiet worker for a clean picture. Header values are compared
+as raw bytes and never decoded, so malformed headers pass through.
+"""
+
+import asyncio
+import hmac
+import random
+import re
+import threading
+import time
+from pathlib import Path
+
+from config import get_settings
+from services.profiler import StackSampler
+
+settings = get_settings()
+
+_active = False  # one profile at a time; concurrent requests pass through
+
+
+def _write_profile(body: bytes, name: str, fmt: str) -> None:
+    out_dir = Path(settings.PROFILING_OUTPUT_DIR)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    suffix = "collapsed.txt" if fmt == "collapsed" else "speedscope.json"
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", name).strip("-")
+    (out_dir / f"{int(time.time() * 1000)}-{slug}.{suffix}").write_bytes(body)
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _active
+        if scope["type"] != "http" or _active:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        authorized = bool(settings.PROFILING_TOKEN) and hmac.compare_digest(
+            headers.get(b"x-profile", b""), settings.PROFILING_TOKEN.encode()
+        )
+        sampled = random.random() < settings.PROFILING_SAMPLE_RATE
+        if not (authorized or sampled):
+            await self.app(scope, receive, send)
+            return
+
+        fmt = "collapsed" if headers.get(b"x-profile-format") == b"collapsed" else "speedscope"
+        inline = authorized and headers.get(b"x-profile-inline") == b"1"
+        status_code = 500
+
+        async def swallow_response(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        sampler = StackSampler(
+            threading.get_ident(), settings.PROFILING_INTERVAL_MS / 1000
+        )
+        _active = True
+        sampler.start()
+        try:
+            await self.app(scope, receive, swallow_response if inline else send)
+        finally:
+            await sampler.stop()
+            _active = False
+
+        name = f"{scope['method']} {scope['path']}"
+        body, media_type = sampler.export(fmt, name)
+
+        if not inline:
+            await asyncio.to_thread(_write_profile, body, name, fmt)
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", media_type.encode()),
+                (b"content-length", str(len(body)).encode()),
+                (b"x-profile-status", str(status_code).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
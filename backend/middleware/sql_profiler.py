@@ -0,0 +1,36 @@
+"""
+SQL profiler middleware — profiles each request's statements and adds an
+X-SQL-Profile summary header. Installed only when SQL_PROFILER_ENABLED.
+"""
+
+from services import sql_profiler
+
+HEADER = b"x-sql-profile"
+
+
+class SQLProfilerMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = sql_profiler.QueryProfile()
+
+        async def send_with_profile(message):
+            # Headers go out before the body, so the summary covers every
+            # statement executed up to the point the response starts.
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((HEADER, profile.header_value().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = sql_profiler.current_profile.set(profile)
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            sql_profiler.current_profile.reset(token)
+            sql_profiler.publish(profile)
@@ -0,0 +1,85 @@
+"""
+Tenant middleware — runs each request as the tenant it belongs to.
+
+The tenant comes from the "tenant" claim of a verified JWT (Authorization
+header, or ?token= for WebSockets); before login, from the X-Tenant
+header; otherwise DEFAULT_TENANT. Every database session, cache key and
+in-memory aggregate opened while handling the request follows it
+(database/shards.py). Unknown tenants get a 400 (WebSockets: close 1008).
+
+A pure ASGI middleware, like middleware/metrics.py.
+"""
+
+from typing import Optional
+from urllib.parse import parse_qs
+
+import orjson
+
+from config import get_settings
+from database import shards
+from database.connection import router
+from routes.deps import token_tenant
+
+settings = get_settings()
+
+POLICY_VIOLATION = 1008
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _tenant_of(scope) -> str:
+    token = None
+    authorization = _header(scope, b"authorization")
+    if authorization and authorization[:7].lower() == "bearer ":
+        token = authorization[7:].strip()
+    elif scope["type"] == "websocket":
+        token = (parse_qs(scope.get("query_string", b"").decode()).get("token") or [None])[0]
+    if token:
+        tenant = token_tenant(token)
+        if tenant is not None:
+            return tenant
+    # Invalid tokens fall through; the auth dependency rejects them with 401
+    return (_header(scope, b"x-tenant") or settings.DEFAULT_TENANT).strip().lower()
+
+
+class TenantMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        tenant = _tenant_of(scope)
+        try:
+            if not shards.TENANT_NAME.match(tenant):
+                raise shards.UnknownTenant(tenant)
+            await router.resolve(tenant)
+        except shards.UnknownTenant:
+            await self._reject(scope, receive, send)
+            return
+
+        with shards.use(tenant):
+            await self.app(scope, receive, send)
+
+    async def _reject(self, scope, receive, send) -> None:
+        if scope["type"] == "websocket":
+            await receive()  # websocket.connect; closing now refuses the handshake
+            await send({"type": "websocket.close", "code": POLICY_VIOLATION})
+            return
+        body = orjson.dumps({"detail": "Unknown tenant."})
+        await send({
+            "type": "http.response.start",
+            "status": 400,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
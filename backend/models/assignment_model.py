@@ -6,7 +6,7 @@ from sqlalchemy import (
     Column, Integer, String, Float, Text, DateTime, ForeignKey, JSON, func,
 )
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Union
 from datetime import datetime
 
 from database.connection import Base
@@ -17,6 +17,9 @@ from database.connection import Base
 class Assignment(Base):
     """assignments table."""
     __tablename__ = "assignments"
+    # Flushes read server defaults back (RETURNING), so created_at is set
+    # on a new row without a refresh; score_sketch buckets by it
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     student_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -35,6 +38,7 @@ class Assignment(Base):
     logical_consistency = Column(Float, default=0)
     depth = Column(Float, default=0)
     final_score = Column(Float, default=0)
+    scoring_profile = Column(String(40), nullable=True)  # "standard@1"; NULL: scored before tracking
 
     # Radar chart dimensions
     radar_clarity = Column(Float, default=0)
@@ -67,6 +71,37 @@ class Analytics(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
+# ==================== Score Sketch ORM Model ====================
+
+class ScoreSketchBucket(Base):
+    """
+    score_sketch_buckets table — sparse score histograms, one row per
+    (scope, bucket). Scopes: "all", "latest", "subject:<name>", "week:<YYYY-Www>".
+    """
+    __tablename__ = "score_sketch_buckets"
+
+    scope = Column(String(120), primary_key=True)
+    bucket = Column(Integer, primary_key=True)  # score × 10
+    count = Column(Integer, nullable=False, default=0)
+
+
+# ==================== Follow-up Evaluation ORM Model ====================
+
+class FollowupEvaluation(Base):
+    """
+    followup_evaluations table — cached evaluation of one follow-up answer,
+    keyed by (assignment, question, answer hash).
+    """
+    __tablename__ = "followup_evaluations"
+
+    assignment_id = Column(Integer, ForeignKey("assignments.id"), primary_key=True)
+    question_id = Column(String(64), primary_key=True)
+    answer_hash = Column(String(64), primary_key=True)  # sha256 hex of evaluator + answer
+    scores = Column(JSON, nullable=False)            # evaluate_understanding dimensions
+    ai_dependency = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 # ==================== Request Schemas ====================
 
 class AssignmentSubmit(BaseModel):
@@ -133,8 +168,8 @@ class DashboardResponse(BaseModel):
     """Student dashboard overview."""
     overall_score: float
     total_assignments: int
-    score_history: List[Dict[str, float]]
-    weak_topic_summary: List[Dict[str, int]]
+    score_history: List[Dict[str, Union[str, float]]]       # {date, score}
+    weak_topic_summary: List[Dict[str, Union[str, int]]]    # {topic, count}
     ai_dependency_score: float
     growth_trend: float
 
@@ -146,11 +181,58 @@ class ClassAnalyticsResponse(BaseModel):
     most_weak_topic: str
     strongest_topic: str
     performance_distribution: Dict[str, int]
-    score_trend: List[Dict[str, float]]
-    topic_averages: List[Dict[str, float]]
+    score_trend: List[Dict[str, Union[str, float]]]         # {date, avg}
+    topic_averages: List[Dict[str, Union[str, float]]]      # {topic, avg}
     ai_risk_students: int
 
 
+class ScoreDistributionResponse(BaseModel):
+    """Percentiles and histogram over one or more merged score scopes."""
+    scopes: List[str]
+    count: int
+    mean: float
+    percentiles: Dict[str, float]                           # {"p50": 74.2}
+    histogram: List[Dict[str, Union[float, int]]]           # {lo, hi, count}
+
+
+class PeerMatch(BaseModel):
+    """One neighbour from the peer index."""
+    student_id: int
+    student_name: str
+    score: float              # distance (similar) or centred cosine (complementary)
+    radar_scores: Dict[str, float]
+
+
+class PeerMatchResponse(BaseModel):
+    """Top-k similar or complementary peers for a student."""
+    student_id: int
+    mode: str
+    radar_scores: Dict[str, float]
+    peers: List[PeerMatch]
+
+
+class ImportItem(BaseModel):
+    """One record of a bulk import."""
+    line: int
+    student: Optional[str] = None
+    status: str               # queued | imported | failed
+    assignment_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class ImportStatusResponse(BaseModel):
+    """Progress of a bulk submission import, with a page of its items."""
+    import_id: str
+    status: str               # running | completed | cancelled
+    total: int
+    queued: int
+    imported: int
+    failed: int
+    created_at: str
+    finished_at: Optional[str] = None
+    items: List[ImportItem]
+
+
 class StudentAnalyticsResponse(BaseModel):
     """Individual student analytics for teachers."""
     student_id: int
@@ -158,7 +240,7 @@ class StudentAnalyticsResponse(BaseModel):
     overall_score: float
     growth_trend: float
     ai_dependency_score: float
-    score_history: List[Dict[str, float]]
+    score_history: List[Dict[str, Union[str, float]]]       # {date, score}
     radar_scores: Optional[RadarScores] = None
     weak_topics: List[str] = []
     topic_timeline: List[Dict[str, str]] = []
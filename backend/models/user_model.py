@@ -53,6 +53,12 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
+class Principal(BaseModel):
+    """Authenticated caller as seen by role-checking dependencies."""
+    id: int
+    role: str
+
+
 class TokenResponse(BaseModel):
     """JWT token response."""
     access_token: str
@@ -5,12 +5,13 @@ Auth Routes — Registration, Login, JWT token management (PostgreSQL).
 from fastapi import APIRouter, HTTPException, status, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from passlib.context import CryptContext
-from jose import jwt
 from datetime import datetime, timedelta
 
 from config import get_settings
+from database import shards
 from database.connection import get_db
+from services import password_service
+from services.password_service import PasswordPoolSaturated
 from models.user_model import (
     User,
     UserRegister,
@@ -21,21 +22,37 @@ from models.user_model import (
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 settings = get_settings()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
-def _hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+def _pool_busy(exc: PasswordPoolSaturated) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, please retry shortly.",
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 
+async def _hash_password(password: str) -> str:
+    try:
+        return await password_service.hash_password(password)
+    except PasswordPoolSaturated as exc:
+        raise _pool_busy(exc)
 
-def _verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+
+async def _verify_password(plain: str, hashed: str) -> bool:
+    try:
+        return await password_service.verify_password(plain, hashed)
+    except PasswordPoolSaturated as exc:
+        raise _pool_busy(exc)
 
 
 def _create_token(user_id: int, role: str) -> str:
+    from jose import jwt  # deferred, see routes.deps._decode_token
+
     payload = {
         "sub": str(user_id),
         "role": role,
+        "tenant": shards.current(),  # routes the holder's sessions (middleware/tenant.py)
         "exp": datetime.utcnow()
         + timedelta(minutes=settings.JWT_EXPIRATION_MINUTES),
     }
@@ -66,7 +83,7 @@ async def register(payload: UserRegister, db: AsyncSession = Depends(get_db)):
     user = User(
         name=payload.name,
         email=payload.email,
-        password_hash=_hash_password(payload.password),
+        password_hash=await _hash_password(payload.password),
         role=payload.role,
     )
     db.add(user)
@@ -98,7 +115,7 @@ async def login(payload: UserLogin, db: AsyncSession = Depends(get_db)):
             detail="Invalid email or password.",
         )
 
-    if not _verify_password(payload.password, user.password_hash):
+    if not await _verify_password(payload.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password.",
@@ -1,48 +1,133 @@
 """
 JWT Authentication dependency — extracts and validates the current user from Bearer token.
+
+Decoded tokens are memoized per token until they expire, and user lookups
+go through a TTL+LRU principal cache keyed by (tenant, user id). With
+AUTH_STATELESS_ROLES, role checks run purely from the verified claims.
+
+A changed or deleted user is evicted in the writing worker at flush, and
+in every other worker through a user event on the LISTEN/NOTIFY channel
+(services/invalidation.py) once the change commits. Without a listener
+(not Postgres, or CACHE_INVALIDATION_LISTEN off) other workers can serve
+the old user, role included, for up to AUTH_PRINCIPAL_CACHE_TTL seconds:
+that is the revocation bound there.
 """
 
+import time
+from typing import Optional
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import jwt, JWTError
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from config import get_settings
+from database import shards
 from database.connection import get_db
-from models.user_model import User
+from models.user_model import User, UserResponse, Principal
+from services import invalidation
+from services.cache import TTLCache
+from services.rate_limit import (
+    AdmissionRejected,
+    RateLimited,
+    analysis_limiter,
+    check_user_rate,
+)
 
 settings = get_settings()
 security = HTTPBearer()
 
+_token_cache = TTLCache(
+    maxsize=settings.AUTH_TOKEN_CACHE_SIZE,
+    ttl=settings.JWT_EXPIRATION_MINUTES * 60,
+)
+_principal_cache = TTLCache(
+    maxsize=(
+        settings.AUTH_PRINCIPAL_CACHE_SIZE
+        if settings.AUTH_PRINCIPAL_CACHE_TTL > 0
+        else 0
+    ),
+    ttl=settings.AUTH_PRINCIPAL_CACHE_TTL,
+)
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db),
-) -> User:
+
+def invalidate_principal(user_id: Optional[int]) -> None:
     """
-    FastAPI dependency — decodes JWT, fetches user from DB.
-    Use: current_user: User = Depends(get_current_user)
+    Drop a cached user of the current tenant so the next request re-reads
+    it; None drops every cached user.
     """
-    token = credentials.credentials
+    if user_id is None:
+        _principal_cache.clear()
+    else:
+        _principal_cache.pop((shards.current(), user_id))
+
+
+invalidation.register_user_listener(invalidate_principal)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_user_change(mapper, connection, target: User) -> None:
+    invalidate_principal(target.id)
+    invalidation.publish_from_flush(connection, invalidation.user_event(target.id))
+
+
+def _decode_token(token: str) -> dict:
+    """Verify a JWT, reusing the decoded claims for tokens seen before."""
+    claims = _token_cache.get(token)
+    if claims is not None:
+        return claims
+
+    # Deferred: python-jose pulls in the cryptography backend at import
+    from jose import jwt, JWTError
 
     try:
-        payload = jwt.decode(
+        claims = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
         )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token: missing user ID.",
-            )
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token.",
         )
 
-    result = await db.execute(select(User).where(User.id == int(user_id)))
+    if claims.get("sub") is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token: missing user ID.",
+        )
+
+    # Never serve a memoized token past its own expiry
+    exp = claims.get("exp")
+    ttl = min(_token_cache.ttl, exp - time.time()) if exp else None
+    _token_cache.set(token, claims, ttl)
+    return claims
+
+
+def token_tenant(token: str) -> Optional[str]:
+    """The tenant a token was issued for; None if the token doesn't verify."""
+    try:
+        claims = _decode_token(token)
+    except HTTPException:
+        return None
+    return claims.get("tenant", settings.DEFAULT_TENANT)
+
+
+async def get_token_claims(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> dict:
+    """FastAPI dependency — verified JWT claims for the request."""
+    return _decode_token(credentials.credentials)
+
+
+async def _load_user(user_id: int, db: AsyncSession) -> UserResponse:
+    cache_key = (shards.current(), user_id)
+    principal = _principal_cache.get(cache_key)
+    if principal is not None:
+        return principal
+
+    result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
 
     if not user:
@@ -51,28 +136,89 @@ async def get_current_user(
             detail="User not found.",
         )
 
-    return user
+    principal = UserResponse.model_validate(user)
+    _principal_cache.set(cache_key, principal)
+    return principal
+
+
+async def get_current_user(
+    claims: dict = Depends(get_token_claims),
+    db: AsyncSession = Depends(get_db),
+) -> UserResponse:
+    """
+    FastAPI dependency — decodes JWT, fetches user from cache or DB.
+    Use: current_user: UserResponse = Depends(get_current_user)
+    """
+    return await _load_user(int(claims["sub"]), db)
+
+
+async def get_principal(
+    claims: dict = Depends(get_token_claims),
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
+    """FastAPI dependency — caller id and role for authorization checks."""
+    if settings.AUTH_STATELESS_ROLES:
+        return Principal(id=int(claims["sub"]), role=claims.get("role", ""))
+
+    user = await _load_user(int(claims["sub"]), db)
+    return Principal(id=user.id, role=user.role)
+
+
+async def principal_from_token(token: str, db: AsyncSession) -> Principal:
+    """
+    Principal for a bare token, for transports that can't send an
+    Authorization header (browser WebSockets). Raises HTTPException.
+    """
+    return await get_principal(_decode_token(token), db)
 
 
 async def require_student(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    principal: Principal = Depends(get_principal),
+) -> Principal:
     """Require the authenticated user to have 'student' role."""
-    if current_user.role != "student":
+    if principal.role != "student":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Student access required.",
         )
-    return current_user
+    return principal
 
 
 async def require_teacher(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    principal: Principal = Depends(get_principal),
+) -> Principal:
     """Require the authenticated user to have 'teacher' role."""
-    if current_user.role != "teacher":
+    if principal.role != "teacher":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Teacher access required.",
         )
-    return current_user
+    return principal
+
+
+async def limit_ai_analysis(
+    principal: Principal = Depends(get_principal),
+):
+    """
+    Admission control for AI-backed endpoints: a per-user token bucket
+    (429) and then a slot in the global analysis limiter (503).
+    The slot is held until the endpoint finishes.
+    """
+    try:
+        await check_user_rate(principal.id, principal.role)
+    except RateLimited as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many analyses, please slow down.",
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+
+    try:
+        async with analysis_limiter.slot():
+            yield
+    except AdmissionRejected as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Analysis capacity is busy, please retry shortly.",
+            headers={"Retry-After": str(exc.retry_after)},
+        )
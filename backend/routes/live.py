@@ -0,0 +1,105 @@
+"""
+Live Routes — Push channel for the live class dashboard (WebSocket + SSE).
+
+Both transports send the same JSON messages:
+    {"type": "snapshot", "seq": n, "data": {...full aggregate...}}
+    {"type": "delta",    "seq": n, "data": {...what changed...}}
+    {"type": "ping"}                                  (WebSocket keepalive)
+A snapshot is sent on connect and again whenever the client fell too far
+behind; deltas follow in seq order.
+"""
+
+import asyncio
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, status
+from fastapi.responses import StreamingResponse
+from starlette.websockets import WebSocketDisconnect
+
+from config import get_settings
+from database.connection import async_session
+from models.user_model import Principal
+from services import live_class
+from routes.deps import principal_from_token, require_teacher
+
+router = APIRouter(prefix="/teacher/live", tags=["Teacher"])
+settings = get_settings()
+
+# WebSocket close codes
+POLICY_VIOLATION = 1008
+TRY_AGAIN_LATER = 1013
+
+
+@router.websocket("/ws")
+async def live_websocket(websocket: WebSocket, token: str = Query(...)):
+    """Live class dashboard over WebSocket. Pass the teacher JWT as ?token=."""
+
+    async with async_session() as db:
+        try:
+            principal = await principal_from_token(token, db)
+        except HTTPException:
+            await websocket.close(code=POLICY_VIOLATION)
+            return
+    if principal.role != "teacher":
+        await websocket.close(code=POLICY_VIOLATION)
+        return
+
+    # Accept before refusing: a close code only reaches an accepted client
+    # (closing during the handshake is a bare HTTP 403)
+    await websocket.accept()
+    try:
+        sub, message = await live_class.subscribe()
+    except live_class.TooManyConnections:
+        await websocket.close(code=TRY_AGAIN_LATER)
+        return
+
+    try:
+        while True:
+            if message is None:
+                message = {"type": "ping"}
+            # A client that can't take a message in time is dropped instead
+            # of letting the socket buffer grow
+            await asyncio.wait_for(
+                websocket.send_text(orjson.dumps(message).decode()),
+                settings.LIVE_SEND_TIMEOUT,
+            )
+            message = await sub.next(settings.LIVE_HEARTBEAT_SECONDS)
+    except (WebSocketDisconnect, asyncio.TimeoutError, RuntimeError):
+        pass
+    finally:
+        live_class.unsubscribe(sub)
+
+
+@router.get("/stream")
+async def live_stream(current_user: Principal = Depends(require_teacher)):
+    """Live class dashboard as Server-Sent Events. Requires teacher JWT."""
+
+    try:
+        sub, first = await live_class.subscribe()
+    except live_class.TooManyConnections:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many live dashboard connections, please retry shortly.",
+            headers={"Retry-After": "5"},
+        )
+
+    async def events():
+        try:
+            message = first
+            while True:
+                if message is None:
+                    yield b": ping\n\n"
+                else:
+                    yield (
+                        b"event: " + message["type"].encode()
+                        + b"\ndata: " + orjson.dumps(message) + b"\n\n"
+                    )
+                message = await sub.next(settings.LIVE_HEARTBEAT_SECONDS)
+        finally:
+            live_class.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
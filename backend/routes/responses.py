@@ -0,0 +1,31 @@
+"""
+Response helpers — fast JSON rendering without response_model re-validation.
+
+FastAPI validates and re-encodes anything a handler returns through its
+response_model. Handlers built entirely from trusted data return a
+FastJSONResponse (or pre-serialized bytes) instead, which FastAPI sends
+as-is; response_model stays on the route for the OpenAPI schema.
+"""
+
+import orjson
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel
+
+
+def to_json_bytes(content) -> bytes:
+    """Models go through pydantic-core's serializer, everything else orjson."""
+    if isinstance(content, BaseModel):
+        return content.__pydantic_serializer__.to_json(content)
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """Default response class: orjson for plain data, Rust serializer for models."""
+
+    def render(self, content) -> bytes:
+        return to_json_bytes(content)
+
+
+def json_bytes_response(body: bytes, status_code: int = 200) -> Response:
+    """Send already-serialized JSON, e.g. a cached snapshot."""
+    return Response(content=body, status_code=status_code, media_type="application/json")
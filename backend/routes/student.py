@@ -3,12 +3,16 @@ Student Routes — Assignment submission, dashboard, results (PostgreSQL + JWT A
 """
 
 from fastapi import APIRouter, HTTPException, status, Depends
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from datetime import datetime
+from typing import List
 
+from config import get_settings
 from database.connection import get_db
-from models.user_model import User
+from database import fast_reads
+from models.user_model import Principal
 from models.assignment_model import (
     Assignment,
     AssignmentSubmit,
@@ -26,15 +30,17 @@ from services.ai_service import (
     recommend_books,
     calculate_ai_dependency,
 )
-from services.scoring_service import (
-    calculate_final_score,
-    build_radar_scores,
-    compute_growth_trend,
-)
+from services.scoring_service import compute_growth_trend, score_evaluation
 from services.recommendation_service import aggregate_weak_topics_from_list
-from routes.deps import require_student
+from services import analytics_cache, followup_eval, invalidation, score_sketch
+from routes.deps import require_student, limit_ai_analysis
+from routes.responses import FastJSONResponse, to_json_bytes, json_bytes_response
 
 router = APIRouter(prefix="/student", tags=["Student"])
+settings = get_settings()
+
+# Validates provider output in one pass instead of one model per book
+_book_list = TypeAdapter(List[BookRecommendation])
 
 
 # ---------- Helpers ----------
@@ -59,13 +65,62 @@ def _assignment_to_radar(a: Assignment) -> RadarScores:
     )
 
 
+def _build_dashboard(rows) -> DashboardResponse:
+    """
+    Build the dashboard from (final_score, ai_dependency_score,
+    weak_topics, created_at) rows ordered by created_at.
+    Shared by the ORM and fast read paths. Every field is computed here,
+    so the model is constructed without re-validating the history lists.
+    """
+    score_history = []
+    score_values = []
+    ai_deps = []
+    all_weak: list[list[str]] = []
+
+    for final_score, ai_dependency_score, weak_topics, created_at in rows:
+        score_values.append(final_score)
+        score_history.append({
+            "date": created_at.isoformat() if created_at else "",
+            "score": final_score,
+        })
+        ai_deps.append(ai_dependency_score)
+        all_weak.append(weak_topics or [])
+
+    if not score_values:
+        return DashboardResponse.model_construct(
+            overall_score=0,
+            total_assignments=0,
+            score_history=[],
+            weak_topic_summary=[],
+            ai_dependency_score=0,
+            growth_trend=0,
+        )
+
+    weak_topic_summary = aggregate_weak_topics_from_list(all_weak)
+    growth = compute_growth_trend(score_values)
+    avg_ai_dep = sum(ai_deps) / len(ai_deps) if ai_deps else 0
+
+    return DashboardResponse.model_construct(
+        overall_score=round(score_values[-1], 1) if score_values else 0,
+        total_assignments=len(score_values),
+        score_history=score_history,
+        weak_topic_summary=weak_topic_summary,
+        ai_dependency_score=round(avg_ai_dep, 1),
+        growth_trend=growth,
+    )
+
+
 # ---------- Routes ----------
 
 
-@router.post("/submit-assignment", status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/submit-assignment",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_ai_analysis)],
+)
 async def submit_assignment(
     payload: AssignmentSubmit,
-    current_user: User = Depends(require_student),
+    current_user: Principal = Depends(require_student),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -83,24 +138,11 @@ async def submit_assignment(
     eval_scores = await evaluate_understanding(payload.text, {})
 
     # Step 4: Calculate weighted scores
-    score_breakdown = calculate_final_score(
-        concept_clarity=eval_scores["concept_clarity"],
-        application=eval_scores["application"],
-        logical_consistency=eval_scores["logical_consistency"],
-        depth=eval_scores.get("depth", 70),
-    )
-
-    radar = build_radar_scores(
-        clarity=eval_scores.get("clarity", 75),
-        application=eval_scores["application"],
-        logic=eval_scores["logical_consistency"],
-        critical_thinking=eval_scores.get("critical_thinking", 70),
-        retention=eval_scores.get("retention", 72),
-    )
+    scored = score_evaluation(eval_scores, payload.subject)
 
     # Step 5: Book recommendations
     book_recs = await recommend_books(weak_topics)
-    rec_dicts = [BookRecommendation(**r).model_dump() for r in book_recs]
+    rec_dicts = _book_list.dump_python(_book_list.validate_python(book_recs))
 
     # Step 6: AI dependency
     ai_dep = await calculate_ai_dependency(payload.text, {})
@@ -112,16 +154,7 @@ async def submit_assignment(
         subject=payload.subject,
         followup_questions=followup_questions,
         student_responses={},
-        concept_clarity=score_breakdown.concept_clarity,
-        application=score_breakdown.application,
-        logical_consistency=score_breakdown.logical_consistency,
-        depth=score_breakdown.depth,
-        final_score=score_breakdown.final_score,
-        radar_clarity=radar.clarity,
-        radar_application=radar.application,
-        radar_logic=radar.logic,
-        radar_critical_thinking=radar.critical_thinking,
-        radar_retention=radar.retention,
+        **scored.columns(),
         weak_topics=weak_topics,
         recommendations=rec_dicts,
         ai_dependency_score=ai_dep,
@@ -129,23 +162,30 @@ async def submit_assignment(
     )
     db.add(assignment)
     await db.flush()
-
-    return {
+    await score_sketch.record_score(db, assignment, previous=None)
+    event = invalidation.score_event(assignment)
+    await invalidation.publish(db, event)
+    # Commit before invalidating, so a concurrent snapshot rebuild can't
+    # re-cache the pre-write state
+    await db.commit()
+    await invalidation.after_commit(event)
+
+    return FastJSONResponse({
         "message": "Assignment analyzed successfully",
         "assignment_id": assignment.id,
         "followup_questions": followup_questions,
-        "scores": score_breakdown.model_dump(),
-        "radar_scores": radar.model_dump(),
+        "scores": scored.scores.model_dump(),
+        "radar_scores": scored.radar.model_dump(),
         "weak_topics": weak_topics,
         "recommendations": rec_dicts,
         "ai_dependency_score": ai_dep,
-    }
+    }, status_code=status.HTTP_201_CREATED)
 
 
-@router.post("/submit-followup")
+@router.post("/submit-followup", dependencies=[Depends(limit_ai_analysis)])
 async def submit_followup(
     payload: FollowUpResponsePayload,
-    current_user: User = Depends(require_student),
+    current_user: Principal = Depends(require_student),
     db: AsyncSession = Depends(get_db),
 ):
     """Submit responses to AI follow-up questions. Re-evaluates understanding."""
@@ -164,109 +204,85 @@ async def submit_followup(
             detail="Assignment not found.",
         )
 
-    eval_scores = await evaluate_understanding(assignment.text, payload.responses)
-
-    score_breakdown = calculate_final_score(
-        concept_clarity=eval_scores["concept_clarity"],
-        application=eval_scores["application"],
-        logical_consistency=eval_scores["logical_consistency"],
-        depth=eval_scores.get("depth", 70),
-    )
+    unknown = set(payload.responses) - followup_eval.question_ids(assignment)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="responses may only answer this assignment's follow-up questions.",
+        )
 
-    radar = build_radar_scores(
-        clarity=eval_scores.get("clarity", 75),
-        application=eval_scores["application"],
-        logic=eval_scores["logical_consistency"],
-        critical_thinking=eval_scores.get("critical_thinking", 70),
-        retention=eval_scores.get("retention", 72),
-    )
+    # Only answers that changed since an earlier submission reach the AI
+    eval_scores, ai_dep = await followup_eval.evaluate(db, assignment, payload.responses)
 
-    ai_dep = await calculate_ai_dependency(assignment.text, payload.responses)
+    scored = score_evaluation(eval_scores, assignment.subject)
 
+    previous_score = assignment.final_score
     assignment.student_responses = payload.responses
-    assignment.concept_clarity = score_breakdown.concept_clarity
-    assignment.application = score_breakdown.application
-    assignment.logical_consistency = score_breakdown.logical_consistency
-    assignment.depth = score_breakdown.depth
-    assignment.final_score = score_breakdown.final_score
-    assignment.radar_clarity = radar.clarity
-    assignment.radar_application = radar.application
-    assignment.radar_logic = radar.logic
-    assignment.radar_critical_thinking = radar.critical_thinking
-    assignment.radar_retention = radar.retention
+    for column, value in scored.columns().items():
+        setattr(assignment, column, value)
     assignment.ai_dependency_score = ai_dep
     assignment.status = "completed"
     assignment.updated_at = datetime.utcnow()
+    await score_sketch.record_score(db, assignment, previous=previous_score)
+    event = invalidation.score_event(assignment, previous=previous_score)
+    await invalidation.publish(db, event)
+    await db.commit()
+    await invalidation.after_commit(event)
 
-    return {
+    return FastJSONResponse({
         "message": "Follow-up responses evaluated",
         "assignment_id": assignment.id,
-        "scores": score_breakdown.model_dump(),
-        "radar_scores": radar.model_dump(),
+        "scores": scored.scores.model_dump(),
+        "radar_scores": scored.radar.model_dump(),
         "ai_dependency_score": ai_dep,
-    }
+    })
 
 
 @router.get("/dashboard", response_model=DashboardResponse)
 async def get_dashboard(
-    current_user: User = Depends(require_student),
+    current_user: Principal = Depends(require_student),
     db: AsyncSession = Depends(get_db),
 ):
     """Return student dashboard overview. Requires student JWT."""
 
-    result = await db.execute(
-        select(Assignment)
-        .where(Assignment.student_id == current_user.id)
-        .order_by(Assignment.created_at.asc())
-    )
-    assignments = result.scalars().all()
+    async def build() -> bytes:
+        if settings.FAST_READ_PATH:
+            rows = await fast_reads.fetch_dashboard_rows(current_user.id)
+            return to_json_bytes(_build_dashboard(rows))
 
-    if not assignments:
-        return DashboardResponse(
-            overall_score=0,
-            total_assignments=0,
-            score_history=[],
-            weak_topic_summary=[],
-            ai_dependency_score=0,
-            growth_trend=0,
+        result = await db.execute(
+            select(Assignment)
+            .where(Assignment.student_id == current_user.id)
+            .order_by(Assignment.created_at.asc())
         )
+        assignments = result.scalars().all()
 
-    score_history = []
-    score_values = []
-    ai_deps = []
-    all_weak: list[list[str]] = []
-
-    for a in assignments:
-        score_values.append(a.final_score)
-        score_history.append({
-            "date": a.created_at.isoformat() if a.created_at else "",
-            "score": a.final_score,
-        })
-        ai_deps.append(a.ai_dependency_score)
-        all_weak.append(a.weak_topics or [])
+        return to_json_bytes(_build_dashboard(
+            (a.final_score, a.ai_dependency_score, a.weak_topics, a.created_at)
+            for a in assignments
+        ))
 
-    weak_topic_summary = aggregate_weak_topics_from_list(all_weak)
-    growth = compute_growth_trend(score_values)
-    avg_ai_dep = sum(ai_deps) / len(ai_deps) if ai_deps else 0
-
-    return DashboardResponse(
-        overall_score=round(score_values[-1], 1) if score_values else 0,
-        total_assignments=len(assignments),
-        score_history=score_history,
-        weak_topic_summary=weak_topic_summary,
-        ai_dependency_score=round(avg_ai_dep, 1),
-        growth_trend=growth,
-    )
+    body = await analytics_cache.snapshot(f"dashboard:{current_user.id}", build)
+    return json_bytes_response(body)
 
 
 @router.get("/results/{assignment_id}", response_model=AssignmentResultResponse)
 async def get_results(
     assignment_id: int,
-    current_user: User = Depends(require_student),
+    current_user: Principal = Depends(require_student),
     db: AsyncSession = Depends(get_db),
 ):
     """Return detailed results for a specific assignment."""
 
+    if settings.FAST_READ_PATH:
+        fast_result = await fast_reads.fetch_result(assignment_id, current_user.id)
+        if not fast_result:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Assignment not found.",
+            )
+        return FastJSONResponse(fast_result)
+
     result = await db.execute(
         select(Assignment).where(
             Assignment.id == assignment_id,
@@ -281,7 +297,7 @@ async def get_results(
             detail="Assignment not found.",
         )
 
-    return AssignmentResultResponse(
+    return FastJSONResponse(AssignmentResultResponse(
         assignment_id=assignment.id,
         status=assignment.status,
         scores=_assignment_to_scores(assignment),
@@ -291,4 +307,4 @@ async def get_results(
         followup_questions=assignment.followup_questions or [],
         ai_dependency_score=assignment.ai_dependency_score,
         created_at=assignment.created_at.isoformat() if assignment.created_at else "",
-    )
+    ))
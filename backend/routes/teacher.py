@@ -2,18 +2,24 @@
 Teacher Routes — Class analytics, individual student analytics (PostgreSQL + JWT Auth).
 """
 
-from fastapi import APIRouter, HTTPException, status, Depends
+from typing import List
+
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func as sql_func
+from sqlalchemy import case, select, func as sql_func
 
 from database.connection import get_db
-from models.user_model import User
+from models.user_model import User, Principal
 from models.assignment_model import (
     Assignment,
     ClassAnalyticsResponse,
     StudentAnalyticsResponse,
+    ScoreDistributionResponse,
+    PeerMatch,
+    PeerMatchResponse,
+    ImportStatusResponse,
 )
-from services.scoring_service import compute_growth_trend, build_radar_scores
+from services.scoring_service import compute_growth_trend, growth_between, build_radar_scores
 from services.recommendation_service import (
     aggregate_weak_topics_from_list,
     get_most_weak_topic,
@@ -21,17 +27,19 @@ from services.recommendation_service import (
     compute_performance_distribution,
     generate_intervention_suggestions,
 )
+from services import analytics_cache, bulk_import, peer_index, score_sketch
 from routes.deps import require_teacher
+from routes.responses import FastJSONResponse, to_json_bytes, json_bytes_response
 
 router = APIRouter(prefix="/teacher", tags=["Teacher"])
 
 
-@router.get("/class-analytics", response_model=ClassAnalyticsResponse)
-async def get_class_analytics(
-    current_user: User = Depends(require_teacher),
-    db: AsyncSession = Depends(get_db),
-):
-    """Class-wide analytics. Requires teacher JWT."""
+# ---------- Snapshot builders ----------
+# Each returns the response body; routes serve it through analytics_cache.
+
+
+async def _class_analytics(db: AsyncSession) -> ClassAnalyticsResponse:
+    """Class-wide aggregates over every assignment."""
 
     student_count_result = await db.execute(
         select(sql_func.count(User.id)).where(User.role == "student")
@@ -44,7 +52,7 @@ async def get_class_analytics(
     all_assignments = result.scalars().all()
 
     if not all_assignments:
-        return ClassAnalyticsResponse(
+        return ClassAnalyticsResponse.model_construct(
             class_average=0,
             total_students=student_count,
             most_weak_topic="No data",
@@ -100,7 +108,7 @@ async def get_class_analytics(
             "avg": round(sum(scores) / len(scores), 1),
         })
 
-    return ClassAnalyticsResponse(
+    return ClassAnalyticsResponse.model_construct(
         class_average=round(class_avg, 1),
         total_students=max(student_count, len(student_latest_scores)),
         most_weak_topic=most_weak,
@@ -112,44 +120,70 @@ async def get_class_analytics(
     )
 
 
-@router.get("/students")
-async def list_students(
-    current_user: User = Depends(require_teacher),
-    db: AsyncSession = Depends(get_db),
-):
-    """List all students with their latest scores for the teacher table."""
+async def _student_list(db: AsyncSession) -> list[dict]:
+    """
+    Every student with their latest score, weak topic and trend, in one
+    query: each student's assignments are numbered in created_at order,
+    summed per half for the trend and joined to the last one.
+    """
+
+    ranked = (
+        select(
+            Assignment.student_id,
+            Assignment.final_score,
+            Assignment.weak_topics,
+            Assignment.ai_dependency_score,
+            sql_func.row_number().over(
+                partition_by=Assignment.student_id,
+                order_by=(Assignment.created_at.asc(), Assignment.id.asc()),
+            ).label("n"),
+            sql_func.count().over(partition_by=Assignment.student_id).label("total"),
+        )
+        .cte("ranked")
+    )
+    in_first_half = ranked.c.n <= ranked.c.total // 2
+    halves = (
+        select(
+            ranked.c.student_id,
+            sql_func.count().label("total"),
+            sql_func.sum(case((in_first_half, ranked.c.final_score), else_=0)).label("first"),
+            sql_func.sum(case((in_first_half, 0), else_=ranked.c.final_score)).label("second"),
+        )
+        .group_by(ranked.c.student_id)
+        .subquery()
+    )
+    latest = select(ranked).where(ranked.c.n == ranked.c.total).subquery()
 
     result = await db.execute(
-        select(User).where(User.role == "student").order_by(User.name)
+        select(
+            User.id,
+            User.name,
+            latest.c.final_score,
+            latest.c.weak_topics,
+            latest.c.ai_dependency_score,
+            halves.c.total,
+            halves.c.first,
+            halves.c.second,
+        )
+        .outerjoin(latest, latest.c.student_id == User.id)
+        .outerjoin(halves, halves.c.student_id == User.id)
+        .where(User.role == "student")
+        .order_by(User.name)
     )
-    students = result.scalars().all()
 
     student_list = []
-    for s in students:
-        # Get latest assignment
-        a_result = await db.execute(
-            select(Assignment)
-            .where(Assignment.student_id == s.id)
-            .order_by(Assignment.created_at.desc())
-            .limit(1)
-        )
-        latest = a_result.scalar_one_or_none()
-
-        # Get all scores for trend
-        all_result = await db.execute(
-            select(Assignment.final_score)
-            .where(Assignment.student_id == s.id)
-            .order_by(Assignment.created_at.asc())
-        )
-        all_scores = [row[0] for row in all_result.all()]
-        growth = compute_growth_trend(all_scores)
+    for s in result.all():
+        growth = 0.0
+        if s.total and s.total >= 2:
+            mid = s.total // 2
+            growth = growth_between(s.first / mid, s.second / (s.total - mid))
 
         weak_topic = "N/A"
-        if latest and latest.weak_topics:
-            weak_topic = latest.weak_topics[0]
+        if s.weak_topics:
+            weak_topic = s.weak_topics[0]
 
-        score = latest.final_score if latest else 0
-        ai_dep = latest.ai_dependency_score if latest else 0
+        score = s.final_score if s.final_score is not None else 0
+        ai_dep = s.ai_dependency_score if s.ai_dependency_score is not None else 0
 
         if score >= 80:
             status_label = "Strong"
@@ -171,13 +205,10 @@ async def list_students(
     return student_list
 
 
-@router.get("/student/{student_id}", response_model=StudentAnalyticsResponse)
-async def get_student_analytics(
-    student_id: int,
-    current_user: User = Depends(require_teacher),
-    db: AsyncSession = Depends(get_db),
-):
-    """Individual student analytics. Requires teacher JWT."""
+async def _student_analytics(
+    db: AsyncSession, student_id: int
+) -> StudentAnalyticsResponse:
+    """One student's history, radar scores, topic timeline and suggestions."""
 
     user_result = await db.execute(
         select(User).where(User.id == student_id)
@@ -237,7 +268,7 @@ async def get_student_analytics(
     unique_weak = list(dict.fromkeys(all_weak_topics))
     suggestions = generate_intervention_suggestions(unique_weak, avg_ai_dep, growth)
 
-    return StudentAnalyticsResponse(
+    return StudentAnalyticsResponse.model_construct(
         student_id=student_id,
         student_name=student_name,
         overall_score=round(score_values[-1], 1) if score_values else 0,
@@ -249,3 +280,182 @@ async def get_student_analytics(
         topic_timeline=topic_timeline,
         intervention_suggestions=suggestions,
     )
+
+
+# ---------- Routes ----------
+
+
+@router.get("/class-analytics", response_model=ClassAnalyticsResponse)
+async def get_class_analytics(
+    current_user: Principal = Depends(require_teacher),
+    db: AsyncSession = Depends(get_db),
+):
+    """Class-wide analytics. Requires teacher JWT."""
+
+    async def build() -> bytes:
+        return to_json_bytes(await _class_analytics(db))
+
+    return json_bytes_response(await analytics_cache.snapshot("class", build))
+
+
+@router.get("/students")
+async def list_students(
+    current_user: Principal = Depends(require_teacher),
+    db: AsyncSession = Depends(get_db),
+):
+    """List all students with their latest scores for the teacher table."""
+
+    async def build() -> bytes:
+        return to_json_bytes(await _student_list(db))
+
+    return json_bytes_response(await analytics_cache.snapshot("students", build))
+
+
+@router.get("/student/{student_id}", response_model=StudentAnalyticsResponse)
+async def get_student_analytics(
+    student_id: int,
+    current_user: Principal = Depends(require_teacher),
+    db: AsyncSession = Depends(get_db),
+):
+    """Individual student analytics. Requires teacher JWT."""
+
+    async def build() -> bytes:
+        return to_json_bytes(await _student_analytics(db, student_id))
+
+    body = await analytics_cache.snapshot(f"student:{student_id}", build)
+    return json_bytes_response(body)
+
+
+@router.get("/score-distribution", response_model=ScoreDistributionResponse)
+async def get_score_distribution(
+    scope: List[str] = Query(["latest"]),
+    percentiles: str = Query("25,50,75,90"),
+    bins: int = Query(10, ge=1, le=100),
+    current_user: Principal = Depends(require_teacher),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Percentiles and histogram from the score sketches. Repeat `scope` to
+    merge several, e.g. ?scope=subject:Math&scope=subject:Physics.
+    Requires teacher JWT.
+    """
+    try:
+        ps = [float(p) for p in percentiles.split(",") if p.strip()]
+    except ValueError:
+        ps = []
+    if not ps or any(p < 0 or p > 100 for p in ps):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="percentiles must be comma-separated numbers between 0 and 100.",
+        )
+
+    hist = await score_sketch.load(db, scope)
+    values = hist.percentiles(ps)
+    return FastJSONResponse(ScoreDistributionResponse.model_construct(
+        scopes=scope,
+        count=hist.total,
+        mean=hist.mean(),
+        percentiles={f"p{p:g}": values[p] for p in sorted(values)},
+        histogram=hist.histogram(bins),
+    ))
+
+
+@router.get("/score-distribution/scopes")
+async def list_score_scopes(
+    current_user: Principal = Depends(require_teacher),
+    db: AsyncSession = Depends(get_db),
+):
+    """Scopes that have score sketches. Requires teacher JWT."""
+    return FastJSONResponse(await score_sketch.list_scopes(db))
+
+
+@router.get("/student/{student_id}/peers", response_model=PeerMatchResponse)
+async def get_student_peers(
+    student_id: int,
+    mode: str = Query("similar"),
+    k: int = Query(5, ge=1, le=50),
+    current_user: Principal = Depends(require_teacher),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Students whose latest radar profile is most similar to this student's
+    (study partners at the same level) or most complementary (strong where
+    they are weak). Requires teacher JWT.
+    """
+    if mode not in peer_index.MODES:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"mode must be one of: {', '.join(peer_index.MODES)}.",
+        )
+
+    peers = await peer_index.find_peers(student_id, k, mode)
+    if peers is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No scored assignments for this student.",
+        )
+
+    names_result = await db.execute(
+        select(User.id, User.name).where(User.id.in_([sid for sid, _ in peers]))
+    )
+    names = dict(names_result.all())
+    return FastJSONResponse(PeerMatchResponse.model_construct(
+        student_id=student_id,
+        mode=mode,
+        radar_scores=peer_index.radar_of(student_id),
+        peers=[
+            PeerMatch.model_construct(
+                student_id=sid,
+                student_name=names.get(sid, "Unknown"),
+                score=score,
+                radar_scores=peer_index.radar_of(sid),
+            )
+            for sid, score in peers
+        ],
+    ))
+
+
+@router.post(
+    "/imports",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=ImportStatusResponse,
+)
+async def create_import(
+    request: Request,
+    current_user: Principal = Depends(require_teacher),
+):
+    """
+    Bulk-import submissions from an NDJSON, CSV or multipart upload of
+    {student, subject, text} records (student = user id or email). The
+    body is parsed as it streams in; analysis and inserts continue in the
+    background, tracked at the Location URL. Requires teacher JWT.
+    """
+    try:
+        job = await bulk_import.create(
+            current_user.id, request.headers.get("content-type", ""), request.stream()
+        )
+    except bulk_import.UploadError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+    return FastJSONResponse(
+        job.status_response(offset=0, limit=0, failed_only=False),
+        status_code=status.HTTP_202_ACCEPTED,
+        headers={"Location": f"{router.prefix}/imports/{job.id}"},
+    )
+
+
+@router.get("/imports/{import_id}", response_model=ImportStatusResponse)
+async def get_import(
+    import_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=0, le=1000),
+    failed_only: bool = Query(False),
+    current_user: Principal = Depends(require_teacher),
+):
+    """Progress of a bulk import and a page of its items. Requires teacher JWT."""
+    job = bulk_import.get(import_id)
+    if job is None or job.teacher_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import not found.",
+        )
+    return FastJSONResponse(job.status_response(offset, limit, failed_only))
@@ -0,0 +1,49 @@
+"""
+AI provider interface — the operations ai_service delegates to.
+"""
+
+from typing import Dict, List
+
+
+class AIProviderError(Exception):
+    """The provider failed to produce a usable answer."""
+
+
+class AIRateLimited(AIProviderError):
+    """The provider rejected the call with a rate limit (HTTP 429)."""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__("AI provider rate limit exceeded.")
+        self.retry_after = retry_after
+
+
+class AITimeout(AIProviderError):
+    """The provider did not answer in time."""
+
+
+class AIProvider:
+    """Base class for AI backends. Every method is a single provider call."""
+
+    name = "base"
+
+    async def generate_followup_questions(self, text: str) -> List[Dict[str, str]]:
+        raise NotImplementedError
+
+    async def evaluate_understanding(
+        self, text: str, responses: Dict[str, str]
+    ) -> Dict[str, float]:
+        raise NotImplementedError
+
+    async def extract_weak_topics(self, text: str) -> List[str]:
+        raise NotImplementedError
+
+    async def recommend_books(self, weak_topics: List[str]) -> List[Dict[str, str]]:
+        raise NotImplementedError
+
+    async def calculate_ai_dependency(
+        self, text: str, responses: Dict[str, str]
+    ) -> float:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Release network resources on shutdown."""
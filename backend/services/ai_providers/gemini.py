@@ -0,0 +1,168 @@
+"""
+Gemini provider — real calls to the Gemini generateContent REST API.
+
+Each operation sends one prompt asking for a JSON answer and normalizes
+the result into the shapes the routes expect (scores clamped to 0–100).
+An answer missing a score, or with a non-numeric one, is an
+AIProviderError rather than a score of 0. The API key travels in the
+x-goog-api-key header, never in the URL.
+"""
+
+import json
+import math
+from typing import Any, Dict, List
+
+import httpx
+
+from services.ai_providers.base import (
+    AIProvider,
+    AIProviderError,
+    AIRateLimited,
+    AITimeout,
+)
+
+API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+
+SCORE_KEYS = (
+    "concept_clarity", "application", "logical_consistency", "depth",
+    "clarity", "critical_thinking", "retention",
+)
+
+
+def _is_number(value: Any) -> bool:
+    return (
+        isinstance(value, (int, float))
+        and not isinstance(value, bool)
+        and math.isfinite(value)
+    )
+
+
+def _clamp(value: float) -> float:
+    return round(min(100.0, max(0.0, float(value))), 1)
+
+
+def _score(data: Dict[str, Any], key: str) -> float:
+    """data[key] clamped to 0–100; a missing or non-numeric score is an error, not a 0."""
+    value = data.get(key)
+    if not _is_number(value):
+        raise AIProviderError(f"Gemini answer has no numeric {key!r}.")
+    return _clamp(value)
+
+
+class GeminiProvider(AIProvider):
+    name = "gemini"
+
+    def __init__(self, api_key: str, model: str, timeout: float):
+        if not api_key:
+            raise AIProviderError("GEMINI_API_KEY is required for the gemini provider.")
+        self.api_key = api_key
+        self.model = model
+        self._client = httpx.AsyncClient(base_url=API_BASE, timeout=timeout)
+
+    async def _generate_json(self, prompt: str, expect: type) -> Any:
+        """The answer to `prompt`, which must be a JSON `expect` (list or dict)."""
+        try:
+            resp = await self._client.post(
+                f"/models/{self.model}:generateContent",
+                # In a header, so the key stays out of proxy and access logs
+                headers={"x-goog-api-key": self.api_key},
+                json={
+                    "contents": [{"parts": [{"text": prompt}]}],
+                    "generationConfig": {
+                        "responseMimeType": "application/json",
+                        "temperature": 0.2,
+                    },
+                },
+            )
+        except httpx.TimeoutException as exc:
+            raise AITimeout("Gemini request timed out.") from exc
+        except httpx.HTTPError as exc:
+            raise AIProviderError(f"Gemini request failed: {exc}") from exc
+
+        if resp.status_code == 429:
+            retry_after = resp.headers.get("retry-after", "1")
+            raise AIRateLimited(int(retry_after) if retry_after.isdigit() else 1)
+        if resp.status_code >= 400:
+            raise AIProviderError(f"Gemini returned HTTP {resp.status_code}.")
+
+        try:
+            text = resp.json()["candidates"][0]["content"]["parts"][0]["text"]
+            data = json.loads(text)
+        except (KeyError, IndexError, TypeError, ValueError) as exc:
+            raise AIProviderError("Gemini returned an unparseable answer.") from exc
+        if not isinstance(data, expect):
+            raise AIProviderError(
+                f"Gemini returned a JSON {type(data).__name__}, expected a {expect.__name__}."
+            )
+        return data
+
+    async def generate_followup_questions(self, text: str) -> List[Dict[str, str]]:
+        data = await self._generate_json(
+            "You are verifying that a student understands their own submission. "
+            "Write exactly 3 probing follow-up questions that distinguish real "
+            "understanding from rote or AI-generated text. Answer as a JSON list "
+            'of strings.\n\nSubmission:\n' + text,
+            list,
+        )
+        return [
+            {"id": f"q{i}", "question": str(q)}
+            for i, q in enumerate(data[:3], start=1)
+        ]
+
+    async def evaluate_understanding(
+        self, text: str, responses: Dict[str, str]
+    ) -> Dict[str, float]:
+        data = await self._generate_json(
+            "Score the student's understanding from 0 to 100 on each of these "
+            f"dimensions: {', '.join(SCORE_KEYS)}. Answer as a JSON object with "
+            "exactly those keys.\n\nSubmission:\n" + text
+            + "\n\nFollow-up answers:\n" + json.dumps(responses),
+            dict,
+        )
+        return {key: _score(data, key) for key in SCORE_KEYS}
+
+    async def extract_weak_topics(self, text: str) -> List[str]:
+        data = await self._generate_json(
+            "List the 2 to 4 computer science topics where this submission shows "
+            "misconceptions or shallow understanding. Use short canonical topic "
+            "names. Answer as a JSON list of strings.\n\nSubmission:\n" + text,
+            list,
+        )
+        return [str(t) for t in data][:4]
+
+    async def recommend_books(self, weak_topics: List[str]) -> List[Dict[str, str]]:
+        data = await self._generate_json(
+            "Recommend one well-known book for each topic below. Answer as a "
+            'JSON list of objects with keys "title", "author", "topic" and '
+            '"match_percentage" (integer 0-100).\n\nTopics: '
+            + json.dumps(weak_topics),
+            list,
+        )
+        return [
+            {
+                "title": str(b.get("title", "")),
+                "author": str(b.get("author", "")),
+                "topic": str(b.get("topic", "")),
+                "match_percentage": (
+                    int(_clamp(b["match_percentage"])) if _is_number(b.get("match_percentage")) else 0
+                ),
+            }
+            for b in data
+            if isinstance(b, dict)
+        ]
+
+    async def calculate_ai_dependency(
+        self, text: str, responses: Dict[str, str]
+    ) -> float:
+        data = await self._generate_json(
+            "Estimate from 0 to 100 how likely it is that the submission was "
+            "produced with heavy AI assistance, comparing its style and depth with "
+            'the follow-up answers. Answer as a JSON object {"risk": number}.'
+            "\n\nSubmission:\n" + text + "\n\nFollow-up answers:\n"
+            + json.dumps(responses),
+            dict,
+        )
+        return _score(data, "risk")
+
+    async def close(self) -> None:
+        await self._client.aclose()
@@ -0,0 +1,143 @@
+"""
+Simulated provider — seeded outputs with modelled latency and failures.
+
+Outputs are a pure function of (seed, operation, inputs), so the same
+submission always scores the same. Call behaviour is drawn from a
+separate seeded stream:
+  * latency   — lognormal around a median, capped at the timeout,
+  * errors    — provider failures at a fixed rate,
+  * timeouts  — calls that hang until the timeout and then fail,
+  * 429s      — a base rate, plus "storms": after any 429, calls within
+                the storm window are rejected at a much higher rate.
+"""
+
+import asyncio
+import hashlib
+import math
+import random
+import time
+from typing import Dict, List
+
+from services.ai_providers.base import (
+    AIProvider,
+    AIProviderError,
+    AIRateLimited,
+    AITimeout,
+)
+
+TOPICS = [
+    "Recursion",
+    "Dynamic Programming",
+    "Graph Theory",
+    "Data Structures",
+    "Sorting Algorithms",
+    "Trees & BST",
+    "Time Complexity",
+    "Memory Management",
+    "Object-Oriented Design",
+    "Database Normalization",
+]
+
+SCORE_KEYS = (
+    "concept_clarity", "application", "logical_consistency", "depth",
+    "clarity", "critical_thinking", "retention",
+)
+
+
+class SimulatedProvider(AIProvider):
+    name = "simulated"
+
+    def __init__(
+        self,
+        seed: int = 0,
+        latency_median_ms: float = 800.0,
+        latency_sigma: float = 0.5,
+        error_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        timeout_seconds: float = 30.0,
+        rate_limit_rate: float = 0.0,
+        storm_seconds: float = 0.0,
+        storm_rate: float = 0.9,
+    ):
+        self.seed = seed
+        self.latency_median = latency_median_ms / 1000
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_seconds = timeout_seconds
+        self.rate_limit_rate = rate_limit_rate
+        self.storm_seconds = storm_seconds
+        self.storm_rate = storm_rate
+        self._behaviour = random.Random(seed)
+        self._storm_until = 0.0
+
+    def _outputs(self, *parts: str) -> random.Random:
+        key = "\x1f".join((str(self.seed),) + parts).encode()
+        digest = hashlib.blake2b(key, digest_size=8).digest()
+        return random.Random(int.from_bytes(digest, "big"))
+
+    async def _call(self) -> None:
+        """Model one provider round trip: maybe fail, otherwise wait."""
+        rng = self._behaviour
+        now = time.monotonic()
+
+        in_storm = now < self._storm_until
+        if rng.random() < (self.storm_rate if in_storm else self.rate_limit_rate):
+            if self.storm_seconds and not in_storm:
+                self._storm_until = now + self.storm_seconds
+            await asyncio.sleep(min(self.latency_median, 0.05))
+            raise AIRateLimited(retry_after=max(1, math.ceil(self.storm_seconds)))
+
+        if rng.random() < self.timeout_rate:
+            await asyncio.sleep(self.timeout_seconds)
+            raise AITimeout("Simulated provider timeout.")
+
+        latency = self.latency_median * math.exp(rng.gauss(0, self.latency_sigma))
+        await asyncio.sleep(min(latency, self.timeout_seconds))
+        if rng.random() < self.error_rate:
+            raise AIProviderError("Simulated provider error.")
+
+    async def generate_followup_questions(self, text: str) -> List[Dict[str, str]]:
+        await self._call()
+        rng = self._outputs("followup", text)
+        topics = rng.sample(TOPICS, 3)
+        return [
+            {
+                "id": f"q{i}",
+                "question": f"Explain how {topic} applies to your solution.",
+            }
+            for i, topic in enumerate(topics, start=1)
+        ]
+
+    async def evaluate_understanding(
+        self, text: str, responses: Dict[str, str]
+    ) -> Dict[str, float]:
+        await self._call()
+        rng = self._outputs("evaluate", text, str(sorted(responses.items())))
+        level = rng.uniform(55, 90)
+        return {k: round(min(100, max(0, rng.gauss(level, 6))), 1) for k in SCORE_KEYS}
+
+    async def extract_weak_topics(self, text: str) -> List[str]:
+        await self._call()
+        rng = self._outputs("topics", text)
+        return rng.sample(TOPICS, rng.randint(2, 4))
+
+    async def recommend_books(self, weak_topics: List[str]) -> List[Dict[str, str]]:
+        await self._call()
+        recommendations = []
+        for topic in weak_topics:
+            rng = self._outputs("books", topic)
+            recommendations.append({
+                "title": f"Foundations of {topic}",
+                "author": "Simulated Press",
+                "topic": topic,
+                "match_percentage": rng.randint(70, 96),
+            })
+        return recommendations
+
+    async def calculate_ai_dependency(
+        self, text: str, responses: Dict[str, str]
+    ) -> float:
+        await self._call()
+        rng = self._outputs("dependency", text, str(sorted(responses.items())))
+        return round(rng.uniform(5, 80), 1)
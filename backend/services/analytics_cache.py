@@ -0,0 +1,33 @@
+"""
+Analytics Cache — pre-serialized JSON snapshots of the heavy read views.
+
+Snapshots are stored as the exact response bytes in the shared cache
+(services/shared_cache.py), so a hit costs neither aggregation nor
+serialization. Writes evict them locally and, through
+services/invalidation.py, in every other worker. Keys:
+    "class"            — /teacher/class-analytics
+    "students"         — /teacher/students
+    "student:{id}"     — /teacher/student/{id}
+    "dashboard:{id}"   — /student/dashboard
+"""
+
+from typing import Awaitable, Callable
+
+from config import get_settings
+from services.shared_cache import Cache
+
+settings = get_settings()
+
+snapshots = Cache("analytics", ttl=settings.ANALYTICS_CACHE_TTL)
+
+
+async def snapshot(key: str, build: Callable[[], Awaitable[bytes]]) -> bytes:
+    """Cached snapshot for `key`; concurrent misses share one build."""
+    return await snapshots.get_or_set(key, build)
+
+
+async def invalidate_student(student_id: int) -> None:
+    """Drop every snapshot that includes this student's scores."""
+    await snapshots.delete(
+        "class", "students", f"student:{student_id}", f"dashboard:{student_id}"
+    )
@@ -0,0 +1,285 @@
+"""
+Book Catalog Service — ranked topic → book matching over a compiled catalog.
+
+Replaces the AI round trip for book recommendations when BOOK_CATALOG_PATH
+points at a catalog compiled by `python -m jobs.build_book_catalog`.
+
+On-disk format (little-endian, sections 8-byte aligned):
+    header          magic, counts, avgdl, then each section's (offset, length)
+    book_offsets    uint32[n_books + 1]   into book_text
+    doc_len         uint16[n_books]       field-weighted token count
+    term_offsets    uint32[n_terms + 1]   into term_text (terms sorted)
+    post_offsets    uint32[n_terms + 1]   into post_docs / post_tf
+    post_docs       uint32[n_postings]    book ids, ascending per term
+    post_tf         uint16[n_postings]    field-weighted term frequency
+    term_text       utf-8
+    book_text       utf-8 "title\\x1fauthor\\x1ftopic; topic" per book
+
+The file is memory-mapped and every array is a zero-copy NumPy view, so
+opening a catalog of tens of thousands of books costs one term-dictionary
+decode. Only matched books' text is decoded. NumPy is imported when a
+catalog is built or opened, not with this module.
+
+Scoring is BM25 over each book's topics (weighted TOPIC_WEIGHT) and title.
+match_percentage is the score relative to an ideal book whose topic is
+exactly the query, so a book that is squarely on topic scores near 100.
+"""
+
+import mmap
+import re
+import struct
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config import get_settings
+
+MAGIC = b"VLBOOKS1"
+TOPIC_WEIGHT = 3
+K1 = 1.2
+B = 0.75
+
+_HEADER = struct.Struct("<8sIIIf")
+_SECTIONS = (
+    ("book_offsets", "<u4"),
+    ("doc_len", "<u2"),
+    ("term_offsets", "<u4"),
+    ("post_offsets", "<u4"),
+    ("post_docs", "<u4"),
+    ("post_tf", "<u2"),
+    ("term_text", "u1"),
+    ("book_text", "u1"),
+)  # NumPy dtype strings
+_SECTION = struct.Struct("<QQ")  # byte offset, element count
+_HEADER_SIZE = _HEADER.size + _SECTION.size * len(_SECTIONS)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and the of in on for to with by from into at as is its your vol".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric terms, stopwords dropped, plural -s folded."""
+    terms = []
+    for term in _TOKEN.findall(text.lower()):
+        if term in _STOPWORDS:
+            continue
+        if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+            term = term[:-1]
+        terms.append(term)
+    return terms
+
+
+# ---------- Build ----------
+
+
+def build(books: Iterable[dict], path: str) -> int:
+    """
+    Compile {"title", "author", "topics": [...]} records into a catalog
+    file at `path`. Returns the number of books written.
+    """
+    import numpy as np
+
+    texts: List[bytes] = []
+    doc_len: List[int] = []
+    postings: Dict[str, Dict[int, int]] = {}
+
+    for book in books:
+        title = str(book.get("title") or "").strip()
+        if not title:
+            continue
+        topics = [str(t).strip() for t in book.get("topics") or [] if str(t).strip()]
+        doc_id = len(texts)
+        tf: Dict[str, int] = {}
+        for topic in topics:
+            for term in tokenize(topic):
+                tf[term] = tf.get(term, 0) + TOPIC_WEIGHT
+        for term in tokenize(title):
+            tf[term] = tf.get(term, 0) + 1
+        for term, n in tf.items():
+            postings.setdefault(term, {})[doc_id] = min(n, 0xFFFF)
+        doc_len.append(min(sum(tf.values()), 0xFFFF))
+        author = str(book.get("author") or "").strip()
+        texts.append("\x1f".join((title, author, "; ".join(topics))).encode())
+
+    terms = sorted(postings)
+    term_bytes = [t.encode() for t in terms]
+    post_docs: List[int] = []
+    post_tf: List[int] = []
+    post_offsets = [0]
+    for term in terms:
+        for doc_id, n in sorted(postings[term].items()):
+            post_docs.append(doc_id)
+            post_tf.append(n)
+        post_offsets.append(len(post_docs))
+
+    arrays = {
+        "book_offsets": np.cumsum([0] + [len(t) for t in texts], dtype=np.uint32),
+        "doc_len": np.asarray(doc_len, dtype=np.uint16),
+        "term_offsets": np.cumsum([0] + [len(t) for t in term_bytes], dtype=np.uint32),
+        "post_offsets": np.asarray(post_offsets, dtype=np.uint32),
+        "post_docs": np.asarray(post_docs, dtype=np.uint32),
+        "post_tf": np.asarray(post_tf, dtype=np.uint16),
+        "term_text": np.frombuffer(b"".join(term_bytes), dtype=np.uint8),
+        "book_text": np.frombuffer(b"".join(texts), dtype=np.uint8),
+    }
+    avgdl = float(np.mean(arrays["doc_len"])) if doc_len else 0.0
+
+    with open(path, "wb") as f:
+        f.write(b"\0" * _HEADER_SIZE)
+        table = []
+        for name, dtype in _SECTIONS:
+            f.write(b"\0" * (-f.tell() % 8))
+            table.append((f.tell(), len(arrays[name])))
+            f.write(arrays[name].astype(dtype, copy=False).tobytes())
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, len(texts), len(terms), len(post_docs), avgdl))
+        for offset, count in table:
+            f.write(_SECTION.pack(offset, count))
+    return len(texts)
+
+
+# ---------- Query ----------
+
+
+class BookCatalog:
+    """A memory-mapped, compiled catalog with a BM25 inverted index."""
+
+    def __init__(self, path: str, cache_size: int = 4096):
+        import numpy as np
+
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.n_books, self.n_terms, _, self.avgdl = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a compiled book catalog")
+
+        sections = {}
+        for i, (name, dtype) in enumerate(_SECTIONS):
+            offset, count = _SECTION.unpack_from(self._mm, _HEADER.size + i * _SECTION.size)
+            sections[name] = np.frombuffer(self._mm, dtype=dtype, count=count, offset=offset)
+        self._book_offsets = sections["book_offsets"]
+        self._post_offsets = sections["post_offsets"]
+        self._post_docs = sections["post_docs"]
+        self._post_tf = sections["post_tf"]
+        self._book_text = sections["book_text"]
+
+        term_offsets = sections["term_offsets"].tolist()
+        term_text = sections["term_text"].tobytes()
+        self._terms = {
+            term_text[term_offsets[i]:term_offsets[i + 1]].decode(): i
+            for i in range(self.n_terms)
+        }
+
+        df = np.diff(self._post_offsets).astype(np.float64)
+        self._idf = np.log(1 + (self.n_books - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avgdl = self.avgdl or 1.0
+        doc_len = sections["doc_len"].astype(np.float32)
+        self._norm = (K1 * (1 - B + B * doc_len / avgdl)).astype(np.float32)
+        self._max_idf = float(np.log(1 + (self.n_books + 0.5) / 0.5))
+        self.rank = lru_cache(maxsize=cache_size)(self._rank)
+
+    def __len__(self) -> int:
+        return self.n_books
+
+    def book(self, doc_id: int) -> Tuple[str, str, str]:
+        """(title, author, topics) for a book id."""
+        start, end = self._book_offsets[doc_id], self._book_offsets[doc_id + 1]
+        title, author, topics = self._book_text[start:end].tobytes().decode().split("\x1f")
+        return title, author, topics
+
+    def _rank(self, topic: str, limit: int = 5) -> Tuple[Tuple[int, int], ...]:
+        """Best (book id, match_percentage) for one topic, best first."""
+        import numpy as np
+
+        terms = list(dict.fromkeys(tokenize(topic)))
+        term_ids = [self._terms[t] for t in terms if t in self._terms]
+        if not term_ids:
+            return ()
+
+        docs, contributions = [], []
+        for t in term_ids:
+            lo, hi = self._post_offsets[t], self._post_offsets[t + 1]
+            d = self._post_docs[lo:hi]
+            tf = self._post_tf[lo:hi].astype(np.float32)
+            docs.append(d)
+            contributions.append(self._idf[t] * tf * (K1 + 1) / (tf + self._norm[d]))
+        docs = np.concatenate(docs)
+        unique, inverse = np.unique(docs, return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(contributions))
+
+        # Ideal book: exactly the query's terms, each as a topic term. Terms
+        # no book has count at the rarest possible idf, so they lower the match.
+        unknown = len(terms) - len(term_ids)
+        idf_sum = float(np.sum(self._idf[term_ids])) + unknown * self._max_idf
+        tf = float(TOPIC_WEIGHT)
+        norm = K1 * (1 - B + B * tf * len(terms) / (self.avgdl or 1.0))
+        ideal = idf_sum * tf * (K1 + 1) / (tf + norm)
+
+        limit = min(limit, len(unique))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.lexsort((unique[top], -scores[top]))]
+        return tuple(
+            (int(unique[i]), min(100, round(100 * float(scores[i]) / ideal)))
+            for i in top
+        )
+
+    def recommend(
+        self, weak_topics: Sequence[str], per_topic: int = 1, minimum: int = 3
+    ) -> List[Dict[str, object]]:
+        """
+        Book recommendations for many topics in one call: the best
+        `per_topic` books for each topic, topped up to `minimum` with the
+        next best matches. A book is recommended at most once.
+        """
+        ranked = [(topic, self.rank(topic)) for topic in weak_topics]
+        chosen: Dict[int, Tuple[str, int]] = {}
+        for topic, hits in ranked:
+            picked = 0
+            for doc_id, pct in hits:
+                if picked == per_topic:
+                    break
+                if doc_id not in chosen:
+                    chosen[doc_id] = (topic, pct)
+                    picked += 1
+
+        if len(chosen) < minimum:
+            extra = sorted(
+                (
+                    (-pct, doc_id, topic)
+                    for topic, hits in ranked
+                    for doc_id, pct in hits
+                    if doc_id not in chosen
+                ),
+            )
+            for neg_pct, doc_id, topic in extra:
+                if len(chosen) >= minimum:
+                    break
+                chosen.setdefault(doc_id, (topic, -neg_pct))
+
+        recommendations = []
+        for doc_id, (topic, pct) in chosen.items():
+            title, author, _ = self.book(doc_id)
+            recommendations.append({
+                "title": title,
+                "author": author,
+                "topic": topic,
+                "match_percentage": pct,
+            })
+        return recommendations
+
+
+_catalog: Optional[BookCatalog] = None
+_opened = False
+
+
+def get_catalog() -> Optional[BookCatalog]:
+    """The configured catalog, opened on first use; None if not configured."""
+    global _catalog, _opened
+    if not _opened:
+        _opened = True
+        path = get_settings().BOOK_CATALOG_PATH
+        if path:
+            _catalog = BookCatalog(path)
+            print(f"✓ Book catalog loaded: {len(_catalog)} books from {path}")
+    return _catalog
@@ -0,0 +1,475 @@
+"""
+Bulk Import Service — a whole class's submissions from one upload.
+
+POST /teacher/imports takes the upload as NDJSON (application/x-ndjson),
+CSV (text/csv) or a multipart form with one file part, each record being
+{"student", "subject", "text"}; `student` is a user id or email.
+
+    parse     the request body is read chunk by chunk and split into
+              records as it arrives; nothing holds the whole file. Valid
+              records go to a spool file (in memory up to
+              BULK_IMPORT_SPOOL_MEMORY_BYTES, then on disk), invalid ones
+              are marked failed straight away
+    analyze   once the upload is in, a background task runs the
+              submit-assignment pipeline per record. At most
+              BULK_IMPORT_CONCURRENCY analyses run at once across every
+              import, so imports can't starve interactive submissions
+    insert    analysed rows are inserted BULK_IMPORT_BATCH_SIZE per
+              transaction, with their sketch updates and score events
+
+Progress lives in this worker's memory: GET /teacher/imports/{id} is
+served from the worker that took the upload, and the last
+BULK_IMPORT_KEEP_FINISHED finished imports stay readable.
+"""
+
+import asyncio
+import csv
+import tempfile
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import orjson
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import select
+
+from config import get_settings
+from database import shards
+from database.connection import async_session
+from models.assignment_model import (
+    Assignment,
+    AssignmentSubmit,
+    BookRecommendation,
+    ImportItem,
+    ImportStatusResponse,
+)
+from models.user_model import User
+from services import ai_service, invalidation, score_sketch
+from services.ai_providers.base import AIProviderError
+from services.scoring_service import score_evaluation
+
+settings = get_settings()
+
+_book_list = TypeAdapter(List[BookRecommendation])
+_slots = asyncio.Semaphore(settings.BULK_IMPORT_CONCURRENCY)
+_DONE = object()
+
+
+class UploadError(Exception):
+    """The upload can't be imported at all (size, encoding, format)."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+# ---------- Streaming parse ----------
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """(line number, text) per line of a byte stream, split as chunks arrive."""
+    buffer = b""
+    number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *complete, buffer = buffer.split(b"\n")
+        if len(buffer) > settings.BULK_IMPORT_MAX_LINE_BYTES:
+            raise UploadError(413, f"Line {number + len(complete) + 1} is too long.")
+        for raw in complete:
+            number += 1
+            yield number, _decode(raw, number)
+    if buffer:
+        yield number + 1, _decode(buffer, number + 1)
+
+
+def _decode(raw: bytes, number: int) -> str:
+    try:
+        return raw.rstrip(b"\r").decode("utf-8")
+    except UnicodeDecodeError:
+        raise UploadError(400, f"Line {number} is not UTF-8.")
+
+
+async def _ndjson_records(lines: AsyncIterator[Tuple[int, str]]) -> AsyncIterator[Tuple[int, object]]:
+    async for number, line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield number, orjson.loads(line)
+        except orjson.JSONDecodeError:
+            yield number, "Invalid JSON."
+
+
+async def _csv_records(lines: AsyncIterator[Tuple[int, str]]) -> AsyncIterator[Tuple[int, object]]:
+    """CSV rows as dicts keyed by the header; quoted fields may span lines."""
+    header: Optional[List[str]] = None
+    pending: List[str] = []
+    start = 0
+    async for number, line in lines:
+        if not pending:
+            start = number
+        pending.append(line)
+        joined = "\n".join(pending)
+        if joined.count('"') % 2:
+            continue  # inside a quoted field
+        pending = []
+        if not joined.strip():
+            continue
+        row = next(csv.reader([joined]))
+        if header is None:
+            header = [h.strip() for h in row]
+        else:
+            yield start, dict(zip(header, row))
+    if pending:
+        yield start, "Unterminated quoted field."
+
+
+async def _multipart_file(chunks: AsyncIterator[bytes], boundary: bytes) -> Tuple[str, AsyncIterator[bytes]]:
+    """
+    Skip to the first part with a filename; returns its filename and a
+    stream of its body. Other parts are ignored.
+    """
+    delimiter = b"\r\n--" + boundary
+    buffer = b"\r\n"  # the first delimiter has no preceding CRLF
+    chunks = chunks.__aiter__()
+
+    async def fill() -> bool:
+        nonlocal buffer
+        try:
+            buffer += await chunks.__anext__()
+            return True
+        except StopAsyncIteration:
+            return False
+
+    while True:
+        while (at := buffer.find(delimiter)) < 0:
+            buffer = buffer[-len(delimiter):]
+            if not await fill():
+                raise UploadError(400, "No file part in the multipart upload.")
+        buffer = buffer[at + len(delimiter):]
+        while len(buffer) < 2 and await fill():
+            pass
+        if buffer.startswith(b"--"):
+            raise UploadError(400, "No file part in the multipart upload.")
+        while (end := buffer.find(b"\r\n\r\n")) < 0:
+            if len(buffer) > 16384 or not await fill():
+                raise UploadError(400, "Malformed multipart upload.")
+        headers, buffer = buffer[:end].decode("latin-1"), buffer[end + 4:]
+        filename = None
+        for header in headers.split("\r\n"):
+            if header.lower().startswith("content-disposition:") and "filename=" in header:
+                filename = header.split("filename=", 1)[1].split(";")[0].strip().strip('"')
+        if filename is not None:
+            break
+
+    async def body() -> AsyncIterator[bytes]:
+        nonlocal buffer
+        while True:
+            at = buffer.find(delimiter)
+            if at >= 0:
+                yield buffer[:at]
+                return
+            # Keep enough to recognise a delimiter split across chunks
+            keep = len(delimiter) - 1
+            if len(buffer) > keep:
+                yield buffer[:-keep]
+                buffer = buffer[-keep:]
+            if not await fill():
+                raise UploadError(400, "Multipart upload ended inside the file part.")
+
+    return filename, body()
+
+
+async def records(content_type: str, chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, object]]:
+    """
+    (line number, record) pairs from an upload body; a record that can't
+    be parsed is an error string instead of a dict.
+    """
+    media_type, _, params = content_type.partition(";")
+    media_type = media_type.strip().lower()
+    is_csv = media_type in ("text/csv", "application/csv")
+    if media_type == "multipart/form-data":
+        boundary = ""
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "boundary":
+                boundary = value.strip('"')
+        if not boundary:
+            raise UploadError(400, "Multipart upload without a boundary.")
+        filename, chunks = await _multipart_file(chunks, boundary.encode("latin-1"))
+        is_csv = filename.lower().endswith(".csv")
+    elif not is_csv and media_type not in ("application/x-ndjson", "application/jsonl", "application/json"):
+        raise UploadError(415, "Upload NDJSON, CSV or a multipart form with one file.")
+
+    parse = _csv_records if is_csv else _ndjson_records
+    async for item in parse(_lines(chunks)):
+        yield item
+
+
+# ---------- Import jobs ----------
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+async def _stop(tasks: List[asyncio.Task]) -> None:
+    """Cancel the pipeline stages still running and wait for them to exit."""
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class ImportJob:
+    """One upload: its spooled records, per-item state and counters."""
+
+    def __init__(self, teacher_id: int):
+        self.id = uuid.uuid4().hex
+        self.tenant = shards.current()  # the import task inherits it too
+        self.teacher_id = teacher_id
+        self.status = "running"
+        self.created_at = _now()
+        self.finished_at: Optional[str] = None
+        self.items: List[ImportItem] = []
+        self.counts = {"queued": 0, "imported": 0, "failed": 0}
+        self._spool = tempfile.SpooledTemporaryFile(max_size=settings.BULK_IMPORT_SPOOL_MEMORY_BYTES)
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, line: int, record: object) -> None:
+        """Validate a parsed record and queue it, or mark it failed."""
+        if len(self.items) >= settings.BULK_IMPORT_MAX_ITEMS:
+            raise UploadError(413, f"More than {settings.BULK_IMPORT_MAX_ITEMS} records.")
+        if not isinstance(record, dict):
+            self._item(line, None, "failed", error=record if isinstance(record, str) else "Not an object.")
+            return
+        student = record.get("student")
+        student = str(student).strip() if student not in (None, "") else None
+        if student is None:
+            self._item(line, None, "failed", error="Missing student.")
+            return
+        try:
+            payload = AssignmentSubmit(
+                text=record.get("text") or "",
+                subject=record.get("subject") or "General",
+            )
+        except ValidationError as exc:
+            err = exc.errors()[0]
+            self._item(line, student, "failed", error=f"{err['loc'][0]}: {err['msg']}")
+            return
+        index = self._item(line, student, "queued")
+        self._spool.write(orjson.dumps([index, student, payload.text, payload.subject]) + b"\n")
+
+    def _item(self, line: int, student: Optional[str], state: str, error: Optional[str] = None) -> int:
+        self.items.append(ImportItem.model_construct(
+            line=line, student=student, status=state, assignment_id=None, error=error
+        ))
+        self.counts[state] += 1
+        return len(self.items) - 1
+
+    def _settle(self, index: int, state: str, assignment_id: Optional[int] = None,
+                error: Optional[str] = None) -> None:
+        item = self.items[index]
+        self.counts[item.status] -= 1
+        self.counts[state] += 1
+        item.status = state
+        item.assignment_id = assignment_id
+        item.error = error
+
+    def start(self) -> None:
+        self._spool.seek(0)
+        self._task = asyncio.create_task(self._run())
+
+    def status_response(self, offset: int, limit: int, failed_only: bool) -> ImportStatusResponse:
+        items = [i for i in self.items if i.status == "failed"] if failed_only else self.items
+        return ImportStatusResponse.model_construct(
+            import_id=self.id,
+            status=self.status,
+            total=len(self.items),
+            queued=self.counts["queued"],
+            imported=self.counts["imported"],
+            failed=self.counts["failed"],
+            created_at=self.created_at,
+            finished_at=self.finished_at,
+            items=items[offset:offset + limit],
+        )
+
+    # ----- background pipeline -----
+
+    async def _run(self) -> None:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.BULK_IMPORT_CONCURRENCY * 2)
+        results: asyncio.Queue = asyncio.Queue()
+        students: Dict[str, Optional[int]] = {}
+
+        async def reader() -> None:
+            for line in self._spool:
+                await queue.put(orjson.loads(line))
+            for _ in range(settings.BULK_IMPORT_CONCURRENCY):
+                await queue.put(None)
+
+        async def worker() -> None:
+            nonlocal working
+            while (record := await queue.get()) is not None:
+                index, student, text, subject = record
+                try:
+                    async with _slots:
+                        row = await analyze(text, subject)
+                except AIProviderError as exc:
+                    self._settle(index, "failed", error=f"AI analysis failed: {exc}")
+                    continue
+                except Exception as exc:  # one bad record fails alone
+                    self._settle(index, "failed", error=f"Analysis failed: {exc!r}")
+                    continue
+                results.put_nowait((index, student, row))
+            working -= 1
+            if not working:
+                results.put_nowait(_DONE)
+
+        async def writer() -> None:
+            batch = []
+            while (item := await results.get()) is not _DONE:
+                batch.append(item)
+                if len(batch) >= settings.BULK_IMPORT_BATCH_SIZE:
+                    await self._insert(batch, students)
+                    batch = []
+            if batch:
+                await self._insert(batch, students)
+
+        working = settings.BULK_IMPORT_CONCURRENCY
+        tasks = [
+            asyncio.create_task(reader()),
+            *(asyncio.create_task(worker()) for _ in range(working)),
+            asyncio.create_task(writer()),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+            self.status = "completed"
+        except asyncio.CancelledError:
+            self.status = "cancelled"
+            raise
+        except Exception as exc:
+            await _stop(tasks)
+            # Whatever is still queued can't be imported any more
+            for i, item in enumerate(self.items):
+                if item.status == "queued":
+                    self._settle(i, "failed", error=f"Import aborted: {exc!r}")
+            self.status = "completed"
+        finally:
+            await _stop(tasks)  # no stage may touch the spool once it is closed
+            self.finished_at = _now()
+            self._spool.close()
+            _finished(self)
+
+    async def _insert(self, batch: List[tuple], students: Dict[str, Optional[int]]) -> None:
+        await resolve_students([student for _, student, _ in batch], students)
+        rows = []
+        for index, student, row in batch:
+            student_id = students.get(student)
+            if student_id is None:
+                self._settle(index, "failed", error=f"Unknown student {student!r}.")
+            else:
+                rows.append((index, Assignment(student_id=student_id, **row)))
+        if not rows:
+            return
+        async with async_session() as db:
+            db.add_all([a for _, a in rows])
+            await db.flush()
+            await score_sketch.record_new_scores(db, [a for _, a in rows])
+            events = [invalidation.score_event(a) for _, a in rows]
+            for event in events:
+                await invalidation.publish(db, event)
+            await db.commit()
+        for event in events:
+            await invalidation.after_commit(event)
+        for index, assignment in rows:
+            self._settle(index, "imported", assignment_id=assignment.id)
+
+
+async def analyze(text: str, subject: str) -> dict:
+    """The submit-assignment pipeline for one record; returns Assignment columns."""
+    followup_questions, weak_topics, eval_scores, ai_dep = await asyncio.gather(
+        ai_service.generate_followup_questions(text),
+        ai_service.extract_weak_topics(text),
+        ai_service.evaluate_understanding(text, {}),
+        ai_service.calculate_ai_dependency(text, {}),
+    )
+    scored = score_evaluation(eval_scores, subject)
+    books = await ai_service.recommend_books(weak_topics)
+    return {
+        "text": text,
+        "subject": subject,
+        "followup_questions": followup_questions,
+        "student_responses": {},
+        **scored.columns(),
+        "weak_topics": weak_topics,
+        "recommendations": _book_list.dump_python(_book_list.validate_python(books)),
+        "ai_dependency_score": ai_dep,
+        "status": "analyzed",
+    }
+
+
+async def resolve_students(keys: List[str], cache: Dict[str, Optional[int]]) -> None:
+    """
+    Map `student` values (user id or email) to student ids in `cache`, in one
+    query; unknown values map to None. Shared with jobs/batch_analyze.py.
+    """
+    missing = {k for k in keys if k not in cache}
+    if not missing:
+        return
+    ids = [int(k) for k in missing if k.isdigit()]
+    emails = [k for k in missing if not k.isdigit()]
+    async with async_session() as db:
+        result = await db.execute(
+            select(User.id, User.email).where(
+                User.role == "student", User.id.in_(ids) | User.email.in_(emails)
+            )
+        )
+        for user_id, email in result.all():
+            cache[str(user_id)] = user_id
+            cache[email] = user_id
+    for k in missing:
+        cache.setdefault(k, None)
+
+
+# ---------- Registry ----------
+
+_running: Dict[str, ImportJob] = {}
+_finished_jobs: "OrderedDict[str, ImportJob]" = OrderedDict()
+
+
+async def create(teacher_id: int, content_type: str, chunks: AsyncIterator[bytes]) -> ImportJob:
+    """Parse an upload and start importing it. Raises UploadError."""
+    job = ImportJob(teacher_id)
+    try:
+        async for line, record in records(content_type, chunks):
+            job.add(line, record)
+    except BaseException:
+        job._spool.close()
+        raise
+    if not job.items:
+        job._spool.close()
+        raise UploadError(400, "The upload has no records.")
+    _running[job.id] = job
+    job.start()
+    return job
+
+
+def _finished(job: ImportJob) -> None:
+    _running.pop(job.id, None)
+    _finished_jobs[job.id] = job
+    while len(_finished_jobs) > settings.BULK_IMPORT_KEEP_FINISHED:
+        _finished_jobs.popitem(last=False)
+
+
+def get(import_id: str) -> Optional[ImportJob]:
+    """The current tenant's import with this id, if this worker has it."""
+    job = _running.get(import_id) or _finished_jobs.get(import_id)
+    return job if job is not None and job.tenant == shards.current() else None
+
+
+async def shutdown() -> None:
+    """Cancel imports still running; their queued items stay unimported."""
+    tasks = [job._task for job in _running.values() if job._task is not None]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,179 @@
+"""
+Follow-up Evaluation Service — per-question evaluation with cached results.
+
+Each follow-up answer is evaluated on its own, as the submission text plus
+that single answer, by evaluate_understanding and calculate_ai_dependency.
+Results are stored in followup_evaluations keyed by (assignment_id,
+question_id, answer hash), so a resubmission only sends the answers that
+changed to the AI provider; unchanged ones, including an answer reverted
+to an earlier version, are read back. The hash covers the evaluator —
+AI_PROVIDER, its model and AI_PROMPT_VERSION — as well as the answer, so
+switching provider or bumping the prompt version (then running
+jobs/regrade.py) evaluates every answer afresh.
+
+The assignment's scores are recombined from the parts: every dimension
+and the AI dependency are the mean over the answered questions. With no
+answers the submission text alone is evaluated, cached under question "".
+
+At most FOLLOWUP_EVAL_CONCURRENCY answers of one submission are evaluated
+at once, and each question keeps only its FOLLOWUP_EVAL_VERSIONS newest
+answers (the one just submitted among them), so the table stays bounded
+however often a student resubmits.
+"""
+
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, List, Set, Tuple
+
+from sqlalchemy import case, delete, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import get_settings
+from models.assignment_model import Assignment, FollowupEvaluation
+from services import ai_service, metrics
+
+settings = get_settings()
+
+_LOOKUPS = metrics.CounterFamily(
+    "verilearn_followup_evaluations_total",
+    "Per-question follow-up evaluations by result (hit = cached, miss = AI call).",
+    ("result",),
+)
+
+
+AICall = Callable[..., Awaitable[Any]]
+
+
+async def _direct(fn, *args):
+    return await fn(*args)
+
+
+def evaluator() -> str:
+    """The provider, model and prompt version behind a cached evaluation."""
+    model = settings.GEMINI_MODEL if settings.AI_PROVIDER == "gemini" else ""
+    return f"{settings.AI_PROVIDER}:{model}:{settings.AI_PROMPT_VERSION}"
+
+
+def answer_hash(answer: str) -> str:
+    key = f"{evaluator()}\n{answer.strip()}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def question_ids(assignment: Assignment) -> Set[str]:
+    """Ids of the follow-up questions generated for `assignment`."""
+    return {q["id"] for q in assignment.followup_questions or [] if isinstance(q, dict) and "id" in q}
+
+
+def _insert(db: AsyncSession):
+    """INSERT … ON CONFLICT DO NOTHING for the session's dialect."""
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(FollowupEvaluation).on_conflict_do_nothing()
+
+
+async def _evaluate_part(
+    text: str, question_id: str, answer: str, limit: asyncio.Semaphore, call: AICall
+) -> Tuple[Dict[str, float], float]:
+    responses = {question_id: answer} if question_id else {}
+    async with limit:
+        return await asyncio.gather(
+            call(ai_service.evaluate_understanding, text, responses),
+            call(ai_service.calculate_ai_dependency, text, responses),
+        )
+
+
+async def _prune(db: AsyncSession, assignment_id: int, current: Dict[str, str]) -> None:
+    """Keep the newest FOLLOWUP_EVAL_VERSIONS answers of each question in `current`."""
+    pair = tuple_(FollowupEvaluation.question_id, FollowupEvaluation.answer_hash)
+    ranked = (
+        select(
+            FollowupEvaluation.question_id,
+            FollowupEvaluation.answer_hash,
+            func.row_number().over(
+                partition_by=FollowupEvaluation.question_id,
+                # The current answer first, whatever its timestamp
+                order_by=(
+                    case((pair.in_(list(current.items())), 0), else_=1),
+                    FollowupEvaluation.created_at.desc(),
+                ),
+            ).label("n"),
+        )
+        .where(
+            FollowupEvaluation.assignment_id == assignment_id,
+            FollowupEvaluation.question_id.in_(list(current)),
+        )
+        .subquery()
+    )
+    await db.execute(
+        delete(FollowupEvaluation).where(
+            FollowupEvaluation.assignment_id == assignment_id,
+            pair.in_(
+                select(ranked.c.question_id, ranked.c.answer_hash)
+                .where(ranked.c.n > max(1, settings.FOLLOWUP_EVAL_VERSIONS))
+            ),
+        )
+    )
+
+
+def _combine(parts: List[Tuple[Dict[str, float], float]]) -> Tuple[Dict[str, float], float]:
+    keys = {key for scores, _ in parts for key in scores}
+    scores = {
+        key: round(sum(s[key] for s, _ in parts if key in s) / sum(key in s for s, _ in parts), 1)
+        for key in keys
+    }
+    return scores, round(sum(dep for _, dep in parts) / len(parts), 1)
+
+
+async def evaluate(
+    db: AsyncSession,
+    assignment: Assignment,
+    responses: Dict[str, str],
+    call: AICall = _direct,
+) -> Tuple[Dict[str, float], float]:
+    """
+    Evaluation scores and AI dependency for `responses`, calling the AI
+    provider only for answers without a cached result. New results are
+    added to the caller's transaction. `call(fn, *args)` makes each AI
+    call; jobs pass one that paces and retries them.
+    """
+    parts = {qid: answer_hash(answer) for qid, answer in responses.items()} or {"": answer_hash("")}
+    result = await db.execute(
+        select(
+            FollowupEvaluation.question_id,
+            FollowupEvaluation.scores,
+            FollowupEvaluation.ai_dependency,
+        ).where(
+            FollowupEvaluation.assignment_id == assignment.id,
+            tuple_(FollowupEvaluation.question_id, FollowupEvaluation.answer_hash).in_(
+                list(parts.items())
+            ),
+        )
+    )
+    cached = {qid: (scores, dep) for qid, scores, dep in result.all()}
+
+    missing = [qid for qid in parts if qid not in cached]
+    if cached:
+        _LOOKUPS.inc(("hit",), len(cached))
+    if missing:
+        _LOOKUPS.inc(("miss",), len(missing))
+        limit = asyncio.Semaphore(settings.FOLLOWUP_EVAL_CONCURRENCY)
+        fresh = await asyncio.gather(*(
+            _evaluate_part(assignment.text, qid, responses.get(qid, ""), limit, call)
+            for qid in missing
+        ))
+        await db.execute(_insert(db), [
+            {
+                "assignment_id": assignment.id,
+                "question_id": qid,
+                "answer_hash": parts[qid],
+                "scores": scores,
+                "ai_dependency": dep,
+            }
+            for qid, (scores, dep) in zip(missing, fresh)
+        ])
+        await _prune(db, assignment.id, {qid: parts[qid] for qid in missing})
+        cached.update(zip(missing, fresh))
+
+    return _combine([cached[qid] for qid in parts])
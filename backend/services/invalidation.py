@@ -0,0 +1,215 @@
+"""
+Invalidation Service — cross-worker score events over Postgres LISTEN/NOTIFY.
+
+Write paths describe each graded submission as a score event (score_event()):
+    {"tenant", "student_id", "assignment_id", "subject", "score",
+     "previous", "weak_topics", "ai_dependency", "radar"}
+where "previous" is the score a regrade replaces, null for a new assignment.
+
+Bulk rewrites (jobs/regrade.py, jobs/rescore.py) instead publish one
+rescored event, {"tenant", "rescored": true}, when they finish; listeners
+handle it like a reconnect and reset every consumer. Changed or deleted
+users publish a user event, {"tenant", "user_id"}, from the flush
+(publish_from_flush()); listeners pass it to every registered user
+listener (the principal cache in routes/deps.py).
+
+publish() queues an event as a NOTIFY inside the write transaction, so Postgres
+delivers it only if that transaction commits. Every worker runs listen()
+from the app lifespan: per shard (database/shards.py), one dedicated
+asyncpg connection LISTENs on the channel and, per event, as its tenant,
+    - evicts the student's snapshots from the local cache (memory backend
+      only; Redis-backed snapshots are shared and the writer evicts them)
+    - folds the score into the live class aggregate (services/live_class.py)
+    - updates the student's row in the peer index (services/peer_index.py)
+
+Without a listener (not Postgres, or CACHE_INVALIDATION_LISTEN off)
+after_commit() applies the event in the writing worker only. After a lost
+connection the listener reconnects and resets every consumer, and tells
+user listeners to forget every user, since notifications sent while it
+was away are gone.
+"""
+
+import asyncio
+import json
+from typing import Callable, List, Optional
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from config import get_settings
+from database import shards
+from database.connection import engine, shard_engines
+from models.assignment_model import Assignment
+from services import analytics_cache, live_class, metrics, peer_index
+
+settings = get_settings()
+
+CHANNEL = "verilearn_score_events"
+
+_RECEIVED = metrics.CounterFamily(
+    "verilearn_score_events_received_total",
+    "Score events received by this worker's LISTEN connection.",
+)
+
+
+def score_event(a: Assignment, previous: Optional[float] = None) -> dict:
+    """The score event for a graded assignment; `previous` as for score_sketch.record_score."""
+    return {
+        "tenant": shards.current(),
+        "student_id": a.student_id,
+        "assignment_id": a.id,
+        "subject": a.subject,
+        "score": a.final_score,
+        "previous": previous,
+        "weak_topics": a.weak_topics or [],
+        "ai_dependency": a.ai_dependency_score,
+        "radar": [
+            a.radar_clarity,
+            a.radar_application,
+            a.radar_logic,
+            a.radar_critical_thinking,
+            a.radar_retention,
+        ],
+    }
+
+
+def user_event(user_id: int) -> dict:
+    """The event for a changed or deleted user of the current tenant."""
+    return {"tenant": shards.current(), "user_id": user_id}
+
+
+# Called as the event's tenant with the user id, or None to forget every user
+_user_listeners: List[Callable[[Optional[int]], None]] = []
+
+
+def register_user_listener(listener: Callable[[Optional[int]], None]) -> None:
+    _user_listeners.append(listener)
+
+
+def _notify_user_listeners(user_id: Optional[int]) -> None:
+    for listener in _user_listeners:
+        listener(user_id)
+
+
+def rescored_event() -> dict:
+    """The event for scores of the current tenant rewritten in bulk."""
+    return {"tenant": shards.current(), "rescored": True}
+
+
+def listening() -> bool:
+    """True when events reach every worker (including the writer) via NOTIFY."""
+    return engine.dialect.name == "postgresql" and settings.CACHE_INVALIDATION_LISTEN
+
+
+def _evicts_remotely() -> bool:
+    return settings.CACHE_BACKEND == "memory"
+
+
+async def publish(db: AsyncSession, event: dict) -> None:
+    """Queue a NOTIFY for this score event in the current transaction."""
+    if not listening():
+        return
+    await db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": CHANNEL, "payload": json.dumps(event)},
+    )
+
+
+def publish_from_flush(connection, event: dict) -> None:
+    """publish() for mapper events, which run on the flush's sync connection."""
+    if not listening():
+        return
+    connection.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": CHANNEL, "payload": json.dumps(event)},
+    )
+
+
+async def after_commit(event: dict) -> None:
+    """Local follow-up once the write has committed."""
+    if event.get("rescored"):
+        await analytics_cache.snapshots.clear()
+        if not listening():
+            await _reset_consumers()
+        return
+    await analytics_cache.invalidate_student(event["student_id"])
+    if not listening():
+        _apply_local(event)
+
+
+def _apply_local(event: dict) -> None:
+    if settings.LIVE_DASHBOARD_ENABLED:
+        live_class.apply_event(event)
+    peer_index.apply_event(event)
+
+
+async def _on_notify(conn, pid, channel: str, payload: str) -> None:
+    _RECEIVED.inc()
+    try:
+        event = json.loads(payload)
+    except ValueError:
+        return
+    with shards.use(event.get("tenant", settings.DEFAULT_TENANT)):
+        if event.get("rescored"):
+            await _resync()
+            return
+        if "user_id" in event:
+            _notify_user_listeners(int(event["user_id"]))
+            return
+        if _evicts_remotely():
+            await analytics_cache.invalidate_student(int(event["student_id"]))
+        _apply_local(event)
+
+
+async def _resync() -> None:
+    """Reset every tenant's consumers."""
+    if _evicts_remotely():
+        await analytics_cache.snapshots.clear()
+    await _reset_consumers()
+
+
+async def _reset_consumers() -> None:
+    if settings.LIVE_DASHBOARD_ENABLED:
+        await live_class.reset()
+    await peer_index.reset()
+
+
+async def listen() -> None:
+    """Run until cancelled, one listener per shard."""
+    if not listening():
+        return
+    await asyncio.gather(*(
+        _listen(name, shard_engine) for name, shard_engine in shard_engines.items()
+    ))
+
+
+async def _listen(shard: str, shard_engine: AsyncEngine) -> None:
+    """LISTEN on one shard, reconnecting with backoff when the connection drops."""
+    dsn = shard_engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+    backoff = 1.0
+    first = True
+    while True:
+        conn: Optional[asyncpg.Connection] = None
+        try:
+            conn = await asyncpg.connect(dsn)
+            lost = asyncio.Event()
+            conn.add_termination_listener(lambda _conn: lost.set())
+            await conn.add_listener(CHANNEL, _on_notify)
+            if not first:
+                _notify_user_listeners(None)
+                await _resync()
+            first = False
+            backoff = 1.0
+            print(f"✓ Listening for score events on '{CHANNEL}' ({shard} shard)")
+            await lost.wait()
+            print(f"✗ Score event listener lost its connection ({shard} shard)")
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            print(f"✗ Score event listener failed ({shard} shard): {exc!r}")
+        finally:
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, 30.0)
@@ -0,0 +1,314 @@
+"""
+Live Class Service — running class aggregates pushed to teachers as deltas.
+
+Instead of recomputing /teacher/class-analytics on every poll, each worker
+keeps one in-memory ClassAggregate per watched tenant (database/shards.py).
+It is loaded from the database when the first subscriber connects, and
+every graded submission then updates it incrementally. Each change is
+broadcast as a small delta: the new score, the class average,
+distribution bucket moves, topic count changes and new AI-risk flags.
+
+Score events reach every worker through the LISTEN/NOTIFY channel in
+services/invalidation.py. The aggregate keeps running sums per student
+and per subject, not the assignments themselves; a regrade event carries
+the score it replaces. Events that race the initial load are buffered and
+checked against the load's snapshot, so none is counted twice.
+
+Backpressure: each subscriber has a bounded queue. A subscriber that falls
+behind has its buffered deltas dropped and receives one fresh snapshot
+once it catches up, rather than an ever-growing backlog.
+"""
+
+import asyncio
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+from config import get_settings
+from database import shards
+from database.connection import async_session
+from models.assignment_model import Assignment
+from services import metrics
+from services.recommendation_service import performance_bucket
+
+settings = get_settings()
+
+_CONNECTIONS = metrics.GaugeFamily(
+    "verilearn_live_connections",
+    "Open live dashboard connections in this worker.",
+)
+_RESYNCS = metrics.CounterFamily(
+    "verilearn_live_resyncs_total",
+    "Slow live subscribers whose queued deltas were replaced by a snapshot.",
+)
+
+AI_RISK_THRESHOLD = 50
+
+
+class ClassAggregate:
+    """
+    Running class-wide aggregates, updated one assignment at a time. Memory
+    is per student and per subject, never per assignment: a regrade
+    (an event with "previous") replaces its assignment's score in the sums.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.score_sum = 0.0
+        # student_id -> (newest assignment_id, its score)
+        self.latest: Dict[int, Tuple[int, float]] = {}
+        self.distribution = {"high": 0, "medium": 0, "low": 0}
+        self.topic_counts: Counter = Counter()
+        self.subject_sums: Dict[str, List[float]] = {}  # subject -> [sum, count]
+        self.ai_risk: Set[int] = set()
+
+    def apply(self, event: dict) -> Optional[dict]:
+        """Fold one score event in; returns the delta, or None if nothing changed."""
+        aid = event["assignment_id"]
+        student_id = event["student_id"]
+        score = float(event["score"])
+        previous = event.get("previous")
+        if previous is not None and float(previous) == score:
+            return None  # regraded to the same score
+
+        old_latest = self.latest.get(student_id)
+        is_latest = old_latest is None or aid >= old_latest[0]
+        subject = event.get("subject") or "General"
+        change = score - (float(previous) if previous is not None else 0.0)
+        delta: dict = {"student_id": student_id, "assignment_id": aid, "score": score}
+
+        # Class and subject averages cover every assignment
+        self.score_sum += change
+        sums = self.subject_sums.setdefault(subject, [0.0, 0])
+        sums[0] += change
+        if previous is None:
+            self.count += 1
+            sums[1] += 1
+        delta["subject_average"] = {"topic": subject, "avg": round(sums[0] / sums[1], 1)}
+
+        # The distribution covers each student's newest assignment only
+        if is_latest:
+            self.latest[student_id] = (aid, score)
+            new_bucket = performance_bucket(score)
+            old_bucket = performance_bucket(old_latest[1]) if old_latest is not None else None
+            if old_bucket != new_bucket:
+                self.distribution[new_bucket] += 1
+                moves = {new_bucket: 1}
+                if old_bucket is not None:
+                    self.distribution[old_bucket] -= 1
+                    moves[old_bucket] = -1
+                delta["distribution"] = moves
+
+        if previous is None and event.get("weak_topics"):
+            topics = event["weak_topics"]
+            self.topic_counts.update(topics)
+            delta["topic_counts"] = {t: self.topic_counts[t] for t in topics}
+
+        if (
+            float(event.get("ai_dependency") or 0) > AI_RISK_THRESHOLD
+            and student_id not in self.ai_risk
+        ):
+            self.ai_risk.add(student_id)
+            delta["ai_risk"] = {"student_id": student_id, "flagged": True}
+
+        delta["class_average"] = self.class_average()
+        return delta
+
+    def class_average(self) -> float:
+        if not self.count:
+            return 0
+        return round(self.score_sum / self.count, 1)
+
+    def snapshot(self) -> dict:
+        return {
+            "class_average": self.class_average(),
+            "total_assignments": self.count,
+            "performance_distribution": dict(self.distribution),
+            "topic_counts": [
+                {"topic": t, "count": c} for t, c in self.topic_counts.most_common()
+            ],
+            "topic_averages": [
+                {"topic": subject, "avg": round(s / n, 1)}
+                for subject, (s, n) in self.subject_sums.items()
+            ],
+            "ai_risk_students": len(self.ai_risk),
+        }
+
+
+def _unseen(pending: List[dict], loaded: Dict[int, float]) -> List[dict]:
+    """
+    The events that arrived during a load and aren't in what it read;
+    `loaded` maps their assignment ids to the scores the load saw.
+    """
+    unseen = []
+    for event in pending:
+        seen = loaded.get(event["assignment_id"])
+        if seen is None:
+            unseen.append(event)  # committed after the load's snapshot
+        elif event.get("previous") is not None and float(event["previous"]) == seen:
+            unseen.append(event)  # the load saw the score this regrade replaced
+    return unseen
+
+
+_RESYNC = object()
+
+
+class Subscriber:
+    """One live connection's bounded outbox."""
+
+    def __init__(self, room: "_Room", maxsize: int):
+        self.room = room
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._resync = False
+
+    def offer(self, message: dict) -> None:
+        if self._resync:
+            return  # the pending snapshot will include this change
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self._resync = True
+            self.queue.put_nowait(_RESYNC)
+            _RESYNCS.inc()
+
+    async def next(self, timeout: float) -> Optional[dict]:
+        """Next message for the client; None when idle for `timeout` seconds."""
+        try:
+            item = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if item is _RESYNC:
+            self._resync = False
+            return self.room.snapshot_message()
+        return item
+
+
+class TooManyConnections(Exception):
+    """Raised when this worker is at LIVE_MAX_CONNECTIONS."""
+
+
+class _Room:
+    """One tenant's aggregate and the teachers watching it."""
+
+    def __init__(self, tenant: str):
+        self.tenant = tenant
+        self.aggregate = ClassAggregate()
+        self.loaded = False
+        self.load_lock = asyncio.Lock()
+        self.pending: List[dict] = []  # events that arrived while loading
+        self.subscribers: Set[Subscriber] = set()
+        self.seq = 0
+
+    def snapshot_message(self) -> dict:
+        return {"type": "snapshot", "seq": self.seq, "data": self.aggregate.snapshot()}
+
+    async def load(self) -> None:
+        async with self.load_lock:
+            if self.loaded:
+                return
+            aggregate = ClassAggregate()
+            async with async_session() as db:
+                if db.bind.dialect.name == "postgresql":
+                    # One snapshot for the scan and the pending check below
+                    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+                result = await db.stream(
+                    select(
+                        Assignment.id,
+                        Assignment.student_id,
+                        Assignment.subject,
+                        Assignment.final_score,
+                        Assignment.weak_topics,
+                        Assignment.ai_dependency_score,
+                    ).order_by(Assignment.id)
+                )
+                async for aid, student_id, subject, score, topics, ai_dep in result:
+                    aggregate.apply({
+                        "assignment_id": aid,
+                        "student_id": student_id,
+                        "subject": subject,
+                        "score": score,
+                        "weak_topics": topics or [],
+                        "ai_dependency": ai_dep,
+                    })
+                # Events keep arriving while we check; no await after the last check
+                loaded: Dict[int, float] = {}
+                checked = 0
+                while checked < len(self.pending):
+                    ids = {event["assignment_id"] for event in self.pending[checked:]}
+                    checked = len(self.pending)
+                    result = await db.execute(
+                        select(Assignment.id, Assignment.final_score).where(Assignment.id.in_(ids))
+                    )
+                    loaded.update(result.all())
+                for event in _unseen(self.pending, loaded):
+                    aggregate.apply(event)
+                self.pending.clear()
+            self.aggregate = aggregate
+            self.loaded = True
+
+
+_rooms: Dict[str, _Room] = {}  # tenant -> room, while anyone watches
+
+
+def _connections() -> int:
+    return sum(len(room.subscribers) for room in _rooms.values())
+
+
+metrics.register_collector(lambda: _CONNECTIONS.set((), _connections()))
+
+
+def apply_event(event: dict) -> None:
+    """Fold a score event into the current tenant's aggregate and fan the delta out."""
+    room = _rooms.get(shards.current())
+    if room is None:
+        return  # nobody is watching; the first subscriber loads fresh state
+    if not room.loaded:
+        if room.load_lock.locked():
+            room.pending.append(event)
+        return
+
+    delta = room.aggregate.apply(event)
+    if delta is None:
+        return
+    room.seq += 1
+    message = {"type": "delta", "seq": room.seq, "data": delta}
+    for sub in list(room.subscribers):
+        sub.offer(message)
+
+
+async def reset() -> None:
+    """Reload every watched tenant (e.g. after missed events) and resync everyone."""
+    for room in list(_rooms.values()):
+        room.loaded = False
+        with shards.use(room.tenant):
+            await room.load()
+        for sub in list(room.subscribers):
+            sub.offer(room.snapshot_message())
+
+
+async def subscribe() -> Tuple[Subscriber, dict]:
+    """Register a subscriber for the current tenant; returns it with the initial snapshot."""
+    if _connections() >= settings.LIVE_MAX_CONNECTIONS:
+        raise TooManyConnections()
+    tenant = shards.current()
+    room = _rooms.get(tenant)
+    if room is None:
+        room = _rooms[tenant] = _Room(tenant)
+    sub = Subscriber(room, settings.LIVE_QUEUE_SIZE)
+    room.subscribers.add(sub)
+    try:
+        await room.load()
+    except BaseException:
+        unsubscribe(sub)
+        raise
+    return sub, room.snapshot_message()
+
+
+def unsubscribe(sub: Subscriber) -> None:
+    room = sub.room
+    room.subscribers.discard(sub)
+    if not room.subscribers and _rooms.get(room.tenant) is room:
+        del _rooms[room.tenant]  # stop maintaining state nobody watches
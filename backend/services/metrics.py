@@ -0,0 +1,207 @@
+"""
+Metrics Service — Prometheus text-format metrics with no extra dependencies.
+
+Series are created once per label combination and then updated in place,
+so the hot path is a dict lookup plus a few integer increments. Gauges
+that describe external state (pool, limiter queues) are filled in by
+collectors that only run when /metrics is scraped.
+"""
+
+import functools
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+class Histogram:
+    """One histogram series: per-bucket counts plus sum and count."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Family:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        _registry.append(self)
+
+    def _label_str(self, values: tuple, extra: str = "") -> str:
+        pairs = [f'{k}="{v}"' for k, v in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class HistogramFamily(_Family):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = buckets
+        self._series: Dict[tuple, Histogram] = {}
+
+    def labels(self, *values) -> Histogram:
+        series = self._series.get(values)
+        if series is None:
+            series = self._series[values] = Histogram(self.buckets)
+        return series
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for values, h in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, h.counts):
+                cumulative += count
+                le = self._label_str(values, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = self._label_str(values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {h.count}")
+            lines.append(f"{self.name}_sum{self._label_str(values)} {h.sum}")
+            lines.append(f"{self.name}_count{self._label_str(values)} {h.count}")
+        return lines
+
+
+class CounterFamily(_Family):
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, values: tuple = (), amount: float = 1) -> None:
+        self._values[values] = self._values.get(values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for values, v in self._values.items():
+            lines.append(f"{self.name}{self._label_str(values)} {v}")
+        return lines
+
+
+class GaugeFamily(CounterFamily):
+    kind = "gauge"
+
+    def set(self, values: tuple, value: float) -> None:
+        self._values[values] = value
+
+
+_registry: List[_Family] = []
+_collectors: List[Callable[[], None]] = []
+
+
+def register_collector(fn: Callable[[], None]) -> None:
+    """Run `fn` before every scrape to refresh gauges."""
+    _collectors.append(fn)
+
+
+def render() -> str:
+    """Prometheus text exposition of every registered metric."""
+    for collect in _collectors:
+        collect()
+    lines: List[str] = []
+    for family in _registry:
+        lines.extend(family.render())
+    return "\n".join(lines) + "\n"
+
+
+# ==================== Metric definitions ====================
+
+HTTP_REQUEST_SECONDS = HistogramFamily(
+    "verilearn_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route"),
+)
+HTTP_RESPONSES = CounterFamily(
+    "verilearn_http_responses_total",
+    "HTTP responses by route template and status code.",
+    ("method", "route", "status"),
+)
+DB_QUERIES_PER_REQUEST = HistogramFamily(
+    "verilearn_db_queries_per_request",
+    "SQL statements executed per HTTP request.",
+    ("route",),
+    buckets=COUNT_BUCKETS,
+)
+DB_QUERY_SECONDS_PER_REQUEST = HistogramFamily(
+    "verilearn_db_query_seconds_per_request",
+    "Total SQL execution time per HTTP request.",
+    ("route",),
+)
+DB_POOL_WAIT_SECONDS = HistogramFamily(
+    "verilearn_db_pool_wait_seconds",
+    "Time spent waiting to check a connection out of the pool.",
+    ("shard",),
+)
+DB_POOL = GaugeFamily(
+    "verilearn_db_pool_connections",
+    "SQLAlchemy pool connections by shard and state.",
+    ("shard", "state"),
+)
+AI_CALL_SECONDS = HistogramFamily(
+    "verilearn_ai_call_duration_seconds",
+    "AI service call latency by function.",
+    ("function",),
+)
+AI_CALL_ERRORS = CounterFamily(
+    "verilearn_ai_call_errors_total",
+    "AI service calls that raised, by function.",
+    ("function",),
+)
+
+
+# ==================== Per-request SQL accounting ====================
+
+# [statement count, total seconds] for the request being served
+request_queries: ContextVar[Optional[list]] = ContextVar(
+    "request_queries", default=None
+)
+
+
+def record_query(elapsed: float) -> None:
+    """Attribute one executed statement to the current request, if any."""
+    stats = request_queries.get()
+    if stats is not None:
+        stats[0] += 1
+        stats[1] += elapsed
+
+
+def instrument_ai_call(fn):
+    """Decorator recording latency and errors for an async AI function."""
+    latency = AI_CALL_SECONDS.labels(fn.__name__)
+    label = (fn.__name__,)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        except Exception:
+            AI_CALL_ERRORS.inc(label)
+            raise
+        finally:
+            latency.observe(time.perf_counter() - start)
+
+    return wrapper
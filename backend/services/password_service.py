@@ -0,0 +1,95 @@
+"""
+Password Service — bcrypt hashing and verification off the event loop.
+
+bcrypt releases the GIL, so a small dedicated thread pool gives real
+parallelism without blocking uvicorn's loop. Admission is bounded: once
+every worker is busy and the wait queue is full, calls fail fast with
+PasswordPoolSaturated instead of piling up behind a login burst. A call
+counts against the bound until its bcrypt work has finished, even when
+the request awaiting it is cancelled first.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+
+from config import get_settings
+from services import metrics
+
+settings = get_settings()
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="bcrypt",
+)
+_max_in_flight = settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_DEPTH
+_in_flight = 0
+_in_flight_lock = threading.Lock()  # released from worker threads
+
+_QUEUE_DEPTH = metrics.GaugeFamily(
+    "verilearn_password_pool_queue_depth",
+    "Password operations running or waiting for a bcrypt worker.",
+)
+metrics.register_collector(lambda: _QUEUE_DEPTH.set((), _in_flight))
+
+
+@lru_cache(maxsize=1)
+def get_context():
+    """
+    The bcrypt CryptContext, built on first use. Importing passlib is a
+    visible share of cold-start time, so it is deferred out of app import
+    (services/warmup.py preloads it once the server is up).
+    """
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class PasswordPoolSaturated(Exception):
+    """Raised when the password pool and its wait queue are full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing pool is saturated.")
+        self.retry_after = retry_after
+
+
+def _release(_: Future) -> None:
+    global _in_flight
+    with _in_flight_lock:
+        _in_flight -= 1
+
+
+async def _run(fn, *args):
+    global _in_flight
+    with _in_flight_lock:
+        if _in_flight >= _max_in_flight:
+            raise PasswordPoolSaturated(settings.PASSWORD_HASH_RETRY_AFTER)
+        _in_flight += 1
+    try:
+        future = _executor.submit(fn, *args)
+    except BaseException:
+        _release(None)
+        raise
+    # Released when the work is done (or cancelled before it started), not
+    # when the caller stops waiting: a cancelled request's hash still runs
+    future.add_done_callback(_release)
+    return await asyncio.wrap_future(future)
+
+
+def queue_depth() -> int:
+    """Password operations currently running or waiting for a worker."""
+    return _in_flight
+
+
+async def hash_password(password: str) -> str:
+    return await _run(get_context().hash, password)
+
+
+async def verify_password(plain: str, hashed: str) -> bool:
+    return await _run(get_context().verify, plain, hashed)
+
+
+def shutdown() -> None:
+    """Stop the worker threads on application shutdown."""
+    _executor.shutdown(wait=False, cancel_futures=True)
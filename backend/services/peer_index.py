@@ -0,0 +1,226 @@
+"""
+Peer Index Service — nearest-neighbour matching over students' radar profiles.
+
+Each student is one row in a contiguous float32 matrix holding the radar
+vector of their newest assignment:
+    (clarity, application, logic, critical_thinking, retention)
+With five dimensions, one vectorized pass over every row beats a KD-tree
+build and is simple to update in place. Queries use np.argpartition to
+select the top-k without a full sort.
+
+    similar        — smallest Euclidean distance between the profiles
+    complementary  — most opposite profile shape: the lowest cosine
+                     similarity between mean-centred vectors, i.e. strong
+                     where the student is weak and vice versa
+
+Each tenant (database/shards.py) has its own index. It loads lazily on the
+first query; after that, score events (services/invalidation.py) keep it
+current one student at a time. NumPy is imported on first use, so it
+stays off the app's import path.
+"""
+
+import asyncio
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+
+from database import shards
+from database.connection import async_session
+from models.assignment_model import Assignment
+
+if TYPE_CHECKING:
+    import numpy as np
+
+DIMENSIONS = ("clarity", "application", "logic", "critical_thinking", "retention")
+MODES = ("similar", "complementary")
+
+
+class PeerIndex:
+    """Growable (n, 5) matrix of the latest radar vector per student."""
+
+    def __init__(self, capacity: int = 1024):
+        import numpy as np
+
+        self.vectors = np.zeros((capacity, len(DIMENSIONS)), dtype=np.float32)
+        self.student_ids = np.zeros(capacity, dtype=np.int64)
+        self.size = 0
+        self._row: Dict[int, int] = {}  # student_id -> row
+        self._assignment: Dict[int, int] = {}  # student_id -> assignment_id of row
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _grow(self) -> None:
+        import numpy as np
+
+        capacity = max(1024, len(self.vectors) * 2)
+        vectors = np.zeros((capacity, len(DIMENSIONS)), dtype=np.float32)
+        ids = np.zeros(capacity, dtype=np.int64)
+        vectors[:self.size] = self.vectors[:self.size]
+        ids[:self.size] = self.student_ids[:self.size]
+        self.vectors, self.student_ids = vectors, ids
+
+    def upsert(self, student_id: int, assignment_id: int, vector: Sequence[float]) -> bool:
+        """Store the vector if it is from the student's newest assignment."""
+        if assignment_id < self._assignment.get(student_id, -1):
+            return False
+        row = self._row.get(student_id)
+        if row is None:
+            if self.size == len(self.vectors):
+                self._grow()
+            row = self.size
+            self.size += 1
+            self._row[student_id] = row
+            self.student_ids[row] = student_id
+        self.vectors[row] = vector
+        self._assignment[student_id] = assignment_id
+        return True
+
+    def bulk_load(
+        self, student_ids: "np.ndarray", assignment_ids: "np.ndarray", vectors: "np.ndarray"
+    ) -> None:
+        """Replace the contents with one student per row."""
+        import numpy as np
+
+        n = len(student_ids)
+        capacity = max(1024, 1 << (max(n, 1) - 1).bit_length())
+        self.vectors = np.zeros((capacity, len(DIMENSIONS)), dtype=np.float32)
+        self.student_ids = np.zeros(capacity, dtype=np.int64)
+        self.vectors[:n] = vectors
+        self.student_ids[:n] = student_ids
+        self.size = n
+        self._row = {int(s): i for i, s in enumerate(student_ids)}
+        self._assignment = {int(s): int(a) for s, a in zip(student_ids, assignment_ids)}
+
+    def vector(self, student_id: int) -> Optional["np.ndarray"]:
+        row = self._row.get(student_id)
+        return None if row is None else self.vectors[row]
+
+    def query(self, student_id: int, k: int, mode: str = "similar") -> List[Tuple[int, float]]:
+        """Top-k (student_id, score) for a student, excluding themselves."""
+        import numpy as np
+
+        row = self._row.get(student_id)
+        if row is None:
+            return []
+        vectors = self.vectors[:self.size]
+        q = vectors[row]
+
+        if mode == "similar":
+            diff = vectors - q
+            scores = np.sqrt(np.einsum("ij,ij->i", diff, diff))  # lower is better
+        else:
+            centred = vectors - vectors.mean(axis=1, keepdims=True)
+            qc = centred[row]
+            norms = np.linalg.norm(centred, axis=1) * (np.linalg.norm(qc) or 1.0)
+            scores = (centred @ qc) / np.where(norms == 0, 1.0, norms)  # lower is better
+        scores[row] = np.inf
+
+        k = min(k, self.size - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(scores, k - 1)[:k]
+        top = top[np.argsort(scores[top])]
+        return [(int(self.student_ids[i]), round(float(scores[i]), 4)) for i in top]
+
+
+class _TenantState:
+    """One tenant's index and its load bookkeeping."""
+
+    def __init__(self):
+        self.index = PeerIndex()
+        self.loaded = False
+        self.load_lock = asyncio.Lock()
+        self.pending: List[dict] = []  # events that arrived while loading
+
+
+_states: Dict[str, _TenantState] = {}
+
+
+def _state() -> _TenantState:
+    tenant = shards.current()
+    state = _states.get(tenant)
+    if state is None:
+        state = _states[tenant] = _TenantState()
+    return state
+
+
+def _event_vector(event: dict) -> Optional[List[float]]:
+    radar = event.get("radar")
+    return radar if radar and len(radar) == len(DIMENSIONS) else None
+
+
+async def _load() -> _TenantState:
+    import numpy as np
+
+    state = _state()
+    async with state.load_lock:
+        if state.loaded:
+            return state
+        newest = (
+            select(func.max(Assignment.id).label("id"))
+            .group_by(Assignment.student_id)
+            .subquery()
+        )
+        async with async_session() as db:
+            result = await db.execute(
+                select(
+                    Assignment.student_id,
+                    Assignment.id,
+                    Assignment.radar_clarity,
+                    Assignment.radar_application,
+                    Assignment.radar_logic,
+                    Assignment.radar_critical_thinking,
+                    Assignment.radar_retention,
+                ).join(newest, Assignment.id == newest.c.id)
+            )
+            rows = np.array(result.all(), dtype=np.float64).reshape(-1, 2 + len(DIMENSIONS))
+
+        index = PeerIndex()
+        index.bulk_load(
+            rows[:, 0].astype(np.int64),
+            rows[:, 1].astype(np.int64),
+            rows[:, 2:].astype(np.float32),
+        )
+        for event in state.pending:
+            vector = _event_vector(event)
+            if vector is not None:
+                index.upsert(event["student_id"], event["assignment_id"], vector)
+        state.pending.clear()
+        state.index = index
+        state.loaded = True
+    return state
+
+
+def apply_event(event: dict) -> None:
+    """Fold a score event's radar vector into the current tenant's index, if loaded."""
+    vector = _event_vector(event)
+    if vector is None:
+        return
+    state = _state()
+    if not state.loaded:
+        if state.load_lock.locked():
+            state.pending.append(event)
+        return  # the first query loads fresh state
+    state.index.upsert(event["student_id"], event["assignment_id"], vector)
+
+
+async def reset() -> None:
+    """Drop every tenant's index; the next query reloads it (e.g. after missed events)."""
+    for state in _states.values():
+        state.loaded = False
+
+
+async def find_peers(student_id: int, k: int, mode: str) -> Optional[List[Tuple[int, float]]]:
+    """Top-k (student_id, score) peers; None if the student has no scores."""
+    state = await _load()
+    if state.index.vector(student_id) is None:
+        return None
+    return state.index.query(student_id, k, mode)
+
+
+def radar_of(student_id: int) -> Optional[Dict[str, float]]:
+    vector = _state().index.vector(student_id)
+    if vector is None:
+        return None
+    return {dim: round(float(v), 1) for dim, v in zip(DIMENSIONS, vector)}
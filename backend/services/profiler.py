@@ -0,0 +1,111 @@
+"""
+Profiler Service — low-overhead sampling profiler for single requests.
+
+A daemon thread wakes every PROFILING_INTERVAL_MS and records the current
+stack of the event-loop thread, so the profile shows where loop time goes
+(Pydantic validation, ORM hydration, JSON encoding, ...). Time spent
+awaiting I/O appears under the event loop's selector frames. Samples are
+of the whole thread: frames of every task the loop runs meanwhile, not
+only the profiled request's, are included.
+
+Output formats:
+  * speedscope — JSON for https://www.speedscope.app
+  * collapsed  — "frame;frame;frame count" lines for flamegraph.pl
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+Frame = Tuple[str, str, int]  # (function, file, first line)
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a fixed interval."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="request-profiler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        self._thread.start()
+
+    async def stop(self) -> None:
+        """Stop sampling; the join runs off the loop so it never blocks it."""
+        self._stop.set()
+        await asyncio.to_thread(self._thread.join)
+        self.duration = time.perf_counter() - self._started
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack: List[Frame] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    # ---------- Export ----------
+
+    def to_collapsed(self) -> str:
+        lines = [
+            ";".join(f"{name} ({file}:{line})" for name, file, line in stack)
+            + f" {count}"
+            for stack, count in self.stacks.most_common()
+        ]
+        return "\n".join(lines) + "\n"
+
+    def to_speedscope(self, name: str) -> Dict:
+        frame_index: Dict[Frame, int] = {}
+        frames: List[Dict] = []
+        samples: List[List[int]] = []
+        weights: List[float] = []
+        interval_ms = self.interval * 1000
+
+        for stack, count in self.stacks.items():
+            indices = []
+            for frame in stack:
+                idx = frame_index.get(frame)
+                if idx is None:
+                    idx = frame_index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                indices.append(idx)
+            samples.append(indices)
+            weights.append(count * interval_ms)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "verilearn",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": round(self.duration * 1000, 3),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+    def export(self, fmt: str, name: str) -> Tuple[bytes, str]:
+        """Return (body, media type) for the requested format."""
+        if fmt == "collapsed":
+            return self.to_collapsed().encode(), "text/plain"
+        return json.dumps(self.to_speedscope(name)).encode(), "application/json"
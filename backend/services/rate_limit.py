@@ -0,0 +1,263 @@
+"""
+Rate Limit Service — Admission control for expensive AI-backed work.
+
+Two layers protect the AI provider quota and the DB pool:
+  * a global ConcurrencyLimiter with a bounded wait queue, and
+  * per-user token buckets kept in a pluggable RateLimitBackend, chosen
+    by AI_RATE_LIMIT_BACKEND:
+        memory — per-process buckets (default; single worker)
+        redis  — buckets at REDIS_URL shared by every worker, each take
+                 one atomic Lua script run on the server's clock
+                 (redis-py is imported only when this backend is selected)
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from config import get_settings
+from database import shards
+from services import metrics as metrics_registry
+
+settings = get_settings()
+
+
+class AdmissionRejected(Exception):
+    """The global limiter is saturated or the wait timed out."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Analysis capacity exhausted.")
+        self.retry_after = retry_after
+
+
+class RateLimited(Exception):
+    """The caller's token bucket is empty."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Rate limit exceeded.")
+        self.retry_after = retry_after
+
+
+# ==================== Global concurrency ====================
+
+class ConcurrencyLimiter:
+    """Caps concurrent work; excess callers wait in a bounded queue."""
+
+    def __init__(self, limit: int, max_waiting: int, wait_timeout: float):
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self._sem = asyncio.Semaphore(limit)
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        retry_after = max(1, int(self.wait_timeout))
+        if not self._sem.locked():
+            await self._sem.acquire()  # free slot: returns without suspending
+        elif self.waiting >= self.max_waiting:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected(retry_after)
+        else:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._sem.acquire(), self.wait_timeout)
+            except asyncio.TimeoutError:
+                self.rejected_timeout += 1
+                raise AdmissionRejected(retry_after)
+            finally:
+                self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._sem.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+        }
+
+
+# ==================== Per-user token buckets ====================
+
+class RateLimitBackend:
+    """Token-bucket storage. Subclass to share buckets across workers."""
+
+    async def take(self, key: str, rate: float, capacity: float) -> float:
+        """
+        Consume one token from the bucket at `key`.
+
+        Returns 0 when allowed, otherwise seconds until a token is available.
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Per-process buckets: {key: (tokens, last_refill_monotonic)}."""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    async def take(self, key: str, rate: float, capacity: float) -> float:
+        now = time.monotonic()
+        tokens, last = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - last) * rate)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            return 0.0
+        self._buckets[key] = (tokens, now)
+        return (1 - tokens) / rate
+
+
+# Refill, take and store in one step, so concurrent workers can't both
+# spend the last token. Returns the wait as a string: Lua numbers come
+# back from Redis truncated to integers.
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'last')
+local tokens = tonumber(bucket[1]) or capacity
+local last = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - last) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'last', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Buckets in a Redis hash per key, {tokens, last}, shared by every
+    worker. Pass `client` to use any redis.asyncio-compatible client;
+    otherwise one is built from `url`. A bucket expires once it would
+    have refilled completely.
+    """
+
+    def __init__(self, url: str = "", client=None, prefix: str = ""):
+        if client is None:
+            if not url:
+                raise ValueError("REDIS_URL is required for the redis rate limit backend.")
+            from redis import asyncio as aioredis
+
+            client = aioredis.from_url(url)
+        self._client = client
+        self._prefix = prefix or f"{settings.CACHE_KEY_PREFIX}:ratelimit:"
+        self._take = client.register_script(_TAKE_SCRIPT)  # EVALSHA, EVAL on a miss
+
+    async def take(self, key: str, rate: float, capacity: float) -> float:
+        wait = await self._take(keys=[self._prefix + key], args=[rate, capacity])
+        return float(wait)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+analysis_limiter = ConcurrencyLimiter(
+    limit=settings.AI_MAX_CONCURRENT_ANALYSES,
+    max_waiting=settings.AI_MAX_QUEUED_ANALYSES,
+    wait_timeout=settings.AI_QUEUE_TIMEOUT_SECONDS,
+)
+
+_backend: Optional[RateLimitBackend] = None
+_rate_limited: Dict[str, int] = {"student": 0, "teacher": 0}
+
+# role -> (tokens per second, bucket capacity)
+_ROLE_LIMITS = {
+    "student": (
+        settings.AI_STUDENT_RATE_PER_MINUTE / 60,
+        settings.AI_STUDENT_BURST,
+    ),
+    "teacher": (
+        settings.AI_TEACHER_RATE_PER_MINUTE / 60,
+        settings.AI_TEACHER_BURST,
+    ),
+}
+
+
+def _build_backend() -> RateLimitBackend:
+    name = settings.AI_RATE_LIMIT_BACKEND
+    if name == "memory":
+        return InMemoryRateLimitBackend()
+    if name == "redis":
+        return RedisRateLimitBackend(settings.REDIS_URL)
+    raise ValueError(f"Unknown AI_RATE_LIMIT_BACKEND: {name!r}")
+
+
+def get_backend() -> RateLimitBackend:
+    """The configured bucket store, built on first use."""
+    global _backend
+    if _backend is None:
+        _backend = _build_backend()
+    return _backend
+
+
+def set_backend(backend: RateLimitBackend) -> None:
+    """Replace the bucket store, e.g. with a Redis stand-in in tests."""
+    global _backend
+    _backend = backend
+
+
+async def close_backend() -> None:
+    if _backend is not None:
+        await _backend.close()
+
+
+async def check_user_rate(user_id: int, role: str) -> None:
+    """Take one token for the user or raise RateLimited."""
+    if role not in _ROLE_LIMITS:
+        return
+    rate, capacity = _ROLE_LIMITS[role]
+    # User ids repeat across tenants (one id sequence per schema)
+    tenant = shards.current()
+    key = f"ai:{role}:{user_id}"
+    if tenant != settings.DEFAULT_TENANT:
+        key = f"ai:{role}:@{tenant}:{user_id}"
+    wait = await get_backend().take(key, rate, capacity)
+    if wait > 0:
+        _rate_limited[role] += 1
+        raise RateLimited(max(1, int(wait + 0.999)))
+
+
+def metrics() -> Dict[str, int]:
+    """Queue depth and rejection counters for the AI admission layer."""
+    stats = analysis_limiter.stats()
+    for role, count in _rate_limited.items():
+        stats[f"rate_limited_{role}"] = count
+    return stats
+
+
+_AI_ADMISSION = metrics_registry.GaugeFamily(
+    "verilearn_ai_admission",
+    "AI admission control: in-flight, queue depth and rejection counts.",
+    ("stat",),
+)
+
+
+def _collect_admission_metrics() -> None:
+    for stat, value in metrics().items():
+        _AI_ADMISSION.set((stat,), value)
+
+
+metrics_registry.register_collector(_collect_admission_metrics)
@@ -47,6 +47,15 @@ def get_strongest_topic(
     return best.get("topic", "Unknown")
 
 
+def performance_bucket(score: float) -> str:
+    """High (>=80), Medium (60–79) or Low (<60)."""
+    if score >= 80:
+        return "high"
+    if score >= 60:
+        return "medium"
+    return "low"
+
+
 def compute_performance_distribution(
     scores: List[float],
 ) -> Dict[str, int]:
@@ -55,12 +64,7 @@ def compute_performance_distribution(
     """
     distribution = {"high": 0, "medium": 0, "low": 0}
     for score in scores:
-        if score >= 80:
-            distribution["high"] += 1
-        elif score >= 60:
-            distribution["medium"] += 1
-        else:
-            distribution["low"] += 1
+        distribution[performance_bucket(score)] += 1
     return distribution
 
 
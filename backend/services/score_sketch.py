@@ -0,0 +1,296 @@
+"""
+Score Sketch Service — mergeable score histograms per class, subject and week.
+
+Final scores are 0–100 at 0.1 precision, so an HDR-style fixed histogram
+with one bucket per 0.1 point (1001 buckets) is exact for this domain. It
+merges by adding counts, and it supports removal, which regrades need.
+Every percentile, mean or histogram query walks at most 1001 buckets,
+however many submissions there are.
+
+Counts are stored sparsely in score_sketch_buckets and updated inside the
+write transaction with atomic upserts, so concurrent workers never lose
+increments. "latest" adjustments lock the student's row first, so two
+submissions of one student can't both retire the same previous score,
+and rebuild() locks the bucket table, so writes wait for it rather than
+landing in the gap between its scan and its rewrite. Scopes:
+    all               — every assignment score
+    latest            — each student's newest score (the population
+                        compute_performance_distribution looks at)
+    subject:<name>    — assignment scores per subject
+    week:<YYYY-Www>   — assignment scores by ISO week of created_at
+Merging scopes, e.g. several classes into a school, sums their rows;
+assignments are never rescanned.
+"""
+
+import math
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.assignment_model import Assignment, ScoreSketchBucket
+from models.user_model import User
+
+RESOLUTION = 10  # buckets per score point
+BUCKETS = 100 * RESOLUTION + 1
+
+
+def bucket_of(score: float) -> int:
+    return min(BUCKETS - 1, max(0, round(score * RESOLUTION)))
+
+
+def week_of(created_at: Optional[datetime]) -> str:
+    moment = created_at or datetime.now(timezone.utc)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return moment.strftime("%G-W%V")
+
+
+def scopes_for(subject: Optional[str], created_at: Optional[datetime]) -> List[str]:
+    """Assignment-level scopes a score counts toward."""
+    return ["all", f"subject:{subject or 'General'}", f"week:{week_of(created_at)}"]
+
+
+class ScoreHistogram:
+    """Fixed 0.1-resolution histogram over 0–100."""
+
+    __slots__ = ("counts", "total")
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.total = 0
+
+    def add_bucket(self, bucket: int, n: int = 1) -> None:
+        self.counts[bucket] += n
+        self.total += n
+
+    def add(self, score: float, n: int = 1) -> None:
+        self.add_bucket(bucket_of(score), n)
+
+    def merge(self, other: "ScoreHistogram") -> "ScoreHistogram":
+        for i, n in enumerate(other.counts):
+            if n:
+                self.counts[i] += n
+        self.total += other.total
+        return self
+
+    def mean(self) -> float:
+        if self.total <= 0:
+            return 0.0
+        weighted = sum(i * n for i, n in enumerate(self.counts) if n)
+        return round(weighted / self.total / RESOLUTION, 1)
+
+    def percentiles(self, ps: Iterable[float]) -> Dict[float, float]:
+        """Nearest-rank percentiles, all answered in a single pass."""
+        wanted = sorted(set(ps))
+        result: Dict[float, float] = {}
+        if self.total <= 0:
+            return {p: 0.0 for p in wanted}
+        ranks = [(p, max(1, math.ceil(p / 100 * self.total))) for p in wanted]
+        seen = 0
+        j = 0
+        for i, n in enumerate(self.counts):
+            if not n:
+                continue
+            seen += n
+            while j < len(ranks) and ranks[j][1] <= seen:
+                result[ranks[j][0]] = i / RESOLUTION
+                j += 1
+            if j == len(ranks):
+                break
+        return result
+
+    def histogram(self, bins: int) -> List[dict]:
+        """`bins` equal-width bins over 0–100; the last one includes 100."""
+        width = 100 / bins
+        counts = [0] * bins
+        for i, n in enumerate(self.counts):
+            if n:
+                counts[min(bins - 1, int(i / RESOLUTION / width))] += n
+        return [
+            {"lo": round(b * width, 1), "hi": round((b + 1) * width, 1), "count": c}
+            for b, c in enumerate(counts)
+        ]
+
+
+# ---------- Persistence ----------
+
+
+def _upsert(db: AsyncSession):
+    """INSERT … ON CONFLICT for the session's dialect."""
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(ScoreSketchBucket)
+
+
+async def _apply(db: AsyncSession, deltas: Dict[tuple, int]) -> None:
+    rows = [
+        {"scope": scope, "bucket": bucket, "count": n}
+        for (scope, bucket), n in deltas.items()
+        if n
+    ]
+    if not rows:
+        return
+    stmt = _upsert(db).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ScoreSketchBucket.scope, ScoreSketchBucket.bucket],
+        set_={"count": ScoreSketchBucket.count + stmt.excluded.count},
+    )
+    await db.execute(stmt)
+
+
+async def _lock_students(db: AsyncSession, student_ids: Iterable[int]) -> None:
+    """
+    Serialize "latest" adjustments per student until the transaction ends.
+    FOR NO KEY UPDATE, in id order: it doesn't conflict with the KEY SHARE
+    locks the assignment inserts already hold on these rows.
+    """
+    await db.execute(
+        select(User.id)
+        .where(User.id.in_(sorted(set(student_ids))))
+        .order_by(User.id)
+        .with_for_update(key_share=True)
+    )
+
+
+async def record_score(db: AsyncSession, assignment: Assignment, previous: Optional[float]) -> None:
+    """
+    Fold a scored assignment into its sketches, in the caller's transaction.
+    `previous` is the assignment's score before a regrade, None for a new one.
+    """
+    deltas: Dict[tuple, int] = defaultdict(int)
+    for scope in scopes_for(assignment.subject, assignment.created_at):
+        deltas[(scope, bucket_of(assignment.final_score))] += 1
+        if previous is not None:
+            deltas[(scope, bucket_of(previous))] -= 1
+
+    # "latest" only moves when this is the student's newest assignment,
+    # judged after concurrent submissions of the student have committed
+    await _lock_students(db, [assignment.student_id])
+    result = await db.execute(
+        select(Assignment.id, Assignment.final_score)
+        .where(Assignment.student_id == assignment.student_id)
+        .order_by(Assignment.id.desc())
+        .limit(2)
+    )
+    newest = result.all()
+    if newest and newest[0][0] == assignment.id:
+        deltas[("latest", bucket_of(assignment.final_score))] += 1
+        if previous is not None:
+            deltas[("latest", bucket_of(previous))] -= 1
+        elif len(newest) > 1:
+            deltas[("latest", bucket_of(newest[1][1]))] -= 1
+
+    await _apply(db, deltas)
+
+
+async def record_new_scores(db: AsyncSession, assignments: List[Assignment]) -> None:
+    """
+    record_score() for a batch of just-inserted assignments, in one query
+    and one upsert. Several rows of one student in the batch move "latest"
+    once, to the newest of them.
+    """
+    deltas: Dict[tuple, int] = defaultdict(int)
+    newest: Dict[int, Assignment] = {}
+    for a in assignments:
+        for scope in scopes_for(a.subject, a.created_at):
+            deltas[(scope, bucket_of(a.final_score))] += 1
+        if a.id > getattr(newest.get(a.student_id), "id", -1):
+            newest[a.student_id] = a
+
+    # Each student's newest assignment outside the batch
+    await _lock_students(db, newest)
+    others = (
+        select(Assignment.student_id, func.max(Assignment.id).label("id"))
+        .where(
+            Assignment.student_id.in_(list(newest)),
+            Assignment.id.not_in([a.id for a in assignments]),
+        )
+        .group_by(Assignment.student_id)
+        .subquery()
+    )
+    result = await db.execute(
+        select(Assignment.student_id, Assignment.id, Assignment.final_score)
+        .join(others, Assignment.id == others.c.id)
+    )
+    before = {student_id: (aid, score) for student_id, aid, score in result.all()}
+    for student_id, a in newest.items():
+        other = before.get(student_id)
+        if other is not None and other[0] > a.id:
+            continue  # a newer submission landed meanwhile
+        deltas[("latest", bucket_of(a.final_score))] += 1
+        if other is not None:
+            deltas[("latest", bucket_of(other[1]))] -= 1
+
+    await _apply(db, deltas)
+
+
+async def load(db: AsyncSession, scopes: List[str]) -> ScoreHistogram:
+    """Histogram for the union of `scopes`, merged in the database."""
+    result = await db.execute(
+        select(ScoreSketchBucket.bucket, func.sum(ScoreSketchBucket.count))
+        .where(ScoreSketchBucket.scope.in_(scopes))
+        .group_by(ScoreSketchBucket.bucket)
+    )
+    hist = ScoreHistogram()
+    for bucket, n in result.all():
+        if n:
+            hist.add_bucket(bucket, int(n))
+    return hist
+
+
+async def list_scopes(db: AsyncSession) -> List[str]:
+    result = await db.execute(
+        select(ScoreSketchBucket.scope)
+        .where(ScoreSketchBucket.count > 0)
+        .distinct()
+        .order_by(ScoreSketchBucket.scope)
+    )
+    return list(result.scalars())
+
+
+async def rebuild(db: AsyncSession) -> int:
+    """
+    Recompute every sketch from the assignments table in one streamed
+    pass. For backfills and bulk re-scores; returns assignments counted.
+    On Postgres the bucket table is locked against writes (reads go on)
+    until the caller commits: a write that was waiting applies its delta
+    on top of the rebuilt counts, which don't include its row.
+    """
+    if db.bind.dialect.name == "postgresql":
+        await db.execute(text(
+            f"LOCK TABLE {ScoreSketchBucket.__tablename__} IN EXCLUSIVE MODE"
+        ))
+    deltas: Dict[tuple, int] = defaultdict(int)
+    latest: Dict[int, tuple] = {}  # student_id -> (assignment_id, score)
+    counted = 0
+    result = await db.stream(
+        select(
+            Assignment.id,
+            Assignment.student_id,
+            Assignment.subject,
+            Assignment.final_score,
+            Assignment.created_at,
+        )
+    )
+    async for aid, student_id, subject, score, created_at in result:
+        for scope in scopes_for(subject, created_at):
+            deltas[(scope, bucket_of(score))] += 1
+        if aid > latest.get(student_id, (-1, 0.0))[0]:
+            latest[student_id] = (aid, score)
+        counted += 1
+    for _, score in latest.values():
+        deltas[("latest", bucket_of(score))] += 1
+
+    await db.execute(delete(ScoreSketchBucket))
+    rows = [
+        {"scope": scope, "bucket": bucket, "count": n}
+        for (scope, bucket), n in deltas.items()
+    ]
+    for start in range(0, len(rows), 5000):
+        await db.execute(ScoreSketchBucket.__table__.insert(), rows[start:start + 5000])
+    return counted
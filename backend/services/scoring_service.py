@@ -1,41 +1,125 @@
 """
 Scoring Service — Weighted scoring formula for understanding evaluation.
 
-Final Score = 0.4 * Concept Clarity + 0.3 * Application
-            + 0.2 * Logical Consistency + 0.1 * Depth
+Final Score = w1 * Concept Clarity + w2 * Application
+            + w3 * Logical Consistency + w4 * Depth
+
+Weights come from named, versioned profiles ("standard@1"). A published
+version is never edited: a rubric change adds a new version, points
+SCORING_PROFILE / SCORING_SUBJECT_PROFILES at it, and
+`python -m jobs.rescore` brings historical final scores in line. Each
+assignment records the profile that produced its score (scoring_profile).
+
+Scores are rounded by round_score(), NumPy's rule in pure Python, so the
+per-submission path here and the vectorized backfill agree on every value
+without NumPy on the request path.
 """
 
+from decimal import ROUND_HALF_EVEN, Decimal
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional
+
+from config import get_settings
 from models.assignment_model import ScoreBreakdown, RadarScores
 
 
+class WeightProfile(NamedTuple):
+    """Component weights for one rubric version; they sum to 1."""
+    name: str
+    version: int
+    concept_clarity: float
+    application: float
+    logical_consistency: float
+    depth: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@{self.version}"
+
+    @property
+    def weights(self) -> tuple:
+        return (self.concept_clarity, self.application, self.logical_consistency, self.depth)
+
+
+PROFILES: Dict[str, WeightProfile] = {
+    p.key: p
+    for p in (
+        WeightProfile("standard", 1, 0.4, 0.3, 0.2, 0.1),
+        WeightProfile("applied", 1, 0.3, 0.4, 0.2, 0.1),      # project/lab subjects
+        WeightProfile("rigorous", 1, 0.35, 0.2, 0.3, 0.15),   # proof-heavy subjects
+    )
+}
+
+for _profile in PROFILES.values():
+    assert abs(sum(_profile.weights) - 1) < 1e-9, f"{_profile.key} weights must sum to 1"
+
+
+def get_profile(key: str) -> WeightProfile:
+    """Look up "name@version"; a bare name means its latest version."""
+    if key in PROFILES:
+        return PROFILES[key]
+    versions = [p for p in PROFILES.values() if p.name == key]
+    if not versions:
+        raise ValueError(f"Unknown scoring profile: {key!r}")
+    return max(versions, key=lambda p: p.version)
+
+
+@lru_cache(maxsize=1)
+def subject_profiles() -> Dict[str, WeightProfile]:
+    """SCORING_SUBJECT_PROFILES parsed: "Math=rigorous@1;Lab=applied@1"."""
+    mapping = {}
+    for entry in get_settings().SCORING_SUBJECT_PROFILES.split(";"):
+        if "=" in entry:
+            subject, key = entry.split("=", 1)
+            mapping[subject.strip()] = get_profile(key.strip())
+    return mapping
+
+
+def profile_for(subject: Optional[str]) -> WeightProfile:
+    """The active profile for a subject, falling back to SCORING_PROFILE."""
+    profile = subject_profiles().get(subject or "General")
+    return profile or get_profile(get_settings().SCORING_PROFILE)
+
+
+def round_score(value: float) -> float:
+    """
+    One decimal, as np.round does it (half to even on the float value × 10,
+    then / 10), so a scalar here rounds exactly like jobs/rescore.py's
+    arrays; Python's round() disagrees on ties such as 70.65.
+    """
+    return float(Decimal(value * 10).to_integral_value(ROUND_HALF_EVEN)) / 10
+
+
 def calculate_final_score(
     concept_clarity: float,
     application: float,
     logical_consistency: float,
     depth: float,
+    profile: Optional[WeightProfile] = None,
 ) -> ScoreBreakdown:
     """
     Apply the weighted scoring formula and return a full breakdown.
 
-    Weights:
+    Weights come from `profile` (default: SCORING_PROFILE). standard@1:
         Concept Clarity      → 40%
         Application          → 30%
         Logical Consistency  → 20%
         Depth                → 10%
     """
+    w = profile or get_profile(get_settings().SCORING_PROFILE)
     final = (
-        0.4 * concept_clarity
-        + 0.3 * application
-        + 0.2 * logical_consistency
-        + 0.1 * depth
+        w.concept_clarity * concept_clarity
+        + w.application * application
+        + w.logical_consistency * logical_consistency
+        + w.depth * depth
     )
 
     return ScoreBreakdown(
-        concept_clarity=round(concept_clarity, 1),
-        application=round(application, 1),
-        logical_consistency=round(logical_consistency, 1),
-        depth=round(depth, 1),
-        final_score=round(final, 1),
+        concept_clarity=round_score(concept_clarity),
+        application=round_score(application),
+        logical_consistency=round_score(logical_consistency),
+        depth=round_score(depth),
+        final_score=round_score(final),
     )
 
 
@@ -48,14 +132,57 @@ def build_radar_scores(
 ) -> RadarScores:
     """Build radar chart data from individual dimension scores."""
     return RadarScores(
-        clarity=round(clarity, 1),
-        application=round(application, 1),
-        logic=round(logic, 1),
-        critical_thinking=round(critical_thinking, 1),
-        retention=round(retention, 1),
+        clarity=round_score(clarity),
+        application=round_score(application),
+        logic=round_score(logic),
+        critical_thinking=round_score(critical_thinking),
+        retention=round_score(retention),
     )
 
 
+class SubmissionScores(NamedTuple):
+    """The scores of one evaluated submission."""
+    scores: ScoreBreakdown
+    radar: RadarScores
+    profile: WeightProfile
+
+    def columns(self) -> dict:
+        """Assignment column values for these scores."""
+        return {
+            **self.scores.model_dump(),
+            "scoring_profile": self.profile.key,
+            "radar_clarity": self.radar.clarity,
+            "radar_application": self.radar.application,
+            "radar_logic": self.radar.logic,
+            "radar_critical_thinking": self.radar.critical_thinking,
+            "radar_retention": self.radar.retention,
+        }
+
+
+def score_evaluation(eval_scores: dict, subject: Optional[str]) -> SubmissionScores:
+    """
+    Final score and radar for an evaluate_understanding() result, weighted
+    by the subject's active profile. Every write path (submit, follow-up,
+    regrade, bulk and batch imports) scores through here.
+    """
+    profile = profile_for(subject)
+    scores = calculate_final_score(
+        concept_clarity=eval_scores["concept_clarity"],
+        application=eval_scores["application"],
+        logical_consistency=eval_scores["logical_consistency"],
+        depth=eval_scores.get("depth", 70),
+        profile=profile,
+    )
+    radar = build_radar_scores(
+        clarity=eval_scores.get("clarity", 75),
+        application=eval_scores["application"],
+        logic=eval_scores["logical_consistency"],
+        critical_thinking=eval_scores.get("critical_thinking", 70),
+        retention=eval_scores.get("retention", 72),
+    )
+    return SubmissionScores(scores, radar, profile)
+
+
 def compute_growth_trend(score_history: list[float]) -> float:
     """
     Calculate growth trend as percentage change between
@@ -69,7 +196,11 @@ def compute_growth_trend(score_history: list[float]) -> float:
     mid = len(score_history) // 2
     first_half = sum(score_history[:mid]) / mid
     second_half = sum(score_history[mid:]) / (len(score_history) - mid)
+    return growth_between(first_half, second_half)
+
 
+def growth_between(first_half: float, second_half: float) -> float:
+    """compute_growth_trend() from the two half averages, for SQL aggregates."""
     if first_half == 0:
         return 0.0
 
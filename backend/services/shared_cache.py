@@ -0,0 +1,367 @@
+"""
+Shared Cache — pluggable cache backends for data workers must agree on.
+
+CACHE_BACKEND selects the store:
+    memory — per-process LRU/TTL (default; single worker, local runs)
+    redis  — any Redis-protocol server at REDIS_URL, shared by all workers
+             (redis-py is imported only when this backend is selected)
+
+Keys are namespaced as "<CACHE_KEY_PREFIX>:<namespace>:<key>", with
+"@<tenant>:" before the key for tenants other than DEFAULT_TENANT
+(database/shards.py), so schools never read each other's entries. Values
+are bytes; callers store pre-serialized payloads.
+
+Cache.get_or_set() protects against stampedes on a miss: concurrent misses
+in one process share a single load, and across processes a short-lived
+lock key lets one worker load while the others poll briefly for its value.
+Backend failures degrade to cache misses rather than failing requests.
+
+A load can race an invalidation: the loader reads the database before a
+write commits and stores its result after the write's delete. To keep
+that stale value out, every key has a generation counter ("<key>:gen")
+that delete() bumps before evicting, and clear() bumps a namespace-wide
+epoch. A load stores its value only if the generation it read before
+calling the loader is unchanged afterwards, and evicts the value again if
+an invalidation landed between that check and the store.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+from config import get_settings
+from database import shards
+from services import metrics
+from services.cache import TTLCache
+
+settings = get_settings()
+
+_REQUESTS = metrics.CounterFamily(
+    "verilearn_cache_requests_total",
+    "Cache lookups by namespace and result (hit, miss, coalesced, discarded, error).",
+    ("namespace", "result"),
+)
+_EVICTIONS = metrics.CounterFamily(
+    "verilearn_cache_evictions_total",
+    "Entries evicted by a size-bounded backend to make room.",
+    ("backend",),
+)
+
+
+class CacheBackend:
+    """Async key/value store with per-key TTL."""
+
+    name = "base"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        raise NotImplementedError
+
+    async def add(self, key: str, value: bytes, ttl: float) -> bool:
+        """Set only if the key is absent; True if this call set it."""
+        raise NotImplementedError
+
+    async def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    async def incr(self, keys: Sequence[str], ttl: float) -> None:
+        """Increment integer counters, (re)setting their TTL."""
+        raise NotImplementedError
+
+    async def delete_prefix(self, prefix: str) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU/TTL store."""
+
+    name = "memory"
+
+    def __init__(self, maxsize: int):
+        self._data = TTLCache(maxsize=maxsize, ttl=0)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._data.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        before = self._data.evictions
+        self._data.set(key, value, ttl)
+        if self._data.evictions > before:
+            _EVICTIONS.inc((self.name,), self._data.evictions - before)
+
+    async def add(self, key: str, value: bytes, ttl: float) -> bool:
+        if self._data.get(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key)
+
+    async def incr(self, keys: Sequence[str], ttl: float) -> None:
+        for key in keys:
+            self._data.set(key, str(int(self._data.get(key) or 0) + 1).encode(), ttl)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        for key in self._data.keys():
+            if key.startswith(prefix):
+                self._data.pop(key)
+
+
+class RedisBackend(CacheBackend):
+    """
+    Redis-protocol store. Pass `client` to use any redis.asyncio-compatible
+    client (e.g. a local stand-in); otherwise one is built from `url`.
+    Evictions happen server-side and are reported by Redis' own INFO stats.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str = "", client=None):
+        if client is None:
+            if not url:
+                raise ValueError("REDIS_URL is required for the redis cache backend.")
+            from redis import asyncio as aioredis
+
+            client = aioredis.from_url(url)
+        self._client = client
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._client.set(key, value, px=max(1, int(ttl * 1000)))
+
+    async def add(self, key: str, value: bytes, ttl: float) -> bool:
+        return bool(
+            await self._client.set(key, value, px=max(1, int(ttl * 1000)), nx=True)
+        )
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._client.delete(*keys)
+
+    async def incr(self, keys: Sequence[str], ttl: float) -> None:
+        async with self._client.pipeline(transaction=True) as pipe:
+            for key in keys:
+                pipe.incr(key)
+                pipe.pexpire(key, max(1, int(ttl * 1000)))
+            await pipe.execute()
+
+    async def delete_prefix(self, prefix: str) -> None:
+        batch = []
+        async for key in self._client.scan_iter(match=prefix + "*", count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                await self._client.delete(*batch)
+                batch = []
+        if batch:
+            await self._client.delete(*batch)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+_backend: Optional[CacheBackend] = None
+
+
+def _build_backend() -> CacheBackend:
+    name = settings.CACHE_BACKEND
+    if name == "memory":
+        return MemoryBackend(settings.CACHE_MEMORY_SIZE)
+    if name == "redis":
+        return RedisBackend(settings.REDIS_URL)
+    raise ValueError(f"Unknown CACHE_BACKEND: {name!r}")
+
+
+def get_backend() -> CacheBackend:
+    """The configured backend, built on first use."""
+    global _backend
+    if _backend is None:
+        _backend = _build_backend()
+    return _backend
+
+
+def set_backend(backend: CacheBackend) -> None:
+    """Swap the backend, e.g. for a Redis stand-in in tests."""
+    global _backend
+    _backend = backend
+
+
+async def close_backend() -> None:
+    if _backend is not None:
+        await _backend.close()
+
+
+class Cache:
+    """
+    A namespace inside the shared backend. A ttl of 0 disables caching:
+    get() always misses and get_or_set() always calls the loader.
+    """
+
+    def __init__(self, namespace: str, ttl: float):
+        self.namespace = namespace
+        self.ttl = ttl
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _key(self, key: str) -> str:
+        tenant = shards.current()
+        if tenant != settings.DEFAULT_TENANT:
+            key = f"@{tenant}:{key}"
+        return f"{settings.CACHE_KEY_PREFIX}:{self.namespace}:{key}"
+
+    def _epoch_key(self) -> str:
+        # Outside the namespace prefix, so clear() doesn't delete it
+        return f"{settings.CACHE_KEY_PREFIX}:~epoch:{self.namespace}"
+
+    def _generation_ttl(self) -> float:
+        # Outlives any load that could race the bump; expiry only ever
+        # makes a load discard its value
+        return self.ttl + settings.CACHE_LOCK_TTL
+
+    async def _generation(self, full_key: str) -> Optional[Tuple[bytes, bytes]]:
+        """(epoch, key generation); None if the backend can't say."""
+        backend = get_backend()
+        try:
+            return (
+                await backend.get(self._epoch_key()) or b"0",
+                await backend.get(full_key + ":gen") or b"0",
+            )
+        except Exception:
+            self._count("error")
+            return None
+
+    def _count(self, result: str) -> None:
+        _REQUESTS.inc((self.namespace, result))
+
+    async def get(self, key: str) -> Optional[bytes]:
+        if self.ttl <= 0:
+            return None
+        try:
+            value = await get_backend().get(self._key(key))
+        except Exception:
+            self._count("error")
+            return None
+        self._count("hit" if value is not None else "miss")
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if self.ttl <= 0:
+            return
+        try:
+            await get_backend().set(self._key(key), value, ttl or self.ttl)
+        except Exception:
+            self._count("error")
+
+    async def delete(self, *keys: str) -> None:
+        """Evict keys; loads already running for them won't store their values."""
+        full_keys = [self._key(k) for k in keys]
+        try:
+            backend = get_backend()
+            await backend.incr([k + ":gen" for k in full_keys], self._generation_ttl())
+            await backend.delete(*full_keys)
+        except Exception:
+            self._count("error")
+
+    async def clear(self) -> None:
+        """Drop every key in this namespace, for every tenant."""
+        try:
+            backend = get_backend()
+            await backend.incr([self._epoch_key()], self._generation_ttl())
+            await backend.delete_prefix(f"{settings.CACHE_KEY_PREFIX}:{self.namespace}:")
+        except Exception:
+            self._count("error")
+
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[bytes]],
+        ttl: Optional[float] = None,
+    ) -> bytes:
+        """Cached value for `key`, loading and storing it on a miss."""
+        if self.ttl <= 0:
+            return await loader()
+
+        value = await self.get(key)
+        if value is not None:
+            return value
+
+        inflight_key = self._key(key)  # coalesce per tenant too
+        inflight = self._inflight.get(inflight_key)
+        if inflight is not None:
+            self._count("coalesced")
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                return await loader()  # the loading request went away
+
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting; don't log the exception as unretrieved
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[inflight_key] = future
+        try:
+            value = await self._load(key, loader, ttl or self.ttl)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            del self._inflight[inflight_key]
+
+    async def _load(self, key: str, loader, ttl: float) -> bytes:
+        backend = get_backend()
+        full_key = self._key(key)
+        lock_key = full_key + ":lock"
+
+        try:
+            locked = await backend.add(lock_key, b"1", settings.CACHE_LOCK_TTL)
+        except Exception:
+            self._count("error")
+            locked = True  # backend is down; just load
+
+        if not locked:
+            # Another worker is loading this key; wait briefly for its value
+            deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                try:
+                    value = await backend.get(full_key)
+                except Exception:
+                    break
+                if value is not None:
+                    return value
+
+        try:
+            before = await self._generation(full_key)
+            value = await loader()
+            if before is None or await self._generation(full_key) != before:
+                self._count("discarded")  # invalidated while loading
+                return value
+            await self.set(key, value, ttl)
+            if await self._generation(full_key) != before:
+                # Invalidated between the check and the store
+                self._count("discarded")
+                try:
+                    await backend.delete(full_key)
+                except Exception:
+                    self._count("error")
+            return value
+        finally:
+            if locked:
+                try:
+                    await backend.delete(lock_key)
+                except Exception:
+                    self._count("error")
@@ -0,0 +1,135 @@
+"""
+SQL Profiler — per-request statement log with N+1 detection.
+
+Every statement executed while a profile is active is recorded with its
+duration and a normalized fingerprint (literals and bind parameters
+collapsed), so the same query issued in a loop shows up as one
+fingerprint with a high count.
+
+Also provides assert_max_queries() for pytest:
+
+    with assert_max_queries(3):
+        client.get("/teacher/students", headers=auth)
+"""
+
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import get_settings
+
+settings = get_settings()
+
+_NORMALIZERS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),                    # string literals
+    (re.compile(r"\$\d+|%\(\w+\)s|\b\d+(?:\.\d+)?\b"), "?"),  # params, numbers
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?)"),      # IN (...) lists
+    (re.compile(r"\s+"), " "),
+]
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Normalize a SQL statement so repeated shapes compare equal."""
+    for pattern, repl in _NORMALIZERS:
+        statement = pattern.sub(repl, statement)
+    return statement.strip()
+
+
+class QueryProfile:
+    """Statements recorded for a single request."""
+
+    def __init__(self):
+        self.statements: List[Tuple[str, float]] = []  # (statement, seconds)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.statements.append((statement, elapsed))
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(elapsed for _, elapsed in self.statements)
+
+    def n_plus_one(self, threshold: Optional[int] = None) -> List[Dict]:
+        """Fingerprints executed at least `threshold` times in this request."""
+        threshold = threshold or settings.SQL_PROFILER_N_PLUS_ONE_THRESHOLD
+        counts = Counter(fingerprint(s) for s, _ in self.statements)
+        return [
+            {"fingerprint": fp, "count": count}
+            for fp, count in counts.most_common()
+            if count >= threshold
+        ]
+
+    def summary(self) -> Dict:
+        return {
+            "queries": len(self.statements),
+            "time_ms": round(self.total_seconds * 1000, 2),
+            "n_plus_one": self.n_plus_one(),
+        }
+
+    def header_value(self) -> str:
+        """Compact summary for the X-SQL-Profile debug header."""
+        s = self.summary()
+        return (
+            f"queries={s['queries']}; time_ms={s['time_ms']}; "
+            f"n_plus_one={len(s['n_plus_one'])}"
+        )
+
+
+current_profile: ContextVar[Optional[QueryProfile]] = ContextVar(
+    "current_profile", default=None
+)
+
+# Lists that receive every finished request profile (see record_profiles)
+_listeners: List[List[QueryProfile]] = []
+
+
+def record(statement: str, elapsed: float) -> None:
+    """Engine hook: attribute a statement to the active profile, if any."""
+    profile = current_profile.get()
+    if profile is not None:
+        profile.record(statement, elapsed)
+
+
+def publish(profile: QueryProfile) -> None:
+    """Hand a finished request profile to any active recorders."""
+    for listener in _listeners:
+        listener.append(profile)
+
+
+@contextmanager
+def record_profiles() -> Iterator[List[QueryProfile]]:
+    """Collect the profiles of every request served inside the block."""
+    profiles: List[QueryProfile] = []
+    _listeners.append(profiles)
+    try:
+        yield profiles
+    finally:
+        _listeners.remove(profiles)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[List[QueryProfile]]:
+    """
+    pytest helper — fail if any request served inside the block executed
+    more than `limit` statements. Requires SQL_PROFILER_ENABLED so the
+    profiling middleware is installed.
+    """
+    with record_profiles() as profiles:
+        yield profiles
+
+    for profile in profiles:
+        if len(profile) > limit:
+            detail = "\n".join(
+                f"  {c['count']}x {c['fingerprint']}"
+                for c in profile.n_plus_one(threshold=2)
+            )
+            raise AssertionError(
+                f"Expected at most {limit} queries, got {len(profile)}."
+                + (f"\nRepeated statements:\n{detail}" if detail else "")
+            )
@@ -0,0 +1,191 @@
+"""
+Topic Taxonomy Service — canonical names for free-text weak topics.
+
+The model names the same gap many ways ("DP", "Dynamic Programming",
+"dynamic-programming"). canonicalize() maps each spelling to one
+curated topic, so counts and aggregates don't fragment:
+
+    1. normalize     lowercase, possessive 's dropped, punctuation → spaces,
+                     plural -s folded
+    2. trie          token trie of every canonical name and alias; the
+                     longest alias found anywhere in the text wins
+                     ("recursion base cases" → Recursion)
+    3. fuzzy         unknown spellings are scored token by token against
+                     every alias (typos, reordered words); accepted above
+                     FUZZY_THRESHOLD
+    4. fallback      otherwise the cleaned input, so new topics still show up
+
+Results are LRU-cached: the model repeats a small vocabulary, so nearly
+every lookup after warmup is a cache hit.
+"""
+
+import re
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+FUZZY_THRESHOLD = 0.8
+CACHE_SIZE = 8192
+
+# canonical name -> aliases (the canonical name matches itself)
+TAXONOMY: Dict[str, List[str]] = {
+    "Recursion": ["recursive functions", "recursive thinking", "base case"],
+    "Dynamic Programming": ["dp", "memoization", "tabulation", "dyn prog"],
+    "Graph Theory": ["graphs", "graph"],
+    "Graph Algorithms": ["bfs", "dfs", "breadth first search", "depth first search",
+                         "shortest path", "dijkstra", "topological sort", "minimum spanning tree"],
+    "Data Structures": ["ds", "data structure"],
+    "Sorting Algorithms": ["sorting", "sort", "quicksort", "merge sort", "heapsort"],
+    "Searching": ["binary search", "search algorithms", "linear search"],
+    "Trees & BST": ["trees", "tree", "bst", "binary search tree", "binary tree",
+                    "balanced trees", "avl tree", "red black tree"],
+    "Hashing": ["hash tables", "hash map", "hashmap", "hash functions"],
+    "Linked Lists": ["linked list", "singly linked list", "doubly linked list"],
+    "Stacks & Queues": ["stack", "queue", "stacks", "queues"],
+    "Heaps & Priority Queues": ["heap", "priority queue", "binary heap"],
+    "Time Complexity": ["big o", "big o notation", "asymptotic analysis", "complexity analysis",
+                        "runtime complexity", "algorithmic complexity", "time and space complexity"],
+    "Memory Management": ["memory", "garbage collection", "pointers", "heap allocation",
+                          "memory allocation", "manual memory management"],
+    "Object-Oriented Design": ["oop", "ood", "object oriented programming", "oo design",
+                               "inheritance", "polymorphism", "encapsulation", "design patterns"],
+    "Functional Programming": ["fp", "higher order functions", "immutability", "lambda"],
+    "Database Normalization": ["normalization", "normal forms", "3nf", "bcnf", "db normalization"],
+    "SQL": ["sql queries", "joins", "structured query language"],
+    "Concurrency": ["threads", "multithreading", "parallelism", "race conditions",
+                    "locks", "synchronization", "deadlock"],
+    "Operating Systems": ["os", "processes", "scheduling", "virtual memory"],
+    "Computer Networks": ["networking", "tcp ip", "network protocols"],
+    "Algorithm Design": ["greedy algorithms", "divide and conquer", "backtracking"],
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_POSSESSIVE = re.compile(r"['\u2019]s\b")
+_STOPWORDS = frozenset("a an and of the in on for to with".split())
+
+
+def normalize(text: str) -> Tuple[str, ...]:
+    """
+    Comparable token form: lowercase words, possessive 's and stopwords
+    dropped, plural -s folded.
+    """
+    tokens = []
+    for token in _TOKEN.findall(_POSSESSIVE.sub("", text.lower())):
+        if token in _STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tuple(tokens)
+
+
+class TopicTrie:
+    """Token-level trie from alias token sequences to canonical names."""
+
+    __slots__ = ("children", "canonical")
+
+    def __init__(self):
+        self.children: Dict[str, "TopicTrie"] = {}
+        self.canonical: Optional[str] = None
+
+    def insert(self, tokens: Tuple[str, ...], canonical: str) -> None:
+        node = self
+        for token in tokens:
+            node = node.children.setdefault(token, TopicTrie())
+        node.canonical = canonical
+
+    def longest_match(self, tokens: Tuple[str, ...]) -> Optional[Tuple[str, int]]:
+        """(canonical, length) of the longest alias found at any position."""
+        best: Optional[Tuple[str, int]] = None
+        for start in range(len(tokens)):
+            node = self
+            for end in range(start, len(tokens)):
+                node = node.children.get(tokens[end])
+                if node is None:
+                    break
+                length = end - start + 1
+                if node.canonical is not None and (best is None or length > best[1]):
+                    best = (node.canonical, length)
+        return best
+
+
+def _build() -> Tuple[TopicTrie, List[Tuple[Tuple[str, ...], str]]]:
+    trie = TopicTrie()
+    aliases = []  # (tokens, canonical) for fuzzy scoring
+    for canonical, names in TAXONOMY.items():
+        for name in [canonical, *names]:
+            tokens = normalize(name)
+            if tokens:
+                trie.insert(tokens, canonical)
+                aliases.append((tokens, canonical))
+    return trie, aliases
+
+
+_trie, _aliases = _build()
+
+
+_vocabulary = sorted({token for alias, _ in _aliases for token in alias})
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _similar_tokens(token: str) -> Dict[str, float]:
+    """Alias-vocabulary tokens within FUZZY_THRESHOLD of `token`, with their ratio."""
+    matches = {}
+    matcher = SequenceMatcher(None, "", token)  # seq2 is analysed once
+    for candidate in _vocabulary:
+        # ratio() can't reach the threshold when the lengths differ this much
+        if 2 * min(len(token), len(candidate)) < FUZZY_THRESHOLD * (len(token) + len(candidate)):
+            continue
+        matcher.set_seq1(candidate)
+        if matcher.quick_ratio() < FUZZY_THRESHOLD:
+            continue
+        ratio = matcher.ratio()
+        if ratio >= FUZZY_THRESHOLD:
+            matches[candidate] = ratio
+    return matches
+
+
+def _fuzzy(tokens: Tuple[str, ...]) -> Optional[str]:
+    """Best alias by average per-token similarity, if above the threshold."""
+    similar = [_similar_tokens(t) for t in tokens]
+    best, best_score = None, FUZZY_THRESHOLD
+    for alias, canonical in _aliases:
+        if abs(len(alias) - len(tokens)) > 1:
+            continue
+        matched = sum(max(s.get(a, 0.0) for a in alias) for s in similar)
+        score = matched / max(len(alias), len(tokens))
+        if score > best_score:
+            best, best_score = canonical, score
+    return best
+
+
+def _clean(topic: str) -> str:
+    """Unknown topic, tidied: lowercase words capitalized, acronyms kept."""
+    words = topic.replace("_", " ").strip(" -.,;:").split()
+    return " ".join(w.capitalize() if w.islower() else w for w in words)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def canonicalize(topic: str) -> str:
+    """The canonical name for a free-text topic."""
+    tokens = normalize(topic)
+    if not tokens:
+        return _clean(topic)
+    match = _trie.longest_match(tokens)
+    # Accept a partial match only when it covers at least half the words, so
+    # "graph coloring heuristics" doesn't collapse into "Graph Theory"
+    if match is not None and match[1] * 2 >= len(tokens):
+        return match[0]
+    return _fuzzy(tokens) or _clean(topic)
+
+
+def canonicalize_all(topics: Iterable[str]) -> List[str]:
+    """Canonicalize a topic list, dropping blanks and duplicates in order."""
+    result = []
+    for topic in topics:
+        if not isinstance(topic, str) or not topic.strip():
+            continue
+        canonical = canonicalize(topic)
+        if canonical and canonical not in result:
+            result.append(canonical)
+    return result
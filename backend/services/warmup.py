@@ -0,0 +1,84 @@
+"""
+Warmup Service — post-boot warmup and readiness state.
+
+The server starts answering /health as soon as the schema check is done.
+Warmup then runs in the background:
+    pool     — pre-open DB_POOL_PREWARM connections concurrently
+    imports  — load the lazily imported auth dependencies (jose, passlib)
+               off the event loop, so the first login doesn't pay for them
+    catalog  — map the book catalog, if BOOK_CATALOG_PATH is set
+/ready reports 503 until warmup has finished, then 200. The imports and
+catalog steps are best effort: a failure is reported but doesn't hold up
+readiness. A failed pool step means the database is unreachable, so it is
+retried every WARMUP_RETRY_SECONDS and /ready stays 503, with the error
+in its body, until it succeeds.
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional
+
+from config import get_settings
+
+settings = get_settings()
+
+_started = time.perf_counter()
+_ready = False
+_ready_after: Optional[float] = None
+_steps: Dict[str, float] = {}
+_errors: Dict[str, str] = {}
+
+
+def _preload_imports() -> None:
+    import jose.jwt  # noqa: F401
+    from services.password_service import get_context
+
+    get_context()
+
+
+async def _step(name: str, coro) -> None:
+    start = time.perf_counter()
+    try:
+        await coro
+    except Exception as exc:  # reported; only the pool step blocks readiness
+        _errors[name] = repr(exc)
+        print(f"✗ Warmup step '{name}' failed: {exc!r}")
+    else:
+        _errors.pop(name, None)
+    _steps[name] = round(time.perf_counter() - start, 4)
+
+
+async def run() -> None:
+    """
+    Run all warmup steps concurrently, retry the pool step until it
+    succeeds, then mark the process ready.
+    """
+    global _ready, _ready_after
+    from database.connection import prewarm_pool
+    from services import book_catalog
+
+    await asyncio.gather(
+        _step("pool", prewarm_pool(settings.DB_POOL_PREWARM)),
+        _step("imports", asyncio.to_thread(_preload_imports)),
+        _step("catalog", asyncio.to_thread(book_catalog.get_catalog)),
+    )
+    while "pool" in _errors:
+        await asyncio.sleep(settings.WARMUP_RETRY_SECONDS)
+        await _step("pool", prewarm_pool(settings.DB_POOL_PREWARM))
+    _ready = True
+    _ready_after = round(time.perf_counter() - _started, 4)
+    print(f"✓ Warmup complete in {_steps}")
+
+
+def is_ready() -> bool:
+    return _ready
+
+
+def status() -> dict:
+    """Readiness body for /ready."""
+    return {
+        "ready": _ready,
+        "ready_after_seconds": _ready_after,
+        "steps": dict(_steps),
+        "errors": dict(_errors),
+    }
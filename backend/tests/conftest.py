@@ -0,0 +1,116 @@
+"""
+Test configuration. The app reads its settings at import, so the
+environment is set here, before any test module imports it: a throwaway
+SQLite database, the mock AI provider, generous rate limits and the SQL
+profiler (for assert_max_queries).
+
+Tests marked `postgres` need a server and are skipped without one:
+    TEST_POSTGRES_URL=postgresql://postgres@localhost/postgres python -m pytest
+They create (and drop) scratch databases through the `cluster` fixture.
+"""
+
+import os
+import tempfile
+import uuid
+
+_tmp = tempfile.mkdtemp(prefix="verilearn-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_tmp}/test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("AI_PROVIDER", "mock")
+os.environ.setdefault("AI_STUDENT_BURST", "1000")
+os.environ.setdefault("AI_TEACHER_BURST", "1000")
+os.environ.setdefault("SQL_PROFILER_ENABLED", "true")
+
+import pytest  # noqa: E402
+
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL", "")
+
+
+def pytest_collection_modifyitems(config, items):
+    if POSTGRES_URL:
+        return
+    skip = pytest.mark.skip(reason="set TEST_POSTGRES_URL to run the Postgres tests")
+    for item in items:
+        if "postgres" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    from main import app
+
+    with TestClient(app) as c:
+        yield c
+
+
+_users = iter(range(1_000_000))
+
+
+@pytest.fixture
+def register(client):
+    """register(role) -> auth headers for a new user."""
+
+    def _register(role: str = "student", **headers) -> dict:
+        n = next(_users)
+        r = client.post(
+            "/auth/register",
+            json={"name": f"User {n}", "email": f"user{n}@test.example.com",
+                  "password": "pw123456", "role": role},
+            headers=headers,
+        )
+        assert r.status_code == 201, r.text
+        return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    return _register
+
+
+@pytest.fixture
+async def cluster(monkeypatch):
+    """
+    Two fresh Postgres databases as shards "default" and "shard_b", with
+    tenant "acme" on the default one. Yields (router, session factory).
+    """
+    import asyncpg
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    from database import connection, fast_reads, shards
+    from jobs import tenants
+
+    base = POSTGRES_URL.rpartition("/")[0]
+    names = [f"verilearn_test_{shard}_{uuid.uuid4().hex[:8]}" for shard in ("a", "b")]
+    admin = await asyncpg.connect(POSTGRES_URL)
+    for name in names:
+        await admin.execute(f'CREATE DATABASE "{name}"')
+    engines = {
+        shards.DEFAULT_SHARD: connection.create_engine_for("test_a", f"{base}/{names[0]}", 2, 2),
+        "shard_b": connection.create_engine_for("test_b", f"{base}/{names[1]}", 2, 2),
+    }
+    router = shards.ShardRouter(engines)
+    monkeypatch.setattr(connection, "shard_engines", engines)
+    monkeypatch.setattr(tenants, "router", router)
+    monkeypatch.setattr(fast_reads, "router", router)
+    monkeypatch.setattr(shards.settings, "TENANT_DIRECTORY_REFRESH", 0.05)
+
+    async with engines[shards.DEFAULT_SHARD].begin() as conn:
+        await conn.run_sync(connection.Base.metadata.create_all)
+        await conn.run_sync(shards.directory_metadata.create_all)
+    await tenants.add_tenant("acme", shards.DEFAULT_SHARD)
+    await router.refresh()
+    try:
+        yield router, async_sessionmaker(
+            engines[shards.DEFAULT_SHARD], class_=shards.TenantSession,
+            router=router, expire_on_commit=False,
+        )
+    finally:
+        for engine in engines.values():
+            await engine.dispose()
+        for name in names:
+            await admin.execute(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
+        await admin.close()
@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+import orjson
+
+from database.connection import async_session
+from jobs import batch_analyze
+from jobs.batch_analyze import finish_batch
+from models.user_model import User
+from services import invalidation
+
+EVAL = {"concept_clarity": 80, "application": 70, "logical_consistency": 75}
+
+
+def _ai(eval_scores, books=()):
+    return {
+        "subject": "Math",
+        "followup_questions": ["Why?"],
+        "weak_topics": ["Fractions"],
+        "eval": eval_scores,
+        "ai_dependency_score": 10.0,
+        "books": list(books),
+    }
+
+
+def test_bad_record_becomes_an_error_line():
+    items = [
+        (1, {"student": "a@x", "text": "one"}, _ai(EVAL)),
+        (2, {"student": "b@x", "text": "two"}, _ai({"application": 70})),  # KeyError
+        (3, {"student": "c@x", "text": "three"}, _ai(EVAL, books=[{"title": 1}])),  # invalid
+        (4, {"student": "d@x", "text": "four"}, {"error": "AI analysis failed"}),
+        (5, {"student": "e@x", "text": "five"}, _ai(EVAL)),
+    ]
+    block, rows, errors = finish_batch(items)
+    out = [orjson.loads(line) for line in block.splitlines()]
+
+    assert [o["line"] for o in out] == [1, 2, 3, 4, 5]
+    assert [o["line"] for o in out if "error" in o] == [2, 3, 4]
+    assert "KeyError" in out[1]["error"]
+    assert [r["line"] for r in rows] == [1, 5]
+    assert errors == 3
+    assert out[0]["scores"]["final_score"] == rows[0]["final_score"]
+
+
+def test_insert_keeps_input_order_and_publishes_a_rescored_event(client, tmp_path, monkeypatch):
+    async def analyze_ai(budget, record):
+        # Later records finish first
+        await asyncio.sleep(0.02 if record["text"].startswith("Essay 0") else 0)
+        return await real_analyze_ai(budget, record)
+
+    real_analyze_ai = batch_analyze.analyze_ai
+    events = []
+
+    async def after_commit(event):
+        events.append(event)
+
+    monkeypatch.setattr(batch_analyze, "analyze_ai", analyze_ai)
+    monkeypatch.setattr(invalidation, "after_commit", after_commit)
+    source, output = tmp_path / "archive.jsonl", tmp_path / "results.jsonl"
+    email = "ada.batch@test.example.com"
+    with open(source, "w") as f:
+        for i in range(7):
+            text = f"Essay {i}: recursion splits a problem into smaller copies of itself."
+            f.write(json.dumps({"student": email, "subject": "CS", "text": text}) + "\n")
+        f.write(json.dumps({"student": email, "text": "too short"}) + "\n")
+
+    async def scenario():
+        async with async_session() as db:
+            db.add(User(name="Ada", email=email, password_hash="x", role="student"))
+            await db.commit()
+        return await batch_analyze.run(
+            str(source), str(output), insert=True, workers=0,
+            concurrency=4, rps=0, batch_size=3, quiet=True,
+        )
+
+    stats = client.portal.call(scenario)
+    assert (stats["records"], stats["errors"], stats["inserted"]) == (8, 1, 7)
+    with open(output, "rb") as f:
+        assert [orjson.loads(line)["line"] for line in f] == list(range(1, 9))
+    assert events == [invalidation.rescored_event()]
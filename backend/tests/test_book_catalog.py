@@ -0,0 +1,55 @@
+import pytest
+
+from services.book_catalog import BookCatalog, build, tokenize
+
+BOOKS = [
+    {"title": "Dynamic Programming for Coding Interviews", "author": "Meenakshi",
+     "topics": ["Dynamic Programming", "Recursion"]},
+    {"title": "Grokking Algorithms", "author": "Aditya Bhargava",
+     "topics": ["Sorting Algorithms", "Graph Theory", "Recursion"]},
+    {"title": "Introduction to Graph Theory", "author": "Douglas West", "topics": ["Graph Theory"]},
+    {"title": "The Little Schemer", "author": "Friedman", "topics": ["Recursion"]},
+    {"title": "", "topics": ["Skipped: no title"]},
+]
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    path = str(tmp_path / "books.bin")
+    assert build(BOOKS, path) == 4
+    return BookCatalog(path)
+
+
+def test_tokenize_folds_plurals_and_drops_stopwords():
+    assert tokenize("The Art of Hash-Tables") == ["art", "hash", "table"]
+    assert tokenize("class") == ["class"]
+
+
+def test_round_trip(catalog):
+    assert len(catalog) == 4
+    assert catalog.book(0) == (
+        "Dynamic Programming for Coding Interviews", "Meenakshi", "Dynamic Programming; Recursion",
+    )
+    assert catalog.book(3) == ("The Little Schemer", "Friedman", "Recursion")
+
+
+def test_rank_orders_by_relevance(catalog):
+    ranked = catalog.rank("Graph Theory")
+    assert [doc for doc, _ in ranked] == [2, 1]  # on-topic title and topic first
+    assert ranked[0][1] >= ranked[1][1]
+    assert 90 <= ranked[0][1] <= 100
+    assert catalog.rank("quantum chemistry") == ()
+
+
+def test_recommend_one_per_topic_then_tops_up(catalog):
+    books = catalog.recommend(["Graph Theory", "Dynamic Programming"], per_topic=1, minimum=3)
+    assert [b["title"] for b in books[:2]] == [
+        "Introduction to Graph Theory", "Dynamic Programming for Coding Interviews",
+    ]
+    assert len(books) == 3  # topped up with the next best match
+    assert len({b["title"] for b in books}) == 3  # no book twice
+    assert books[2]["topic"] in ("Graph Theory", "Dynamic Programming")
+
+
+def test_recommend_without_matches_is_empty(catalog):
+    assert catalog.recommend(["quantum chemistry"]) == []
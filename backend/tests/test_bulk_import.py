@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+from services import bulk_import
+from services.bulk_import import ImportJob
+
+pytestmark = pytest.mark.anyio
+
+
+def _job(n):
+    job = ImportJob(teacher_id=1)
+    for i in range(n):
+        job.add(i + 1, {"student": f"s{i}@x", "subject": "Math", "text": f"Essay number {i} " * 3})
+    job._spool.seek(0)
+    return job
+
+
+async def _row(text, subject):
+    await asyncio.sleep(0.001)
+    return {"text": text, "subject": subject}
+
+
+async def test_unexpected_analysis_error_fails_only_that_record(monkeypatch):
+    async def analyze(text, subject):
+        if "number 1 " in text:
+            raise KeyError("concept_clarity")
+        return await _row(text, subject)
+
+    async def insert(self, batch, students):
+        for index, _, _ in batch:
+            self._settle(index, "imported", assignment_id=index)
+
+    monkeypatch.setattr(bulk_import, "analyze", analyze)
+    monkeypatch.setattr(ImportJob, "_insert", insert)
+    job = _job(4)
+    await job._run()
+
+    assert job.status == "completed"
+    assert job.counts == {"queued": 0, "imported": 3, "failed": 1}
+    assert "KeyError" in job.items[1].error
+
+
+async def test_abort_stops_reader_and_workers(monkeypatch):
+    calls = []
+
+    async def analyze(text, subject):
+        calls.append(text)
+        return await _row(text, subject)
+
+    async def insert(self, batch, students):
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(bulk_import, "analyze", analyze)
+    monkeypatch.setattr(ImportJob, "_insert", insert)
+    monkeypatch.setattr(bulk_import.settings, "BULK_IMPORT_BATCH_SIZE", 1)
+    job = _job(200)
+    await job._run()
+    started = len(calls)
+    await asyncio.sleep(0.05)
+
+    assert len(calls) == started < 200  # nothing keeps analysing the closed spool
+    assert job.status == "completed"
+    assert job.counts["queued"] == 0
+    assert all("database down" in i.error for i in job.items if i.status == "failed")
+
+
+# ---------- Parsers ----------
+
+
+async def _chunks(body: bytes, size: int):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+async def _parse(content_type: str, body: bytes, size: int = 1) -> list:
+    return [item async for item in bulk_import.records(content_type, _chunks(body, size))]
+
+
+@pytest.mark.parametrize("size", [1, 7, 4096])
+async def test_ndjson_records(size):
+    body = b'{"student": "a@x", "text": "caf\xc3\xa9"}\r\n\n{"student": "b@x"}\nnot json\n{"last": 1}'
+    assert await _parse("application/x-ndjson", body, size) == [
+        (1, {"student": "a@x", "text": "café"}),
+        (3, {"student": "b@x"}),
+        (4, "Invalid JSON."),
+        (5, {"last": 1}),
+    ]
+
+
+async def test_csv_records_with_quoted_newlines():
+    body = b'student,subject,text\na@x,Math,"line one\nline ""two"""\n\nb@x,Art,plain\nc@x,Art,"open\n'
+    assert await _parse("text/csv; charset=utf-8", body) == [
+        (2, {"student": "a@x", "subject": "Math", "text": 'line one\nline "two"'}),
+        (5, {"student": "b@x", "subject": "Art", "text": "plain"}),
+        (6, "Unterminated quoted field."),
+    ]
+
+
+async def test_multipart_reads_the_file_part():
+    body = (
+        b"--XyZ\r\nContent-Disposition: form-data; name=\"note\"\r\n\r\nignored\r\n"
+        b"--XyZ\r\nContent-Disposition: form-data; name=\"file\"; filename=\"Grades.CSV\"\r\n"
+        b"Content-Type: text/csv\r\n\r\nstudent,text\r\na@x,\"has --XyZ inside\"\r\n"
+        b"--XyZ--\r\n"
+    )
+    for size in (1, 5, len(body)):
+        assert await _parse('multipart/form-data; boundary="XyZ"', body, size) == [
+            (2, {"student": "a@x", "text": "has --XyZ inside"}),
+        ]
+
+
+@pytest.mark.parametrize("content_type, body, status, detail", [
+    ("text/plain", b"x", 415, "Upload NDJSON"),
+    ("multipart/form-data", b"x", 400, "without a boundary"),
+    ("multipart/form-data; boundary=b", b"--b\r\nContent-Disposition: form-data; name=\"a\"\r\n\r\n1\r\n--b--", 400, "No file part"),
+    ("multipart/form-data; boundary=b", b"--b\r\nContent-Disposition: form-data; filename=\"a.ndjson\"\r\n\r\n{}", 400, "ended inside"),
+    ("application/x-ndjson", b'{"a": 1}\n\xff\n', 400, "Line 2 is not UTF-8"),
+])
+async def test_unreadable_uploads(content_type, body, status, detail):
+    with pytest.raises(bulk_import.UploadError) as error:
+        await _parse(content_type, body, 3)
+    assert error.value.status_code == status
+    assert detail in error.value.detail
+
+
+async def test_overlong_lines_are_refused(monkeypatch):
+    monkeypatch.setattr(bulk_import.settings, "BULK_IMPORT_MAX_LINE_BYTES", 10)
+    with pytest.raises(bulk_import.UploadError) as error:
+        await _parse("application/x-ndjson", b'{"a": 1}\n{"text": "far too long"}\n', 4)
+    assert (error.value.status_code, error.value.detail) == (413, "Line 2 is too long.")
@@ -0,0 +1,41 @@
+from sqlalchemy import select, update
+
+from database.connection import async_session
+from jobs import canonicalize_topics
+from models.assignment_model import Assignment
+from services import invalidation
+
+
+def test_rewrites_topics_then_publishes_a_rescored_event(client, register, monkeypatch):
+    headers = register()
+    r = client.post("/student/submit-assignment", headers=headers, json={
+        "text": "An essay on dynamic programming with enough words to be analysed.",
+        "subject": "General",
+    })
+    assert r.status_code == 201, r.text
+    assignment_id = r.json()["assignment_id"]
+    events = []
+
+    async def after_commit(event):
+        events.append(event)
+
+    monkeypatch.setattr(invalidation, "after_commit", after_commit)
+
+    async def scenario():
+        async with async_session() as db:
+            await db.execute(
+                update(Assignment).where(Assignment.id == assignment_id)
+                .values(weak_topics=["DP", "dp", "memoization"])
+            )
+            await db.commit()
+        counts = await canonicalize_topics.canonicalize_tenant(assignment_id - 1, 10, False)
+        async with async_session() as db:
+            topics = (await db.execute(
+                select(Assignment.weak_topics).where(Assignment.id == assignment_id)
+            )).scalar_one()
+        return counts, topics
+
+    (scanned, changed), topics = client.portal.call(scenario)
+    assert changed == 1 and scanned >= 1
+    assert topics == ["Dynamic Programming"]
+    assert events == [invalidation.rescored_event()]
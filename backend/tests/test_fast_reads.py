@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from database import fast_reads, shards
+from models.assignment_model import Assignment
+from models.user_model import User
+
+ROW = {
+    "id": 7, "status": "completed",
+    "concept_clarity": 80.0, "application": 70.0, "logical_consistency": 60.0,
+    "depth": 50.0, "final_score": 70.0,
+    "radar_clarity": 75.0, "radar_application": 70.0, "radar_logic": 60.0,
+    "radar_critical_thinking": 65.0, "radar_retention": 72.0,
+    "weak_topics": ["Recursion"], "recommendations": None, "followup_questions": None,
+    "ai_dependency_score": 12.5,
+    "created_at": datetime(2026, 1, 5, 9, 30, tzinfo=timezone.utc),
+}
+
+
+def test_record_to_result_maps_every_column():
+    result = fast_reads.record_to_result(ROW)
+    assert result.assignment_id == 7
+    assert result.scores.final_score == 70.0 and result.radar_scores.retention == 72.0
+    assert (result.weak_topics, result.recommendations, result.followup_questions) == (
+        ["Recursion"], [], [],
+    )
+    assert result.created_at == "2026-01-05T09:30:00+00:00"
+    assert fast_reads.record_to_result(ROW | {"created_at": None}).created_at == ""
+
+
+@pytest.mark.anyio
+@pytest.mark.postgres
+async def test_reads_only_the_students_own_rows_in_order(cluster):
+    _, session_factory = cluster
+    start = datetime(2026, 1, 5, tzinfo=timezone.utc)
+    with shards.use("acme"):
+        async with session_factory() as db:
+            ada, eve = (User(name=n, email=f"{n}@acme.test", password_hash="x", role="student")
+                        for n in ("ada", "eve"))
+            db.add_all([ada, eve])
+            await db.flush()
+            rows = [
+                Assignment(student_id=ada.id, text="Later.", final_score=90, ai_dependency_score=5,
+                           weak_topics=["Graphs"], created_at=start + timedelta(days=7)),
+                Assignment(student_id=ada.id, text="Earlier.", final_score=60, ai_dependency_score=9,
+                           weak_topics=["Recursion"], created_at=start),
+                Assignment(student_id=eve.id, text="Eve's.", final_score=75, created_at=start),
+            ]
+            db.add_all(rows)
+            await db.commit()
+
+        dashboard = await fast_reads.fetch_dashboard_rows(ada.id)
+        assert [tuple(r) for r in dashboard] == [
+            (60, 9, ["Recursion"], start),  # JSON decoded, oldest first
+            (90, 5, ["Graphs"], start + timedelta(days=7)),
+        ]
+        result = await fast_reads.fetch_result(rows[0].id, ada.id)
+        assert (result.assignment_id, result.scores.final_score, result.weak_topics) == (
+            rows[0].id, 90, ["Graphs"],
+        )
+        assert await fast_reads.fetch_result(rows[2].id, ada.id) is None  # Eve's
@@ -0,0 +1,156 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from database.connection import async_session
+from jobs import regrade
+from models.assignment_model import Assignment, FollowupEvaluation
+from models.user_model import User
+from services import ai_service, followup_eval
+
+SCORES = {"concept_clarity": 70.0, "application": 60.0, "logical_consistency": 80.0, "depth": 50.0}
+
+
+def _fake_provider(monkeypatch):
+    """Count AI calls and the most that were in flight at once."""
+    stats = {"calls": 0, "running": 0, "peak": 0}
+
+    async def call(text, responses):
+        stats["calls"] += 1
+        stats["running"] += 1
+        stats["peak"] = max(stats["peak"], stats["running"])
+        await asyncio.sleep(0.01)
+        stats["running"] -= 1
+        return dict(SCORES)
+
+    async def dependency(text, responses):
+        await call(text, responses)
+        return 20.0
+
+    monkeypatch.setattr(ai_service, "evaluate_understanding", call)
+    monkeypatch.setattr(ai_service, "calculate_ai_dependency", dependency)
+    return stats
+
+
+async def _assignment(db, email: str) -> Assignment:
+    user = User(name="Ada", email=email, password_hash="x", role="student")
+    db.add(user)
+    await db.flush()
+    assignment = Assignment(
+        student_id=user.id, text="An essay.", final_score=50, subject="General",
+        followup_questions=[{"id": "q1", "question": "Why?"}, {"id": "q2", "question": "How?"}],
+    )
+    db.add(assignment)
+    await db.flush()
+    return assignment
+
+
+def test_answers_are_evaluated_a_few_at_a_time(client, monkeypatch):
+    stats = _fake_provider(monkeypatch)
+    monkeypatch.setattr(followup_eval.settings, "FOLLOWUP_EVAL_CONCURRENCY", 2)
+
+    async def scenario():
+        async with async_session() as db:
+            assignment = await _assignment(db, "ada.concurrency@test.example.com")
+            responses = {f"q{i}": f"answer {i}" for i in range(8)}
+            return await followup_eval.evaluate(db, assignment, responses)
+
+    scores, dependency = client.portal.call(scenario)
+    assert (scores, dependency) == (SCORES, 20.0)
+    assert stats["calls"] == 16
+    assert stats["peak"] <= 4  # two answers, two calls each
+
+
+def test_each_question_keeps_its_newest_answers(client, monkeypatch):
+    stats = _fake_provider(monkeypatch)
+    monkeypatch.setattr(followup_eval.settings, "FOLLOWUP_EVAL_VERSIONS", 3)
+
+    async def scenario():
+        async with async_session() as db:
+            assignment = await _assignment(db, "ada.versions@test.example.com")
+            await db.commit()
+        for version in range(6):
+            async with async_session() as db:
+                await followup_eval.evaluate(
+                    db, assignment, {"q1": f"version {version}", "q2": "unchanged"}
+                )
+                await db.commit()
+        async with async_session() as db:
+            calls = stats["calls"]
+            await followup_eval.evaluate(db, assignment, {"q1": "version 5", "q2": "unchanged"})
+            cached_hit = stats["calls"] == calls
+            result = await db.execute(
+                select(FollowupEvaluation.question_id, FollowupEvaluation.answer_hash)
+                .where(FollowupEvaluation.assignment_id == assignment.id)
+            )
+            return cached_hit, result.all()
+
+    cached_hit, rows = client.portal.call(scenario)
+    assert cached_hit
+    q1 = [h for qid, h in rows if qid == "q1"]
+    assert len(q1) == 3
+    assert followup_eval.answer_hash("version 5") in q1
+    assert [h for qid, h in rows if qid == "q2"] == [followup_eval.answer_hash("unchanged")]
+
+
+def test_regrade_reevaluates_per_answer_when_the_prompts_change(client, monkeypatch):
+    stats = _fake_provider(monkeypatch)
+
+    async def scenario():
+        async with async_session() as db:
+            assignment = await _assignment(db, "ada.regrade@test.example.com")
+            assignment.student_responses = {"q1": "one", "q2": "two", "bogus": "ignored"}
+            await db.commit()
+        counts = []
+        for version in ("1", "1", "2"):
+            monkeypatch.setattr(followup_eval.settings, "AI_PROMPT_VERSION", version)
+            params = await regrade.regrade_row(regrade.RequestBudget(0), assignment)
+            counts.append(stats["calls"])
+        return params, counts
+
+    params, counts = client.portal.call(scenario)
+    assert counts == [4, 4, 8]  # two answers, cached until the prompt version changes
+    assert params["ai_dependency_score"] == 20.0
+
+
+def test_answers_to_unknown_questions_are_rejected(client, register):
+    headers = register()
+    r = client.post("/student/submit-assignment", json={
+        "text": "Photosynthesis converts light energy into chemical energy stored in glucose.",
+        "subject": "Biology",
+    }, headers=headers)
+    assert r.status_code == 201, r.text
+    assignment_id = r.json()["assignment_id"]
+    ids = [q["id"] for q in r.json()["followup_questions"]]
+
+    r = client.post("/student/submit-followup", json={
+        "assignment_id": assignment_id, "responses": {"x" * 100: "answer"},
+    }, headers=headers)
+    assert r.status_code == 422
+    r = client.post("/student/submit-followup", json={
+        "assignment_id": assignment_id, "responses": {ids[0]: "answer"},
+    }, headers=headers)
+    assert r.status_code == 200, r.text
+
+
+@pytest.mark.anyio
+@pytest.mark.postgres
+async def test_pruning_on_postgres(cluster, monkeypatch):
+    _, session_factory = cluster
+    _fake_provider(monkeypatch)
+    monkeypatch.setattr(followup_eval.settings, "FOLLOWUP_EVAL_VERSIONS", 2)
+    async with session_factory() as db:
+        assignment = await _assignment(db, "ada@followup.test")
+        await db.commit()
+    for version in range(4):
+        async with session_factory() as db:
+            await followup_eval.evaluate(db, assignment, {"q1": f"version {version}"})
+            await db.commit()
+    async with session_factory() as db:
+        result = await db.execute(
+            select(FollowupEvaluation.answer_hash).order_by(FollowupEvaluation.created_at.desc())
+        )
+        assert result.scalars().all() == [
+            followup_eval.answer_hash("version 3"), followup_eval.answer_hash("version 2"),
+        ]
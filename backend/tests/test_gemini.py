@@ -0,0 +1,70 @@
+import json
+
+import httpx
+import pytest
+
+from services.ai_providers.base import AIProviderError, AIRateLimited
+from services.ai_providers.gemini import API_BASE, SCORE_KEYS, GeminiProvider
+
+pytestmark = pytest.mark.anyio
+
+
+def _provider(answer=None, status=200, body=None) -> GeminiProvider:
+    """A provider whose API answers every call with `answer` (JSON-encoded)."""
+
+    def handler(request):
+        assert request.headers["x-goog-api-key"] == "key"
+        assert "key" not in request.url.params
+        if body is not None:
+            return httpx.Response(status, json=body)
+        text = json.dumps(answer)
+        return httpx.Response(status, json={"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+    provider = GeminiProvider("key", "gemini-test", 5)
+    provider._client = httpx.AsyncClient(base_url=API_BASE, transport=httpx.MockTransport(handler))
+    return provider
+
+
+async def test_answers_are_normalized():
+    assert await _provider({"risk": 140}).calculate_ai_dependency("essay", {}) == 100.0
+    scores = {key: 55.55 for key in SCORE_KEYS} | {"depth": -3}
+    assert await _provider(scores).evaluate_understanding("essay", {}) == (
+        {key: 55.5 for key in SCORE_KEYS} | {"depth": 0.0}
+    )
+    questions = await _provider(["Why?", "How?", "When?", "Extra"]).generate_followup_questions("essay")
+    assert [q["id"] for q in questions] == ["q1", "q2", "q3"]
+    books = await _provider([{"title": "SICP", "match_percentage": 87}, "junk"]).recommend_books(["Recursion"])
+    assert books == [{"title": "SICP", "author": "", "topic": "", "match_percentage": 87}]
+
+
+@pytest.mark.parametrize("call, answer", [
+    (lambda p: p.generate_followup_questions("essay"), {"questions": ["Why?"]}),
+    (lambda p: p.evaluate_understanding("essay", {}), [90, 80]),
+    (lambda p: p.extract_weak_topics("essay"), "Recursion"),
+    (lambda p: p.recommend_books(["Recursion"]), {"title": "SICP"}),
+    (lambda p: p.calculate_ai_dependency("essay", {}), 42),
+])
+async def test_wrong_json_shapes_are_provider_errors(call, answer):
+    with pytest.raises(AIProviderError, match="expected a"):
+        await call(_provider(answer))
+
+
+async def test_malformed_responses_are_provider_errors():
+    with pytest.raises(AIProviderError, match="unparseable"):
+        await _provider(body=["not", "an", "envelope"]).extract_weak_topics("essay")
+    with pytest.raises(AIProviderError, match="HTTP 500"):
+        await _provider(body={}, status=500).extract_weak_topics("essay")
+    with pytest.raises(AIRateLimited):
+        await _provider(body={}, status=429).extract_weak_topics("essay")
+
+
+@pytest.mark.parametrize("call, answer", [
+    (lambda p: p.evaluate_understanding("essay", {}), {key: 70 for key in SCORE_KEYS[1:]}),
+    (lambda p: p.evaluate_understanding("essay", {}), {key: 70 for key in SCORE_KEYS} | {"depth": "high"}),
+    (lambda p: p.evaluate_understanding("essay", {}), {key: 70 for key in SCORE_KEYS} | {"depth": None}),
+    (lambda p: p.calculate_ai_dependency("essay", {}), {}),
+    (lambda p: p.calculate_ai_dependency("essay", {}), {"risk": True}),
+])
+async def test_missing_or_non_numeric_scores_are_provider_errors(call, answer):
+    with pytest.raises(AIProviderError, match="no numeric"):
+        await call(_provider(answer))
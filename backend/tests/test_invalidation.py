@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+import asyncpg
+import pytest
+from sqlalchemy import select
+
+from database import shards
+from models.user_model import User, UserResponse
+from routes import deps
+from services import invalidation
+
+
+def _cached(tenant: str, user_id: int) -> None:
+    deps._principal_cache.set((tenant, user_id), UserResponse(
+        id=user_id, name="Ada", email="ada@test.example.com", role="student",
+    ))
+
+
+@pytest.mark.anyio
+async def test_user_events_evict_the_principal_in_their_tenant():
+    _cached("acme", 7)
+    _cached("other", 7)
+    await invalidation._on_notify(None, 0, invalidation.CHANNEL, json.dumps({"tenant": "acme", "user_id": 7}))
+    assert deps._principal_cache.get(("acme", 7)) is None
+    assert deps._principal_cache.get(("other", 7)) is not None
+
+    deps.invalidate_principal(None)  # what a listener reconnect does
+    assert deps._principal_cache.get(("other", 7)) is None
+
+
+@pytest.mark.anyio
+@pytest.mark.postgres
+async def test_user_changes_notify_other_workers_on_commit(cluster, monkeypatch):
+    router, session_factory = cluster
+    monkeypatch.setattr(invalidation, "listening", lambda: True)
+    engine = router.engines[shards.DEFAULT_SHARD]
+    received: asyncio.Queue = asyncio.Queue()
+    listener = await asyncpg.connect(
+        engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+    )
+    await listener.add_listener(invalidation.CHANNEL, lambda *args: received.put_nowait(args[3]))
+    try:
+        with shards.use("acme"):
+            async with session_factory() as db:
+                db.add(User(name="Ada", email="ada@acme.test", password_hash="x", role="teacher"))
+                await db.commit()
+            async with session_factory() as db:
+                user = (await db.execute(select(User))).scalar_one()
+                user.role = "student"
+                await db.flush()
+                await asyncio.sleep(0.2)
+                assert received.empty()  # nothing is sent before the commit
+                await db.commit()
+        payload = await asyncio.wait_for(received.get(), 5)
+    finally:
+        await listener.close()
+    assert json.loads(payload) == {"tenant": "acme", "user_id": user.id}
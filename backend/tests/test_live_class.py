@@ -0,0 +1,94 @@
+import orjson
+import pytest
+from sqlalchemy import func, select
+from starlette.websockets import WebSocketDisconnect
+
+from database.connection import async_session
+from models.assignment_model import Assignment
+from services import live_class
+from services.live_class import ClassAggregate, _unseen
+
+
+def _event(aid, student_id, score, previous=None, subject="Math", **extra):
+    return {"assignment_id": aid, "student_id": student_id, "subject": subject,
+            "score": score, "previous": previous, **extra}
+
+
+def test_new_assignments_update_the_running_sums():
+    agg = ClassAggregate()
+    agg.apply(_event(1, 10, 50, weak_topics=["Loops"]))
+    agg.apply(_event(2, 11, 90, subject="Art", ai_dependency=70))
+    delta = agg.apply(_event(3, 10, 85, weak_topics=["Loops"]))
+
+    assert delta["distribution"] == {"high": 1, "low": -1}
+    assert delta["topic_counts"] == {"Loops": 2}
+    snapshot = agg.snapshot()
+    assert snapshot["total_assignments"] == 3
+    assert snapshot["class_average"] == 75.0
+    assert snapshot["performance_distribution"] == {"high": 2, "medium": 0, "low": 0}
+    assert snapshot["topic_averages"] == [{"topic": "Math", "avg": 67.5}, {"topic": "Art", "avg": 90.0}]
+    assert snapshot["ai_risk_students"] == 1
+
+
+def test_a_regrade_replaces_its_score():
+    agg = ClassAggregate()
+    agg.apply(_event(1, 10, 50))
+    agg.apply(_event(2, 10, 70))
+    delta = agg.apply(_event(2, 10, 40, previous=70))
+
+    assert delta["distribution"] == {"low": 1, "medium": -1}
+    assert delta["subject_average"] == {"topic": "Math", "avg": 45.0}
+    snapshot = agg.snapshot()
+    assert snapshot["total_assignments"] == 2
+    assert snapshot["class_average"] == 45.0
+    # An older assignment's regrade doesn't move the distribution
+    assert "distribution" not in agg.apply(_event(1, 10, 95, previous=50))
+    assert agg.snapshot()["class_average"] == 67.5
+    assert agg.apply(_event(1, 10, 95, previous=95)) is None
+
+
+def test_events_during_a_load_apply_unless_it_saw_them():
+    pending = [
+        _event(1, 10, 50),               # loaded
+        _event(2, 10, 60),               # committed after the snapshot
+        _event(1, 10, 80, previous=50),  # loaded with the old score
+        _event(3, 11, 70),
+        _event(3, 11, 75, previous=70),  # loaded with the new score
+    ]
+    loaded = {1: 50.0, 3: 75.0}
+    assert _unseen(pending, loaded) == [pending[1], pending[2]]
+
+
+def _teacher_token(register) -> str:
+    return register("teacher")["Authorization"].split()[1]
+
+
+def test_a_full_worker_accepts_then_closes_with_try_again_later(client, register, monkeypatch):
+    token = _teacher_token(register)
+    monkeypatch.setattr(live_class.settings, "LIVE_MAX_CONNECTIONS", 0)
+    with client.websocket_connect(f"/teacher/live/ws?token={token}") as ws:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_text()
+    assert closed.value.code == 1013
+
+
+def test_subscribers_get_loaded_state_then_deltas(client, register):
+    student = register()
+    client.post("/student/submit-assignment", headers=student, json={
+        "text": "An essay on loops with enough words to be analysed properly.", "subject": "Live",
+    })
+
+    async def assignments():
+        async with async_session() as db:
+            return (await db.execute(select(func.count(Assignment.id)))).scalar()
+
+    with client.websocket_connect(f"/teacher/live/ws?token={_teacher_token(register)}") as ws:
+        snapshot = orjson.loads(ws.receive_text())["data"]
+        assert snapshot["total_assignments"] == client.portal.call(assignments)
+        r = client.post("/student/submit-assignment", headers=student, json={
+            "text": "A second essay on loops, long enough to be analysed properly.", "subject": "Live",
+        })
+        delta = orjson.loads(ws.receive_text())["data"]
+
+    assert delta["assignment_id"] == r.json()["assignment_id"]
+    assert delta["subject_average"]["topic"] == "Live"
@@ -0,0 +1,76 @@
+import pytest
+
+from services import metrics
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    """Families and collectors made by a test stay out of the app's /metrics."""
+    monkeypatch.setattr(metrics, "_registry", [])
+    monkeypatch.setattr(metrics, "_collectors", [])
+
+
+def test_histogram_buckets_are_cumulative_and_upper_inclusive():
+    family = metrics.HistogramFamily("t_seconds", "Test latency.", ("route",), buckets=(0.1, 1.0))
+    series = family.labels("/a")
+    for value in (0.05, 0.1, 0.5, 3.0):
+        series.observe(value)
+    assert family.labels("/a") is series
+    assert family.render() == [
+        "# HELP t_seconds Test latency.",
+        "# TYPE t_seconds histogram",
+        't_seconds_bucket{route="/a",le="0.1"} 2',
+        't_seconds_bucket{route="/a",le="1.0"} 3',
+        't_seconds_bucket{route="/a",le="+Inf"} 4',
+        't_seconds_sum{route="/a"} 3.65',
+        't_seconds_count{route="/a"} 4',
+    ]
+
+
+def test_counters_and_gauges_render_per_label_set():
+    counter = metrics.CounterFamily("t_total", "Test count.", ("status",))
+    counter.inc(("200",))
+    counter.inc(("200",), 2)
+    counter.inc(("500",))
+    gauge = metrics.GaugeFamily("t_depth", "Test depth.")
+    gauge.set((), 5)
+    gauge.set((), 3)
+    assert counter.render()[2:] == ['t_total{status="200"} 3', 't_total{status="500"} 1']
+    assert gauge.render() == ["# HELP t_depth Test depth.", "# TYPE t_depth gauge", "t_depth 3"]
+
+
+def test_render_runs_collectors_first():
+    gauge = metrics.GaugeFamily("t_queue", "Test queue.")
+    metrics.register_collector(lambda: gauge.set((), 42))
+    assert metrics.render().endswith("t_queue 42\n")
+
+
+def test_record_query_counts_only_inside_a_request():
+    metrics.record_query(0.5)  # outside a request: ignored
+    token = metrics.request_queries.set([0, 0.0])
+    try:
+        metrics.record_query(0.25)
+        metrics.record_query(0.5)
+        assert metrics.request_queries.get() == [2, 0.75]
+    finally:
+        metrics.request_queries.reset(token)
+
+
+@pytest.mark.anyio
+async def test_instrument_ai_call_records_latency_and_errors(monkeypatch):
+    latency = metrics.HistogramFamily("t_ai_seconds", "Test AI latency.", ("function",))
+    errors = metrics.CounterFamily("t_ai_errors_total", "Test AI errors.", ("function",))
+    monkeypatch.setattr(metrics, "AI_CALL_SECONDS", latency)
+    monkeypatch.setattr(metrics, "AI_CALL_ERRORS", errors)
+
+    @metrics.instrument_ai_call
+    async def t_flaky(fail: bool) -> str:
+        if fail:
+            raise ValueError("provider down")
+        return "ok"
+
+    assert await t_flaky(False) == "ok"
+    with pytest.raises(ValueError):
+        await t_flaky(True)
+    assert latency.labels("t_flaky").count == 2
+    assert errors.render()[2:] == ['t_ai_errors_total{function="t_flaky"} 1']
@@ -0,0 +1,35 @@
+import asyncio
+import threading
+
+import pytest
+
+from services import password_service
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_cancelled_caller_keeps_its_slot_until_the_work_finishes():
+    release = threading.Event()
+    before = password_service.queue_depth()
+    try:
+        task = asyncio.create_task(password_service._run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        assert password_service.queue_depth() == before + 1
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert password_service.queue_depth() == before + 1  # the thread is still busy
+    finally:
+        release.set()
+    for _ in range(100):
+        if password_service.queue_depth() == before:
+            break
+        await asyncio.sleep(0.01)
+    assert password_service.queue_depth() == before
+
+
+async def test_saturated_pool_fails_fast(monkeypatch):
+    monkeypatch.setattr(password_service, "_max_in_flight", password_service.queue_depth())
+    with pytest.raises(password_service.PasswordPoolSaturated):
+        await password_service._run(lambda: None)
@@ -0,0 +1,93 @@
+import contextlib
+
+import pytest
+
+from database.connection import async_session
+from models.assignment_model import Assignment
+from models.user_model import User
+from services import peer_index
+from services.peer_index import PeerIndex
+
+
+def _index(vectors: dict) -> PeerIndex:
+    index = PeerIndex(capacity=2)  # grows as rows are added
+    for student_id, vector in vectors.items():
+        index.upsert(student_id, 1, vector)
+    return index
+
+
+def test_similar_peers_are_nearest_first_and_exclude_the_student():
+    index = _index({
+        1: [50, 50, 50, 50, 50],
+        2: [52, 50, 50, 50, 50],
+        3: [60, 60, 60, 60, 60],
+        4: [51, 50, 50, 50, 50],
+    })
+    assert [sid for sid, _ in index.query(1, 2)] == [4, 2]
+    assert index.query(1, 1) == [(4, 1.0)]
+    assert [sid for sid, _ in index.query(3, 10)] == [2, 4, 1]  # k > n: everyone else
+
+
+def test_complementary_peers_have_the_opposite_shape():
+    index = _index({
+        1: [90, 90, 40, 40, 65],
+        2: [40, 40, 90, 90, 65],  # strong where 1 is weak
+        3: [85, 85, 45, 45, 65],  # same shape as 1
+        4: [60, 60, 60, 60, 60],  # flat: no shape at all
+    })
+    ranked = index.query(1, 3, "complementary")
+    assert [sid for sid, _ in ranked] == [2, 4, 3]
+    assert ranked[0][1] == pytest.approx(-1.0)
+
+
+def test_upsert_keeps_the_newest_assignment():
+    index = PeerIndex()
+    assert index.upsert(1, 5, [70] * 5)
+    assert not index.upsert(1, 4, [10] * 5)  # an older assignment arriving late
+    assert index.upsert(1, 6, [80] * 5)
+    assert len(index) == 1 and index.vector(1).tolist() == [80] * 5
+    assert index.query(1, 3) == []  # no one else
+    assert index.query(99, 3) == []  # unknown student
+
+
+def test_events_during_load_are_folded_in(client, monkeypatch):
+    monkeypatch.setattr(peer_index, "_states", {})
+
+    async def scenario():
+        async with async_session() as db:
+            users = [User(name="Ada", email=f"ada.peers{i}@test.example.com",
+                          password_hash="x", role="student") for i in range(3)]
+            db.add_all(users)
+            await db.flush()
+            rows = [
+                Assignment(student_id=u.id, text="An essay.", radar_clarity=50, radar_application=50,
+                           radar_logic=50, radar_critical_thinking=50, radar_retention=50)
+                for u in users[:2]
+            ]
+            db.add_all(rows)
+            await db.commit()
+        first, second, newcomer = (u.id for u in users)
+        events = [
+            # a newer score for the first student, committed after the load's read
+            {"student_id": first, "assignment_id": rows[0].id + 1000, "radar": [90] * 5},
+            # a stale event for the second must not overwrite the loaded row
+            {"student_id": second, "assignment_id": rows[1].id - 1, "radar": [10] * 5},
+            {"student_id": newcomer, "assignment_id": rows[1].id + 1000, "radar": [70] * 5},
+        ]
+
+        @contextlib.asynccontextmanager
+        async def session_with_events():
+            async with async_session() as db:
+                for event in events:
+                    peer_index.apply_event(event)  # arrives while the lock is held
+                yield db
+
+        monkeypatch.setattr(peer_index, "async_session", session_with_events)
+        await peer_index.find_peers(first, 5, "similar")
+        return first, second, newcomer
+
+    first, second, newcomer = client.portal.call(scenario)
+    assert peer_index.radar_of(first)["clarity"] == 90.0
+    assert peer_index.radar_of(second)["clarity"] == 50.0
+    assert peer_index.radar_of(newcomer)["clarity"] == 70.0
+    assert peer_index._state().pending == []
@@ -0,0 +1,115 @@
+"""
+Integration tests for the Postgres tenant paths (database/shards.py,
+database/fast_reads.py, jobs/tenants.py); see the `cluster` fixture.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from database import fast_reads, shards
+from jobs import tenants
+from models.assignment_model import Assignment
+from models.user_model import User
+
+pytestmark = [pytest.mark.anyio, pytest.mark.postgres]
+
+
+async def _add_student(session_factory, email: str) -> int:
+    async with session_factory() as db:
+        user = User(name="Ada", email=email, password_hash="x", role="student")
+        db.add(user)
+        await db.flush()
+        db.add(Assignment(student_id=user.id, text="An essay.", subject="Math", final_score=80))
+        await db.commit()
+        return user.id
+
+
+async def _search_path(engine) -> str:
+    async with engine.connect() as conn:
+        return (await conn.execute(text("SHOW search_path"))).scalar()
+
+
+async def test_sessions_run_in_the_tenant_schema(cluster):
+    router, session_factory = cluster
+    with shards.use("acme"):
+        await _add_student(session_factory, "ada@acme.test")
+    async with session_factory() as db:  # the default tenant: public schema
+        assert (await db.execute(select(func.count(User.id)))).scalar() == 0
+    with shards.use("acme"):
+        async with session_factory() as db:
+            assert (await db.execute(select(User.email))).scalars().all() == ["ada@acme.test"]
+    # SET LOCAL ended with the transaction; the pooled connection is clean
+    assert await _search_path(router.engines[shards.DEFAULT_SHARD]) == '"$user", public'
+
+
+async def test_read_only_tenant_refuses_writes(cluster):
+    router, session_factory = cluster
+    await tenants._set_directory("acme", read_only=True)
+    await router.refresh()
+    with shards.use("acme"):
+        async with session_factory() as db:
+            db.add(User(name="Bob", email="bob@acme.test", password_hash="x", role="student"))
+            with pytest.raises(shards.TenantReadOnly):
+                await db.flush()
+        async with session_factory() as db:
+            with pytest.raises(DBAPIError, match="read-only transaction"):
+                await db.execute(text(
+                    "INSERT INTO users (name, email, password_hash, role) "
+                    "VALUES ('Eve', 'eve@acme.test', 'x', 'student')"
+                ))
+
+
+async def test_fast_reads_never_leak_the_tenant_schema(cluster):
+    router, session_factory = cluster
+    engine = router.engines[shards.DEFAULT_SHARD]
+    with shards.use("acme"):
+        student_id = await _add_student(session_factory, "ada@acme.test")
+        rows = await fast_reads.fetch_dashboard_rows(student_id)
+        assert [r["final_score"] for r in rows] == [80]
+        with pytest.raises(RuntimeError):
+            async with fast_reads.raw_connection() as raw:
+                assert await raw.fetchval("SHOW search_path") == "tenant_acme"
+                raise RuntimeError("reader failed")
+    assert engine.pool.checkedin() >= 1
+    assert await _search_path(engine) == '"$user", public'
+
+
+async def test_move_tenant_between_shards(cluster):
+    router, session_factory = cluster
+    with shards.use("acme"):
+        for n in range(3):
+            await _add_student(session_factory, f"s{n}@acme.test")
+
+    await tenants.move_tenant("acme", "shard_b", chunk_size=2, delta_margin=60, drop_source=False)
+
+    assert await tenants._directory_entry("acme") == ("shard_b", False)
+    await router.refresh()
+    b = async_sessionmaker(
+        router.engines["shard_b"], class_=shards.TenantSession, router=router, expire_on_commit=False
+    )
+    with shards.use("acme"):
+        async with b() as db:
+            assert db.info["route"].shard == "shard_b"
+            assert (await db.execute(select(func.count(Assignment.id)))).scalar() == 3
+        # Sequences moved past the copied ids
+        new_id = await _add_student(b, "new@acme.test")
+    assert new_id == 4
+
+
+async def test_cancelled_fast_read_does_not_return_a_tenant_connection(cluster):
+    router, _ = cluster
+    engine = router.engines[shards.DEFAULT_SHARD]
+
+    async def slow_read():
+        async with fast_reads.raw_connection() as raw:
+            await raw.fetchval("SELECT pg_sleep(5)")
+
+    with shards.use("acme"):
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(slow_read(), 0.2)
+    for _ in range(engine.pool.size()):
+        assert await _search_path(engine) == '"$user", public'
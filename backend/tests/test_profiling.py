@@ -0,0 +1,47 @@
+import orjson
+import pytest
+
+from middleware import profiling
+from middleware.profiling import ProfilingMiddleware
+
+
+@pytest.fixture
+def token(monkeypatch):
+    monkeypatch.setattr(profiling.settings, "PROFILING_TOKEN", "s3cret")
+    monkeypatch.setattr(profiling.settings, "PROFILING_SAMPLE_RATE", 0.0)
+    return b"s3cret"
+
+
+async def _app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def _call(headers):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/x", "headers": headers}
+    await ProfilingMiddleware(_app)(scope, receive, send)
+    return sent
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("value", [b"\xff\xfe", "sécret".encode(), b"", b"s3cre"])
+async def test_untrusted_token_passes_through(token, value):
+    sent = await _call([(b"x-profile", value), (b"x-profile-format", b"\xff")])
+    assert sent[0]["status"] == 200
+    assert sent[1]["body"] == b"ok"
+
+
+@pytest.mark.anyio
+async def test_token_returns_inline_profile(token):
+    sent = await _call([(b"x-profile", token), (b"x-profile-inline", b"1")])
+    assert sent[0]["status"] == 200
+    assert (b"x-profile-status", b"200") in sent[0]["headers"]
+    assert "profiles" in orjson.loads(sent[1]["body"])
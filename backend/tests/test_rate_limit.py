@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from models.user_model import Principal
+from routes import deps
+from services import rate_limit
+from services.rate_limit import (
+    AdmissionRejected,
+    ConcurrencyLimiter,
+    InMemoryRateLimitBackend,
+    RateLimited,
+    RedisRateLimitBackend,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+async def _hold(limiter: ConcurrencyLimiter, release: asyncio.Event) -> None:
+    async with limiter.slot():
+        await release.wait()
+
+
+async def test_limiter_rejects_when_the_queue_is_full():
+    limiter = ConcurrencyLimiter(limit=1, max_waiting=1, wait_timeout=5)
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(limiter, release))
+    waiter = asyncio.create_task(_hold(limiter, release))
+    await asyncio.sleep(0.01)
+    assert (limiter.in_flight, limiter.waiting) == (1, 1)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        async with limiter.slot():
+            pass
+    assert rejected.value.retry_after == 5
+    assert limiter.rejected_queue_full == 1
+
+    release.set()
+    await asyncio.gather(holder, waiter)
+    assert (limiter.in_flight, limiter.waiting) == (0, 0)
+
+
+async def test_limiter_rejects_waiters_that_time_out():
+    limiter = ConcurrencyLimiter(limit=1, max_waiting=4, wait_timeout=0.05)
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(limiter, release))
+    await asyncio.sleep(0)
+    with pytest.raises(AdmissionRejected) as rejected:
+        async with limiter.slot():
+            pass
+    assert rejected.value.retry_after == 1
+    assert (limiter.rejected_timeout, limiter.waiting) == (1, 0)
+    release.set()
+    await holder
+
+
+async def test_bucket_refills_at_its_rate(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: clock[0])
+    bucket = InMemoryRateLimitBackend()
+    assert [await bucket.take("k", 1.0, 2) for _ in range(2)] == [0.0, 0.0]
+    assert await bucket.take("k", 1.0, 2) == pytest.approx(1.0)
+    clock[0] += 0.5
+    assert await bucket.take("k", 1.0, 2) == pytest.approx(0.5)
+    clock[0] += 0.5
+    assert await bucket.take("k", 1.0, 2) == 0.0
+    clock[0] += 60  # refills to capacity, no further
+    assert [await bucket.take("k", 1.0, 2) for _ in range(3)] == [0.0, 0.0, pytest.approx(1.0)]
+
+
+async def test_redis_bucket_is_shared_and_refills():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # fakeredis runs Lua through lupa
+    server = fakeredis.FakeServer()
+    workers = [
+        RedisRateLimitBackend(client=fakeredis.FakeAsyncRedis(server=server)) for _ in range(2)
+    ]
+    try:
+        results = await asyncio.gather(*(w.take("k", 20.0, 3) for w in workers * 2))
+        assert sorted(r == 0 for r in results) == [False, True, True, True]
+        assert 0 < max(results) <= 1 / 20
+        await asyncio.sleep(0.1)  # two tokens at 20/s
+        assert await workers[0].take("k", 20.0, 3) == 0
+        assert 0 < await workers[0]._client.pttl("verilearn:ratelimit:k") <= 3 / 20 * 1000 + 1000
+    finally:
+        for w in workers:
+            await w.close()
+
+
+async def _admit():
+    dependency = deps.limit_ai_analysis(Principal(id=1, role="student"))
+    await dependency.__anext__()
+    await dependency.aclose()
+
+
+async def test_empty_bucket_maps_to_429_with_retry_after(monkeypatch):
+    async def check_user_rate(user_id, role):
+        raise RateLimited(7)
+
+    monkeypatch.setattr(deps, "check_user_rate", check_user_rate)
+    with pytest.raises(HTTPException) as exc:
+        await _admit()
+    assert exc.value.status_code == 429
+    assert exc.value.headers == {"Retry-After": "7"}
+
+
+async def test_saturated_limiter_maps_to_503_with_retry_after(monkeypatch):
+    async def check_user_rate(user_id, role):
+        return None
+
+    limiter = ConcurrencyLimiter(limit=1, max_waiting=0, wait_timeout=3)
+    monkeypatch.setattr(deps, "check_user_rate", check_user_rate)
+    monkeypatch.setattr(deps, "analysis_limiter", limiter)
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(limiter, release))
+    await asyncio.sleep(0)
+    try:
+        with pytest.raises(HTTPException) as exc:
+            await _admit()
+    finally:
+        release.set()
+        await holder
+    assert exc.value.status_code == 503
+    assert exc.value.headers == {"Retry-After": "3"}
+    await _admit()  # a free slot admits
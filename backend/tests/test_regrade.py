@@ -0,0 +1,59 @@
+import json
+
+from jobs import regrade
+from jobs.regrade import Progress
+from services import invalidation
+
+ESSAY = "Photosynthesis converts light energy into chemical energy stored in glucose."
+
+
+def test_progress_low_water_follows_contiguous_finished_ids(tmp_path):
+    progress = Progress(str(tmp_path / "cp.json"))
+    for row_id in (1, 2, 3, 5, 8):
+        progress.dispatch(row_id)
+    progress.finish([2, 3])
+    assert (progress.low_water, progress.done_above) == (0, {2, 3})
+    progress.finish([1, 8])
+    assert (progress.low_water, progress.done_above) == (3, {8})
+    progress.finish([5])
+    assert (progress.low_water, progress.done_above) == (8, set())
+
+
+def test_progress_resumes_from_checkpoint(tmp_path):
+    path = str(tmp_path / "cp.json")
+    progress = Progress(path)
+    progress.dispatch(1)
+    progress.dispatch(4)
+    progress.failed.add(9)
+    progress.finish([4])
+    progress.save()
+    resumed = Progress(path)
+    assert (resumed.low_water, resumed.done_above, resumed.failed) == (0, {4}, {9})
+    assert resumed.skip(4) and not resumed.skip(1)
+
+
+def test_unexpected_error_records_row_as_failed(client, register, tmp_path, monkeypatch):
+    headers = register()
+    r = client.post("/student/submit-assignment", json={"text": ESSAY, "subject": "Biology"},
+                    headers=headers)
+    assert r.status_code == 201, r.text
+    bad_id = r.json()["assignment_id"]
+
+    async def regrade_row(budget, row):
+        if row.id == bad_id:
+            raise KeyError("concept_clarity")
+        raise regrade.AIProviderError("down")
+
+    events = []
+
+    async def after_commit(event):
+        events.append(event)
+
+    monkeypatch.setattr(regrade, "regrade_row", regrade_row)
+    monkeypatch.setattr(invalidation, "after_commit", after_commit)
+    checkpoint = str(tmp_path / "cp.json")
+    client.portal.call(lambda: regrade.run(2, 0, 10, checkpoint))
+
+    with open(checkpoint) as f:
+        assert bad_id in json.load(f)["failed"]
+    assert events == [invalidation.rescored_event()]
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import select, update
+
+from database.connection import async_session
+from jobs import rescore
+from models.assignment_model import Assignment
+from services.scoring_service import calculate_final_score, get_profile
+
+SELECTION = {"*": "standard@1", "Math": "rigorous@1", "Lab": "applied@1"}
+
+
+def test_score_chunk_matches_calculate_final_score():
+    rng = np.random.default_rng(7)
+    components = np.round(rng.uniform(0, 100, size=(2000, 4)), 1)
+    components[:4] = [[70.5, 70.5, 71.0, 72.0]] * 4  # ties at the rounding digit
+    subjects = list(rng.choice(["Math", "Lab", "History", "General"], size=len(components)))
+
+    scores, profiles = rescore.score_chunk(subjects, components, SELECTION)
+
+    for subject, row, score, key in zip(subjects, components.tolist(), scores, profiles):
+        expected = SELECTION.get(subject, SELECTION["*"])
+        assert key == expected
+        assert score == calculate_final_score(*row, profile=get_profile(expected)).final_score
+
+
+def test_rescore_chunk_writes_scores_and_profiles(client, register):
+    headers = register()
+    ids = []
+    for subject in ("Math", "Lab", "History"):
+        r = client.post("/student/submit-assignment", headers=headers, json={
+            "text": f"An essay on {subject} with enough words to be analysed properly.",
+            "subject": subject,
+        })
+        ids.append(r.json()["assignment_id"])
+
+    async def scenario():
+        async with async_session() as db:
+            await db.execute(
+                update(Assignment).where(Assignment.id.in_(ids))
+                .values(final_score=0, scoring_profile=None, updated_at=datetime(2000, 1, 1))
+            )
+            await db.commit()
+        async with async_session() as db:
+            _, scanned, changed = await rescore._rescore_chunk(db, min(ids) - 1, 3, SELECTION, False)
+        async with async_session() as db:
+            rows = (await db.execute(
+                select(Assignment).where(Assignment.id.in_(ids)).order_by(Assignment.id)
+            )).scalars().all()
+        return scanned, changed, rows
+
+    scanned, changed, rows = client.portal.call(scenario)
+    assert (scanned, changed) == (3, 3)
+    assert [a.scoring_profile for a in rows] == ["rigorous@1", "applied@1", "standard@1"]
+    assert all(a.updated_at.year > 2000 for a in rows)  # seen by a tenant move's sync step
+    for a in rows:
+        assert a.final_score == calculate_final_score(
+            a.concept_clarity, a.application, a.logical_consistency, a.depth,
+            profile=get_profile(a.scoring_profile),
+        ).final_score
+    assert sum(client.portal.call(rescore.audit).values()) >= 3
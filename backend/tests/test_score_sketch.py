@@ -0,0 +1,153 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from database.connection import async_session
+from models.assignment_model import Assignment, ScoreSketchBucket
+from models.user_model import User
+from services import score_sketch
+from services.score_sketch import ScoreHistogram, bucket_of, scopes_for, week_of
+
+
+def test_buckets_are_tenths_clamped_to_the_range():
+    assert bucket_of(0) == 0
+    assert bucket_of(72.5) == 725
+    assert bucket_of(99.96) == 1000
+    assert bucket_of(-3) == 0
+    assert bucket_of(140) == score_sketch.BUCKETS - 1
+
+
+def test_weeks_are_iso_weeks_in_utc():
+    assert week_of(datetime(2021, 1, 1)) == "2020-W53"
+    late_sunday = datetime(2024, 1, 7, 23, 30, tzinfo=timezone(timedelta(hours=-5)))
+    assert week_of(late_sunday) == "2024-W02"  # already Monday in UTC
+    assert scopes_for(None, datetime(2024, 1, 3)) == ["all", "subject:General", "week:2024-W01"]
+
+
+def test_histogram_statistics():
+    hist = ScoreHistogram()
+    for score in (10, 20, 30, 40, 100):
+        hist.add(score)
+    assert hist.total == 5
+    assert hist.mean() == 40.0
+    assert hist.percentiles([50, 0, 100, 80]) == {0: 10.0, 50: 30.0, 80: 40.0, 100: 100.0}
+    assert [b["count"] for b in hist.histogram(4)] == [2, 2, 0, 1]
+    assert hist.histogram(4)[-1] == {"lo": 75.0, "hi": 100.0, "count": 1}
+    assert ScoreHistogram().percentiles([50]) == {50: 0.0}
+
+
+def test_histograms_merge_by_adding_counts():
+    a, b = ScoreHistogram(), ScoreHistogram()
+    a.add(50, 2)
+    b.add(50)
+    b.add(70.3)
+    merged = a.merge(b)
+    assert merged.total == 4
+    assert merged.counts[500] == 3 and merged.counts[703] == 1
+    merged.add(70.3, -1)  # removal, as a regrade does
+    assert merged.percentiles([100]) == {100: 50.0}
+
+
+async def _totals(db, scope: str) -> dict:
+    result = await db.execute(
+        select(ScoreSketchBucket.bucket, ScoreSketchBucket.count)
+        .where(ScoreSketchBucket.scope == scope, ScoreSketchBucket.count != 0)
+    )
+    return dict(result.all())
+
+
+def test_weeks_follow_the_assignment_created_at(client):
+    created = datetime(2023, 3, 15, 12, tzinfo=timezone.utc)
+
+    async def scenario():
+        async with async_session() as db:
+            user = User(name="Ada", email="ada.weeks@test.example.com", password_hash="x", role="student")
+            db.add(user)
+            await db.flush()
+            assignment = Assignment(
+                student_id=user.id, text="An essay.", subject="Weeks", final_score=61.2,
+                created_at=created,
+            )
+            db.add(assignment)
+            await db.flush()
+            await score_sketch.record_score(db, assignment, previous=None)
+            await db.commit()
+        async with async_session() as db:
+            return await _totals(db, "week:2023-W11"), await _totals(db, "subject:Weeks")
+
+    week, subject = client.portal.call(scenario)
+    assert week.get(612) == 1
+    assert subject == {612: 1}
+
+
+# ---------- Postgres: concurrent writers ----------
+
+
+async def _student(session_factory) -> int:
+    async with session_factory() as db:
+        user = User(name="Ada", email="ada@sketch.test", password_hash="x", role="student")
+        db.add(user)
+        await db.commit()
+        return user.id
+
+
+async def _submit(db, student_id: int, score: float) -> Assignment:
+    assignment = Assignment(student_id=student_id, text="An essay.", subject="Math", final_score=score)
+    db.add(assignment)
+    await db.flush()
+    return assignment
+
+
+@pytest.mark.anyio
+@pytest.mark.postgres
+async def test_concurrent_submissions_move_latest_once(cluster):
+    _, session_factory = cluster
+    student_id = await _student(session_factory)
+
+    async with session_factory() as a, session_factory() as b:
+        first = await _submit(a, student_id, 50)
+        await score_sketch.record_score(a, first, previous=None)
+        second = await _submit(b, student_id, 70)
+        waiting = asyncio.create_task(score_sketch.record_score(b, second, previous=None))
+        await asyncio.sleep(0.3)
+        assert not waiting.done()  # waits for the student's lock
+        await a.commit()
+        await waiting
+        await b.commit()
+
+    async with session_factory() as db:
+        assert await _totals(db, "latest") == {700: 1}
+        assert await _totals(db, "all") == {500: 1, 700: 1}
+
+
+@pytest.mark.anyio
+@pytest.mark.postgres
+async def test_writes_wait_for_a_rebuild(cluster):
+    _, session_factory = cluster
+    student_id = await _student(session_factory)
+    async with session_factory() as db:
+        for score in (40, 60):
+            await _submit(db, student_id, score)
+        await db.commit()
+
+    async def write():
+        async with session_factory() as db:
+            assignment = await _submit(db, student_id, 90)
+            await score_sketch.record_score(db, assignment, previous=None)
+            await db.commit()
+
+    async with session_factory() as rebuilding:
+        assert await score_sketch.rebuild(rebuilding) == 2
+        writer = asyncio.create_task(write())
+        await asyncio.sleep(0.3)
+        assert not writer.done()  # the bucket table is locked
+        await rebuilding.commit()
+        await writer
+
+    async with session_factory() as db:
+        assert await _totals(db, "all") == {400: 1, 600: 1, 900: 1}
+        assert await _totals(db, "latest") == {900: 1}
+        count = (await db.execute(select(func.count(Assignment.id)))).scalar()
+    assert count == 3
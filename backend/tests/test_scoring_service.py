@@ -0,0 +1,88 @@
+import subprocess
+import sys
+
+import pytest
+
+from models.assignment_model import Assignment
+from services import scoring_service
+from services.scoring_service import (
+    PROFILES,
+    calculate_final_score,
+    compute_growth_trend,
+    get_profile,
+    profile_for,
+    score_evaluation,
+)
+
+EVAL = {"concept_clarity": 80, "application": 70, "logical_consistency": 60}
+
+
+@pytest.fixture
+def subject_profiles(monkeypatch):
+    def configure(spec: str) -> None:
+        monkeypatch.setattr(scoring_service.get_settings(), "SCORING_SUBJECT_PROFILES", spec)
+        scoring_service.subject_profiles.cache_clear()
+
+    yield configure
+    scoring_service.subject_profiles.cache_clear()
+
+
+def test_get_profile_by_key_and_bare_name():
+    assert get_profile("applied@1") is PROFILES["applied@1"]
+    assert get_profile("rigorous").key == "rigorous@1"
+    with pytest.raises(ValueError):
+        get_profile("lenient")
+
+
+def test_profile_for_subject_overrides(subject_profiles):
+    subject_profiles("Math=rigorous@1; Lab = applied")
+    assert profile_for("Math").key == "rigorous@1"
+    assert profile_for("Lab").key == "applied@1"
+    assert profile_for("History").key == "standard@1"
+    assert profile_for(None).key == "standard@1"
+
+
+def test_calculate_final_score_weights():
+    scores = calculate_final_score(80, 70, 60, 50, profile=get_profile("standard@1"))
+    assert scores.final_score == 70.0  # .4*80 + .3*70 + .2*60 + .1*50
+    scores = calculate_final_score(80, 70, 60, 50, profile=get_profile("applied@1"))
+    assert scores.final_score == 69.0
+
+
+def test_score_evaluation_defaults_and_columns(subject_profiles):
+    subject_profiles("Math=rigorous@1")
+    scored = score_evaluation(EVAL, "Math")
+    assert scored.scores.depth == 70
+    assert (scored.radar.clarity, scored.radar.critical_thinking, scored.radar.retention) == (75, 70, 72)
+    assert scored.scores.final_score == calculate_final_score(
+        80, 70, 60, 70, profile=get_profile("rigorous@1")
+    ).final_score
+
+    columns = scored.columns()
+    assert set(columns) <= set(Assignment.__table__.columns.keys())
+    assert columns["radar_logic"] == 60
+    assert columns["final_score"] == scored.scores.final_score
+
+
+def test_score_evaluation_requires_core_dimensions():
+    with pytest.raises(KeyError):
+        score_evaluation({"application": 70, "logical_consistency": 60}, None)
+
+
+@pytest.mark.parametrize(
+    "history, trend",
+    [([], 0.0), ([70], 0.0), ([50, 60], 20.0), ([80, 80, 60, 60], -25.0), ([0, 10], 0.0)],
+)
+def test_compute_growth_trend(history, trend):
+    assert compute_growth_trend(history) == trend
+
+
+def test_round_score_matches_numpy_on_ties():
+    np = pytest.importorskip("numpy")
+    values = [70.65, 70.75, 0.05, 0.15, 2.675, 99.95, -0.05] + [i / 20 for i in range(2001)]
+    assert [scoring_service.round_score(v) for v in values] == np.round(values, 1).tolist()
+
+
+def test_app_import_does_not_load_numpy():
+    code = "import sys, main; sys.exit('numpy' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
@@ -0,0 +1,23 @@
+import asyncio
+import time
+
+import pytest
+
+from database import shards
+
+
+@pytest.mark.anyio
+async def test_concurrent_resolves_reload_a_stale_directory_once():
+    router = shards.ShardRouter({shards.DEFAULT_SHARD: None})
+    loads = []
+
+    async def load():
+        loads.append(time.monotonic())
+        await asyncio.sleep(0.01)
+        router._directory = {"acme": (shards.DEFAULT_SHARD, False)}
+        router._loaded_at = time.monotonic()
+
+    router._load = load
+    routes = await asyncio.gather(*(router.resolve("acme") for _ in range(10)))
+    assert len(loads) == 1
+    assert {route.shard for route in routes} == {shards.DEFAULT_SHARD}
@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+
+from services import shared_cache
+from services.shared_cache import Cache, MemoryBackend, RedisBackend
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def memory_backend():
+    shared_cache.set_backend(MemoryBackend(1000))
+    yield
+    shared_cache.set_backend(MemoryBackend(1000))
+
+
+async def _slow_load(cache: Cache, key: str, value: bytes):
+    """Start a get_or_set whose loader blocks until released."""
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def loader():
+        started.set()
+        await release.wait()
+        return value
+
+    task = asyncio.create_task(cache.get_or_set(key, loader))
+    await started.wait()
+    return task, release
+
+
+async def test_miss_loads_and_stores():
+    cache = Cache("t", ttl=60)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return b"v"
+
+    assert await cache.get_or_set("k", loader) == b"v"
+    assert await cache.get_or_set("k", loader) == b"v"
+    assert len(calls) == 1
+
+
+async def test_invalidation_during_load_discards_the_value():
+    cache = Cache("t", ttl=60)
+    task, release = await _slow_load(cache, "k", b"stale")
+
+    await cache.delete("k")  # a write committed after the loader read
+    release.set()
+
+    assert await task == b"stale"  # the racing request still gets its answer
+    assert await cache.get("k") is None  # but it isn't cached for everyone else
+
+    async def fresh():
+        return b"fresh"
+
+    assert await cache.get_or_set("k", fresh) == b"fresh"
+    assert await cache.get("k") == b"fresh"
+
+
+async def test_invalidation_between_check_and_store_is_undone(monkeypatch):
+    cache = Cache("t", ttl=60)
+    real_set = Cache.set
+
+    async def set_then_invalidate(self, key, value, ttl=None):
+        await real_set(self, key, value, ttl)
+        await asyncio.gather(self.delete(key), asyncio.sleep(0))
+        await real_set(self, key, value, ttl)  # the loader's store landing late
+
+    monkeypatch.setattr(Cache, "set", set_then_invalidate)
+
+    async def loader():
+        return b"stale"
+
+    await cache.get_or_set("k", loader)
+    monkeypatch.undo()
+    assert await cache.get("k") is None
+
+
+async def test_clear_during_load_discards_the_value():
+    cache = Cache("t", ttl=60)
+    task, release = await _slow_load(cache, "k", b"stale")
+    await cache.clear()
+    release.set()
+    await task
+    assert await cache.get("k") is None
+
+
+async def test_invalidating_another_key_does_not_discard():
+    cache = Cache("t", ttl=60)
+    task, release = await _slow_load(cache, "k", b"v")
+    await cache.delete("other")
+    release.set()
+    await task
+    assert await cache.get("k") == b"v"
+
+
+@pytest.fixture
+async def redis_backend():
+    fakeredis = pytest.importorskip("fakeredis")
+    backend = RedisBackend(client=fakeredis.FakeAsyncRedis())
+    yield backend
+    await backend.close()
+
+
+async def test_redis_incr_counts_and_sets_the_ttl(redis_backend):
+    client = redis_backend._client
+    await redis_backend.incr(["a:gen", "b:gen"], ttl=60)
+    await redis_backend.incr(["a:gen"], ttl=30)
+    assert await client.mget("a:gen", "b:gen") == [b"2", b"1"]
+    assert 0 < await client.pttl("a:gen") <= 30_000
+    assert 30_000 < await client.pttl("b:gen") <= 60_000
+
+
+async def test_redis_delete_prefix_scans_only_matching_keys(redis_backend):
+    for i in range(1200):  # more than one SCAN/delete batch
+        await redis_backend.set(f"p:ns:{i}", b"v", ttl=60)
+    await redis_backend.set("p:other:1", b"v", ttl=60)
+    await redis_backend.delete_prefix("p:ns:")
+    assert await redis_backend._client.keys("p:*") == [b"p:other:1"]
+
+
+async def test_redis_add_only_sets_absent_keys(redis_backend):
+    assert await redis_backend.add("lock", b"first", ttl=60)
+    assert not await redis_backend.add("lock", b"second", ttl=60)
+    assert await redis_backend.get("lock") == b"first"
+    await redis_backend.delete("lock")
+    assert await redis_backend.add("lock", b"third", ttl=0.001)
+    await asyncio.sleep(0.01)
+    assert await redis_backend.add("lock", b"fourth", ttl=60)  # the first lock expired
+
+
+async def test_cache_over_redis_coalesces_and_invalidates(redis_backend):
+    shared_cache.set_backend(redis_backend)
+    cache = Cache("t", ttl=60)
+    task, release = await _slow_load(cache, "k", b"stale")
+    await cache.delete("k")
+    release.set()
+    assert await task == b"stale"
+    assert await cache.get("k") is None
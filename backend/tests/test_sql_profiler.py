@@ -0,0 +1,44 @@
+import pytest
+
+from services import sql_profiler
+from services.sql_profiler import QueryProfile, assert_max_queries, fingerprint
+
+
+@pytest.mark.parametrize("statement, expected", [
+    ("SELECT * FROM users WHERE name = 'O''Brien' AND age > 42",
+     "SELECT * FROM users WHERE name = ? AND age > ?"),
+    ("SELECT t1.col2 FROM t1 WHERE id = $1 AND x = %(x_1)s LIMIT 10",
+     "SELECT t1.col2 FROM t1 WHERE id = ? AND x = ? LIMIT ?"),
+    ("SELECT id FROM a WHERE b IN ($1, $2, $3)", "SELECT id FROM a WHERE b IN (?)"),
+    ("select 3.14,\n   ?  from a where b in (?,?)", "select ?, ? from a where b in (?)"),
+    ("SELECT 'a, b' IN ('c', 'd')", "SELECT ? IN (?)"),
+])
+def test_fingerprints_collapse_literals_and_parameters(statement, expected):
+    assert fingerprint(statement) == expected
+
+
+def test_in_lists_of_any_length_share_a_fingerprint():
+    assert fingerprint("SELECT 1 FROM a WHERE id IN (?)") == fingerprint(
+        "SELECT 1 FROM a WHERE id IN (?, ?, ?, ?)"
+    )
+
+
+def test_n_plus_one_counts_repeated_shapes():
+    profile = QueryProfile()
+    profile.record("SELECT * FROM users", 0.001)
+    for student_id in range(4):
+        profile.record(f"SELECT * FROM assignments WHERE student_id = {student_id}", 0.002)
+    assert profile.n_plus_one(threshold=3) == [
+        {"fingerprint": "SELECT * FROM assignments WHERE student_id = ?", "count": 4},
+    ]
+    assert profile.header_value() == "queries=5; time_ms=9.0; n_plus_one=1"
+
+
+def test_assert_max_queries_names_the_repeated_statement():
+    with pytest.raises(AssertionError, match=r"got 3\.\n.*\n  2x SELECT b FROM t WHERE id = \?"):
+        with assert_max_queries(2):
+            profile = QueryProfile()
+            for statement in ("SELECT a FROM t", "SELECT b FROM t WHERE id = 1",
+                              "SELECT b FROM t WHERE id = 2"):
+                profile.record(statement, 0.0)
+            sql_profiler.publish(profile)
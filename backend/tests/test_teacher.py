@@ -0,0 +1,89 @@
+import pytest
+from sqlalchemy import update
+
+from database.connection import async_session
+from models.assignment_model import Assignment
+from models.user_model import User
+from routes import teacher
+from services import analytics_cache
+from services.scoring_service import compute_growth_trend
+from services.sql_profiler import assert_max_queries
+
+
+def _student(client, register, scores):
+    """A student with one assignment per score, in order; returns their id."""
+    headers = register()
+    ids = []
+    for n, _ in enumerate(scores):
+        r = client.post("/student/submit-assignment", headers=headers, json={
+            "text": f"Essay number {n} with enough words in it to be analysed properly.",
+            "subject": "Math",
+        })
+        assert r.status_code == 201, r.text
+        ids.append(r.json()["assignment_id"])
+
+    async def set_scores():
+        async with async_session() as db:
+            for assignment_id, score in zip(ids, scores):
+                await db.execute(
+                    update(Assignment).where(Assignment.id == assignment_id).values(final_score=score)
+                )
+            await db.commit()
+
+    client.portal.call(set_scores)
+    return client.get("/auth/me", headers=headers).json()["id"]
+
+
+def _students(client, headers) -> dict:
+    client.portal.call(lambda: analytics_cache.snapshots.delete("students"))
+    r = client.get("/teacher/students", headers=headers)
+    assert r.status_code == 200, r.text
+    return {s["id"]: s for s in r.json()}
+
+
+def test_student_list_query_count_is_independent_of_students(client, register):
+    teacher = register("teacher")
+    histories = {
+        _student(client, register, scores): scores
+        for scores in ([], [55.0], [50.0, 60.0, 90.0], [80.0, 40.0, 40.0, 20.0])
+    }
+    with assert_max_queries(3) as profiles:
+        few = _students(client, teacher)
+    for _ in range(5):
+        _student(client, register, [70.0, 75.0])
+    with assert_max_queries(len(profiles[0])):
+        many = _students(client, teacher)
+    assert len(many) == len(few) + 5
+
+    for student_id, scores in histories.items():
+        row = few[student_id]
+        growth = compute_growth_trend(scores)
+        assert row["score"] == (scores[-1] if scores else 0)
+        assert row["trend"] == f"{'+' if growth >= 0 else ''}{growth}%"
+    assert few[next(iter(histories))]["weak_topic"] == "N/A"
+    assert few[next(iter(histories))]["status"] == "At Risk"
+
+
+@pytest.mark.anyio
+@pytest.mark.postgres
+async def test_student_list_on_postgres(cluster):
+    _, session_factory = cluster
+    async with session_factory() as db:
+        students = [
+            User(name=name, email=f"{name}@teacher.test", password_hash="x", role="student")
+            for name in ("ada", "bob")
+        ]
+        db.add_all(students)
+        await db.flush()
+        for score in (50.0, 60.0, 90.0):
+            db.add(Assignment(student_id=students[0].id, text="An essay.", final_score=score,
+                              weak_topics=["Loops"], ai_dependency_score=12.34))
+        await db.commit()
+        rows = await teacher._student_list(db)
+    assert rows == [
+        {"id": students[0].id, "name": "ada", "score": 90.0, "weak_topic": "Loops",
+         "trend": f"+{compute_growth_trend([50.0, 60.0, 90.0])}%", "status": "Strong",
+         "ai_dependency": 12.3},
+        {"id": students[1].id, "name": "bob", "score": 0, "weak_topic": "N/A",
+         "trend": "+0.0%", "status": "At Risk", "ai_dependency": 0},
+    ]
@@ -0,0 +1,65 @@
+import pytest
+
+from services.topic_taxonomy import (
+    TopicTrie,
+    _trie,
+    canonicalize,
+    canonicalize_all,
+    normalize,
+)
+
+
+def test_normalize():
+    assert normalize("Dijkstra's Algorithm") == ("dijkstra", "algorithm")
+    assert normalize("Dijkstra’s algorithm") == ("dijkstra", "algorithm")
+    assert normalize("The Art of Hash-Tables") == ("art", "hash", "table")
+    assert normalize("class") == ("class",)  # -ss isn't a plural
+    assert normalize("OS") == ("os",)  # too short to fold
+    assert normalize("--") == ()
+
+
+def test_trie_finds_the_longest_alias_anywhere():
+    trie = TopicTrie()
+    trie.insert(("binary", "search"), "Searching")
+    trie.insert(("binary", "search", "tree"), "Trees & BST")
+    trie.insert(("tree",), "Trees & BST")
+    assert trie.longest_match(("balanced", "binary", "search", "tree")) == ("Trees & BST", 3)
+    assert trie.longest_match(("binary", "search", "bugs")) == ("Searching", 2)
+    assert trie.longest_match(("binary", "heap")) is None
+    assert _trie.longest_match(normalize("recursion base cases")) == ("Recursion", 2)
+
+
+@pytest.mark.parametrize("topic, canonical", [
+    ("DP", "Dynamic Programming"),
+    ("dynamic-programming", "Dynamic Programming"),
+    ("Recursion base cases", "Recursion"),
+    ("Dijkstra's algorithm", "Graph Algorithms"),
+    ("time and space complexity", "Time Complexity"),
+])
+def test_aliases_map_through_the_trie(topic, canonical):
+    assert canonicalize(topic) == canonical
+
+
+@pytest.mark.parametrize("topic, canonical", [
+    ("dynamik programing", "Dynamic Programming"),
+    ("hash tabels", "Hashing"),
+    ("search binary", "Searching"),
+])
+def test_typos_and_reordering_match_fuzzily(topic, canonical):
+    assert canonicalize(topic) == canonical
+
+
+@pytest.mark.parametrize("topic, cleaned", [
+    ("graph coloring heuristics", "Graph Coloring Heuristics"),  # one word in three
+    ("quantum_computing", "Quantum Computing"),
+    ("GPU shaders.", "GPU Shaders"),
+    ("-- ", ""),
+])
+def test_unknown_topics_fall_back_to_the_cleaned_input(topic, cleaned):
+    assert canonicalize(topic) == cleaned
+
+
+def test_canonicalize_all_drops_blanks_and_duplicates():
+    assert canonicalize_all(["DP", " ", None, "--", "memoization", "Graphs", "dp"]) == [
+        "Dynamic Programming", "Graph Theory",
+    ]
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from services import warmup
+
+
+@pytest.mark.anyio
+async def test_failed_pool_step_keeps_readiness_off_until_it_succeeds(monkeypatch):
+    from database import connection
+    from services import book_catalog
+
+    attempts = []
+
+    async def prewarm_pool(count):
+        attempts.append(count)
+        if len(attempts) < 3:
+            raise ConnectionRefusedError("database is down")
+        return count
+
+    monkeypatch.setattr(connection, "prewarm_pool", prewarm_pool)
+    monkeypatch.setattr(book_catalog, "get_catalog", lambda: None)
+    monkeypatch.setattr(warmup.settings, "WARMUP_RETRY_SECONDS", 0.01)
+    monkeypatch.setattr(warmup, "_ready", False)
+    monkeypatch.setattr(warmup, "_errors", {})
+
+    task = asyncio.create_task(warmup.run())
+    while len(attempts) < 2:
+        await asyncio.sleep(0.001)
+    assert not warmup.is_ready()
+    assert "database is down" in warmup.status()["errors"]["pool"]
+
+    await asyncio.wait_for(task, 5)
+    assert warmup.is_ready()
+    assert len(attempts) == 3
+    assert warmup.status()["errors"] == {}
+
+
+def test_ready_reports_503_with_the_errors(client, monkeypatch):
+    monkeypatch.setattr(warmup, "_ready", False)
+    monkeypatch.setattr(warmup, "_errors", {"pool": "ConnectionRefusedError()"})
+    r = client.get("/ready")
+    assert r.status_code == 503
+    assert r.json()["errors"] == {"pool": "ConnectionRefusedError()"}